@@ -1,15 +1,37 @@
 """
 Authentication endpoints for Zoho OAuth flow.
 """
+from urllib.parse import quote
+
 from fastapi import APIRouter, Query, HTTPException
 from fastapi.responses import RedirectResponse
 from loguru import logger
 
 from app.core.config import settings
+from app.core.http import get_http_client
 from app.services.zoho.token_manager import zoho_token_manager
 
 router = APIRouter()
 
+# Zoho OAuth scopes for CRM access
+_SCOPES = ",".join([
+    "ZohoCRM.modules.ALL",
+    "ZohoCRM.settings.ALL",
+    "ZohoCRM.users.ALL",
+    "ZohoCRM.coql.READ",
+])
+
+# Authorization URL is static for the process lifetime, so build it once
+_AUTH_URL = (
+    f"{settings.ZOHO_ACCOUNTS_URL}/oauth/v2/auth"
+    f"?response_type=code"
+    f"&client_id={quote(settings.ZOHO_CLIENT_ID, safe='')}"
+    f"&scope={_SCOPES}"
+    f"&redirect_uri={quote(settings.ZOHO_REDIRECT_URI, safe='')}"
+    f"&access_type=offline"
+    f"&prompt=consent"
+)
+
 
 @router.get("/zoho/authorize")
 async def zoho_authorize():
@@ -18,24 +40,7 @@ async def zoho_authorize():
     
     Redirects user to Zoho's authorization page.
     """
-    # Zoho OAuth scopes for CRM access
-    scopes = [
-        "ZohoCRM.modules.ALL",
-        "ZohoCRM.settings.ALL",
-        "ZohoCRM.users.ALL",
-    ]
-    
-    auth_url = (
-        f"{settings.ZOHO_ACCOUNTS_URL}/oauth/v2/auth"
-        f"?response_type=code"
-        f"&client_id={settings.ZOHO_CLIENT_ID}"
-        f"&scope={','.join(scopes)}"
-        f"&redirect_uri={settings.ZOHO_REDIRECT_URI}"
-        f"&access_type=offline"
-        f"&prompt=consent"
-    )
-    
-    return RedirectResponse(url=auth_url)
+    return RedirectResponse(url=_AUTH_URL)
 
 
 @router.get("/zoho/callback")
@@ -59,8 +64,6 @@ async def zoho_callback(
         raise HTTPException(status_code=400, detail="No authorization code received")
     
     # Exchange code for tokens
-    import httpx
-    
     token_url = f"{settings.ZOHO_ACCOUNTS_URL}/oauth/v2/token"
     
     payload = {
@@ -71,12 +74,11 @@ async def zoho_callback(
         "code": code,
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            token_url,
-            data=payload,
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
+    response = await get_http_client().post(
+        token_url,
+        data=payload,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
     
     if response.status_code != 200:
         logger.error(f"Token exchange failed: {response.text}")
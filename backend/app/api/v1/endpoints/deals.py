@@ -1,15 +1,29 @@
 """
 Deal management endpoints for the Application module.
 """
-from typing import Optional, List
-from fastapi import APIRouter, Query, Path, HTTPException
+import asyncio
+import base64
+import binascii
+import hmac
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple
+from fastapi import APIRouter, Query, Path, HTTPException, BackgroundTasks, Request, Response, Body, Header
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from loguru import logger
 
+from app.core.concurrency import KeyedLock, SingleFlight, bedrock_limit, dynamodb_limit, extraction_limit
+from app.core.config import settings
+from app.core.etag import compute_etag, content_digest, is_not_modified, to_http_date
+from app.core.logging import format_fields
+from app.core.streaming import ndjson_line
 from app.services.zoho.crm_service import zoho_crm_service
+from app.services.zoho.criteria import build_criteria, validate_search_term
 from app.services.llm.bedrock_service import bedrock_service
 from app.services.llm.deal_analysis_service import deal_analysis_service
 from app.services.llm.similar_customers_service import similar_customers_service
 from app.services.dynamodb.deal_cache import deal_analysis_cache
+from app.services.dynamodb.deal_stage_index import deal_stage_index
 from app.services.vector.marketing_vector_store import marketing_vector_store
 from app.services.document.extractor import document_extractor
 from app.services.fireflies.fireflies_service import fireflies_service
@@ -23,9 +37,23 @@ from app.schemas.deal_analysis import EnrichedDealResponse, DealAnalysis
 
 router = APIRouter()
 
+# Serializes the cold analysis pipeline per deal so concurrent requests share one LLM run
+_analysis_locks = KeyedLock()
 
-@router.get("/", response_model=DealListResponse)
+# Concurrent cache-miss GETs for the same deal await the one in-flight pipeline run
+_analysis_flights = SingleFlight()
+
+# Enriched deals may be reused by the client briefly, then revalidated with If-None-Match
+_DEAL_CACHE_CONTROL = "private, max-age=30"
+
+
+# Hot GET endpoints build their JSON payload once and return it directly,
+# skipping FastAPI's response_model re-validation; `responses` keeps the
+# schema in the OpenAPI docs.
+@router.get("/", response_model=None, responses={200: {"model": DealListResponse}})
 async def list_deals(
+    request: Request,
+    background_tasks: BackgroundTasks,
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(100, ge=1, le=200, description="Records per page (default 100)"),
     sort_by: Optional[str] = Query(None, description="Field to sort by"),
@@ -40,36 +68,56 @@ async def list_deals(
     ),
     fetch_all: bool = Query(
         False,
-        description="If true, fetches ALL matching records (ignores pagination). Default is false to use pagination."
+        description="If true, streams ALL matching records (ignores pagination). Default is false to use pagination."
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from a previous response's next_cursor (overrides page, per_page, fields and stage)"
     ),
 ):
     """
     Fetch deals from Zoho CRM.
     
     Returns list of deals with optional field selection, sorting, and filtering.
+    
+    Stage-filtered pages with the default fields and sort order are served
+    from the DynamoDB stage index when it is enabled and fresh; otherwise
+    Zoho is searched and the index is rebuilt in the background.
+    
+    Each page carries a next_cursor while more records remain. With a stage
+    and fetch_all=true the response is streamed as each Zoho page arrives.
     """
     try:
-        field_list = fields.split(",") if fields else None
+        if cursor:
+            state = _decode_cursor(cursor)
+            page, per_page, fields, stage = state["page"], state["per_page"], state["fields"], state["stage"]
+        field_list = _parse_fields(fields) if fields else None
         
         # If stage filter is provided
         if stage:
-            criteria = f"(Stage:equals:{stage})"
+            criteria = build_criteria(((*_SEARCH_FIELDS["stage"], _clean_or_400(stage)),))
+            # The snapshot is ordered by Modified_Time, so custom sorts go to Zoho
+            use_index = deal_stage_index.is_enabled and not fields and not sort_by
+            result = None
+            
+            if use_index and not fetch_all:
+                result = await dynamodb_limit.to_thread(deal_stage_index.get_stage_page, stage, page, per_page)
             
-            if fetch_all:
-                # Fetch ALL matching deals by paginating through all pages
-                logger.info(f"Fetching ALL deals with stage: {stage}")
-                result = await zoho_crm_service.search_all_deals(
-                    criteria=criteria,
-                    fields=field_list,
+            if result is None and fetch_all:
+                # Stream ALL matching deals page by page instead of buffering them
+                logger.info(f"Streaming ALL deals with stage: {stage}")
+                return StreamingResponse(
+                    _stream_all_deals(stage, criteria, field_list, sort_by, sort_order),
+                    media_type="application/json",
                 )
-            else:
+            elif result is None:
                 # Use regular pagination
-                result = await zoho_crm_service.search_deals(
-                    criteria=criteria,
-                    page=page,
-                    per_page=per_page,
-                    fields=field_list,
+                result = await _search_stage_page(
+                    stage, criteria, page, per_page, field_list, sort_by, sort_order
                 )
+                # Index missing or expired for this stage: rebuild it for next time
+                if use_index:
+                    background_tasks.add_task(_sync_stage_index, stage, criteria)
         else:
             result = await zoho_crm_service.get_deals(
                 page=page,
@@ -77,27 +125,607 @@ async def list_deals(
                 fields=field_list,
             )
         
-        deals = result.get("data", [])
-        info = result.get("info", {})
+        # Read the paging info once; it feeds both the ETag and the response
+        deals = result["data"] if "data" in result else []
+        info = result["info"] if "info" in result else {}
+        page_ = info.get("page", page)
+        per_page_ = info.get("per_page", per_page)
+        count = info.get("count")
+        more_records = info.get("more_records", False)
         
-        return DealListResponse(
-            data=deals,
-            page=info.get("page", page),
-            per_page=info.get("per_page", per_page),
-            total_count=info.get("count", len(deals)),
-            more_records=info.get("more_records", False),
-        )
+        # Fingerprint the records themselves (a fields= projection may leave
+        # out Modified_Time) plus the paging info; the bytes are reused below
+        deals_json = orjson.dumps(deals)
+        etag = compute_etag(content_digest(deals_json), page_, per_page_, count, more_records, fields)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        # Same shape as DealListResponse; deals are already plain dicts from Zoho
+        rest = orjson.dumps({
+            "page": page_,
+            "per_page": per_page_,
+            "total_count": len(deals) if count is None else count,
+            "more_records": more_records,
+            "next_cursor": _encode_cursor(page_ + 1, per_page_, fields, stage) if more_records else None,
+        })
+        body = b"".join((b'{"data":', deals_json, b",", rest[1:]))
+        return Response(body, media_type="application/json", headers={"ETag": etag})
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching deals: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{deal_id}", response_model=EnrichedDealResponse)
+# Fields clients may request in deal lists
+_ALLOWED_DEAL_FIELDS = frozenset(zoho_crm_service.DEAL_FIELDS_FOR_ANALYSIS)
+
+
+@lru_cache(maxsize=512)
+def _parse_fields(spec: str) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated fields parameter into known deal field names.
+    
+    Unknown and duplicate names are dropped; the result is a tuple so it can
+    be shared between requests and used in cache keys.
+    
+    Raises:
+        HTTPException: 400 if no requested field is allowed
+    """
+    requested = (name.strip() for name in spec.split(","))
+    field_list = tuple(dict.fromkeys(name for name in requested if name in _ALLOWED_DEAL_FIELDS))
+    if not field_list:
+        raise HTTPException(status_code=400, detail="No valid fields requested")
+    return field_list
+
+
+def _encode_cursor(page: int, per_page: int, fields: Optional[str], stage: Optional[str]) -> str:
+    """Encode list_deals paging state as an opaque, URL-safe cursor."""
+    state = {"page": page, "per_page": per_page, "fields": fields, "stage": stage}
+    return base64.urlsafe_b64encode(orjson.dumps(state)).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by _encode_cursor.
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        state = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        page, per_page = int(state["page"]), int(state["per_page"])
+        fields, stage = state.get("fields"), state.get("stage")
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if page < 1 or not 1 <= per_page <= 200:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"page": page, "per_page": per_page, "fields": fields, "stage": stage}
+
+
+async def _search_stage_page(
+    stage: str,
+    criteria: str,
+    page: int,
+    per_page: int,
+    field_list: Optional[List[str]],
+    sort_by: Optional[str],
+    sort_order: str,
+) -> Dict[str, Any]:
+    """
+    Fetch one page of deals in a stage, via COQL when enabled.
+    
+    Falls back to the search API if the COQL query fails.
+    
+    Raises:
+        HTTPException: 400 if a field or sort name is invalid
+    """
+    if settings.ZOHO_COQL_ENABLED:
+        try:
+            return await zoho_crm_service.search_deals_coql(
+                stage, page=page, per_page=per_page, fields=field_list,
+                sort_by=sort_by, sort_order=sort_order,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.warning(f"COQL stage query failed, falling back to search: {e}")
+    return await zoho_crm_service.search_deals(
+        criteria=criteria,
+        page=page,
+        per_page=per_page,
+        fields=field_list,
+    )
+
+
+async def _iter_stage_pages(
+    stage: str,
+    criteria: str,
+    field_list: Optional[List[str]],
+    sort_by: Optional[str],
+    sort_order: str,
+):
+    """
+    Yield every deal in a stage, one batch at a time.
+    
+    With COQL enabled this is a single query of up to COQL_MAX_LIMIT records
+    (the same cap search_all_deals applies); otherwise, or if that query
+    fails, the search API is paged through 200 records at a time.
+    """
+    if settings.ZOHO_COQL_ENABLED:
+        try:
+            result = await zoho_crm_service.search_deals_coql(
+                stage, per_page=zoho_crm_service.COQL_MAX_LIMIT, fields=field_list,
+                sort_by=sort_by, sort_order=sort_order,
+            )
+            yield result["data"]
+            return
+        except Exception as e:
+            logger.warning(f"COQL stage query failed, falling back to search: {e}")
+    async for deals in zoho_crm_service.iter_search_deals_pages(criteria, field_list):
+        yield deals
+
+
+async def _stream_all_deals(
+    stage: str,
+    criteria: str,
+    field_list: Optional[List[str]],
+    sort_by: Optional[str],
+    sort_order: str,
+):
+    """
+    Yield a DealListResponse-shaped JSON document one Zoho page at a time.
+    
+    The deals array is written as pages arrive; the totals follow it once
+    the last page is in.
+    """
+    total = 0
+    yield b'{"data":['
+    async for deals in _iter_stage_pages(stage, criteria, field_list, sort_by, sort_order):
+        if deals:
+            chunk = orjson.dumps(deals)[1:-1]
+            yield chunk if total == 0 else b"," + chunk
+            total += len(deals)
+    yield b'],' + orjson.dumps({
+        "page": 1,
+        "per_page": total,
+        "total_count": total,
+        "more_records": False,
+        "next_cursor": None,
+    })[1:]
+
+
+async def _sync_stage_index(stage: str, criteria: str) -> None:
+    """
+    Rebuild the stage index snapshot for one stage from Zoho.
+    
+    Runs as a background task after a stage list was served from Zoho.
+    Paginates search_deals directly so a failed page aborts the rebuild
+    instead of indexing a partial stage.
+    """
+    if not deal_stage_index.claim_sync(stage):
+        return
+    try:
+        deals: List[Dict[str, Any]] = []
+        page = 1
+        while True:
+            result = await zoho_crm_service.search_deals(criteria=criteria, page=page, per_page=200)
+            deals.extend(result.get("data", []))
+            if not result.get("info", {}).get("more_records", False):
+                break
+            page += 1
+        await dynamodb_limit.to_thread(deal_stage_index.rebuild_stage, stage, deals)
+    except Exception as e:
+        logger.error(f"Error syncing stage index for '{stage}': {e}")
+    finally:
+        deal_stage_index.release_sync(stage)
+
+
+async def _refresh_stage_index_entry(deal_id: str) -> None:
+    """
+    Re-read a deal from Zoho and move it to its current stage in the index.
+    
+    Runs as a background task after a deal is created or updated, and from
+    the Zoho webhook.
+    """
+    try:
+        result = await zoho_crm_service.get_deal_by_id(deal_id)
+        if not result.get("data"):
+            await dynamodb_limit.to_thread(deal_stage_index.remove_deal, deal_id)
+            return
+        deal_data = result["data"][0]
+        record = {
+            field: deal_data[field]
+            for field in zoho_crm_service.DEFAULT_DEAL_FIELDS
+            if field in deal_data
+        }
+        await dynamodb_limit.to_thread(deal_stage_index.upsert_deal, record)
+    except Exception as e:
+        logger.error(f"Error refreshing stage index for deal {deal_id}: {e}")
+
+
+async def _fetch_deal(deal_id: str, full_fields: bool = False) -> Dict[str, Any]:
+    """
+    Step 1: Fetch deal data from Zoho.
+    
+    Only the fields used for display and analysis are requested unless
+    full_fields is set.
+    
+    Raises:
+        HTTPException: 404 if the deal does not exist
+    """
+    logger.info(f"[Deal {deal_id}] Step 1: Fetching deal data from Zoho CRM (full_fields={full_fields})")
+    fields = None if full_fields else zoho_crm_service.DEAL_FIELDS_FOR_ANALYSIS
+    result = await zoho_crm_service.get_deal_by_id(deal_id, fields=fields)
+    
+    if not result.get("data"):
+        raise HTTPException(status_code=404, detail="Deal not found")
+    
+    deal_data = result["data"][0]
+    logger.info(f"[Deal {deal_id}] Step 1 done: Deal fetched — '{deal_data.get('Deal_Name', 'N/A')}'")
+    logger.opt(lazy=True).debug("[Deal {}] Deal fields:\n{}", lambda: deal_id, lambda: format_fields(deal_data))
+    return deal_data
+
+
+# Analyses returned when analysis is skipped or Bedrock is not configured.
+# Only company_name and support_required vary per deal, so these are built
+# once and shallow-copied per request (treat their lists as read-only).
+_SKIPPED_TEMPLATE = DealAnalysis(
+    company_name="Unknown",
+    country="Unknown",
+    region="Unknown",
+    product_description="Analysis skipped",
+    vertical="Unknown",
+    business_model="Unknown",
+    motion="Unknown",
+    raise_stage="Unknown",
+    company_size="Unknown",
+    likely_icp_canada="Unknown",
+    icp_mapping="Unknown",
+    fit_score=5,
+    fit_assessment="Analysis was explicitly skipped",
+    support_required="",
+    key_insights=[],
+    questions_to_ask=[],
+    confidence_level="Low",
+    notes=["Analysis was skipped by user request"],
+)
+
+_NO_BEDROCK_TEMPLATE = DealAnalysis(
+    company_name="Unknown",
+    country="Unknown",
+    region="Unknown",
+    product_description="Unable to analyze - LLM not configured",
+    vertical="Unknown",
+    business_model="Unknown",
+    motion="Unknown",
+    raise_stage="Unknown",
+    company_size="Unknown",
+    likely_icp_canada="Unknown",
+    icp_mapping="Unknown",
+    fit_score=5,
+    fit_assessment="Analysis not available - AWS Bedrock not configured",
+    support_required="",
+    key_insights=[],
+    questions_to_ask=[
+        "What is your core product and who is your primary customer?",
+        "Have you explored the Canadian market before?",
+        "What is your current GTM motion?",
+        "What stage of funding are you at?",
+        "What would success in Canada look like for you?",
+    ],
+    confidence_level="Low",
+    notes=["AWS Bedrock LLM not configured"],
+)
+
+
+def _placeholder_analysis(deal_data: Dict[str, Any], skip_analysis: bool) -> DealAnalysis:
+    """Build the analysis returned when analysis is skipped or Bedrock is not configured."""
+    template = _SKIPPED_TEMPLATE if skip_analysis else _NO_BEDROCK_TEMPLATE
+    return template.model_copy(update={
+        "company_name": deal_data.get("Deal_Name") or "Unknown",
+        "support_required": deal_data.get("Support_Required", ""),
+    })
+
+
+async def _load_cached(deal_id: str, refresh_analysis: bool) -> Optional[tuple]:
+    """
+    Step 2: Check the analysis cache (unless refresh requested).
+    
+    Returns:
+        Tuple of (analysis, marketing_materials, similar_customers, meetings) on hit, None otherwise
+    """
+    cached_data = None
+    
+    if refresh_analysis:
+        deal_analysis_cache.invalidate_memory(deal_id)
+    elif deal_analysis_cache.is_enabled:
+        logger.info(f"[Deal {deal_id}] Step 2: Checking DynamoDB cache")
+        cached_data = await deal_analysis_cache.get_cached_data(deal_id)
+    
+    if not cached_data:
+        if refresh_analysis:
+            logger.info(f"[Deal {deal_id}] Step 2: Cache skipped (refresh_analysis=true)")
+        else:
+            logger.info(f"[Deal {deal_id}] Step 2 done: Cache MISS — running full analysis pipeline")
+        return None
+    
+    # Return the cached entry itself (not a copy) so its serialized form can be reused
+    _, marketing_materials, similar_customers, meetings = cached_data
+    logger.info(f"[Deal {deal_id}] Step 2 done: Cache HIT — {len(marketing_materials)} materials, {len(similar_customers)} similar customers, {len(meetings)} meetings")
+    return cached_data
+
+
+async def _load_if_unchanged(deal_id: str, input_hash: str) -> Optional[tuple]:
+    """
+    On a forced refresh, reuse the cached analysis if its inputs have not changed.
+    
+    Returns:
+        Cached 4-tuple if the stored content hash matches input_hash, None otherwise
+    """
+    if not deal_analysis_cache.is_enabled:
+        return None
+    
+    stored_hash = await deal_analysis_cache.get_content_hash(deal_id)
+    if stored_hash != input_hash:
+        return None
+    
+    cached_data = await deal_analysis_cache.get_cached_data(deal_id)
+    if not cached_data or len(cached_data) != 4:
+        return None
+    logger.info(f"[Deal {deal_id}] Step 5 skipped: inputs unchanged since last analysis — reusing cached result")
+    return cached_data
+
+
+async def _extract_attachment_text(deal_id: str) -> str:
+    """
+    Step 3: Fetch and extract text from attachments.
+    
+    Attachments download concurrently and each is extracted as soon as it
+    arrives, overlapping parsing with the remaining downloads.
+    """
+    attachment_text = ""
+    try:
+        logger.info(f"[Deal {deal_id}] Step 3: Fetching attachments from Zoho CRM")
+        file_names = []
+        extractions_pending = []
+        
+        # Start parsing each attachment as soon as it is downloaded; parses run
+        # in parallel in the extraction process pool
+        try:
+            async for attachment in zoho_crm_service.iter_deal_attachments_with_content(deal_id):
+                file_names.append((attachment["index"], attachment["file_name"]))
+                extractions_pending.append(asyncio.create_task(document_extractor.extract_one_async(attachment)))
+            texts = await asyncio.gather(*extractions_pending)
+        finally:
+            # If a download or parse failed, stop the parses still queued and
+            # collect their results so none are left unretrieved
+            for task in extractions_pending:
+                task.cancel()
+            await asyncio.gather(*extractions_pending, return_exceptions=True)
+        
+        if file_names:
+            extracted = [(index, file_name, text) for (index, file_name), text in zip(file_names, texts) if text]
+            logger.info(f"[Deal {deal_id}] Step 3: Extracted text from {len(extracted)} of {len(file_names)} attachment(s)")
+            # Keep Zoho's attachment order so the combined text is stable
+            extractions = {file_name: text for _, file_name, text in sorted(extracted, key=lambda e: e[0])}
+            
+            if extractions:
+                attachment_text = await extraction_limit.to_thread(document_extractor.combine_extracted_text, extractions)
+                logger.info(f"[Deal {deal_id}] Step 3 done: Extracted {len(attachment_text)} chars from {len(extractions)} document(s)")
+                logger.opt(lazy=True).debug("[Deal {}] Extracted text:\n{}", lambda: deal_id, lambda: attachment_text)
+            else:
+                logger.info(f"[Deal {deal_id}] Step 3 done: No text extracted from attachments")
+        else:
+            logger.info(f"[Deal {deal_id}] Step 3 done: No attachments found")
+            
+    except Exception as e:
+        logger.warning(f"[Deal {deal_id}] Step 3 failed: {e}")
+    return attachment_text
+
+
+async def _fetch_meeting_notes(deal_id: str, deal_data: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Step 4: Fetch Fireflies meeting notes for the deal's contact."""
+    meeting_text = ""
+    meetings = []
+    try:
+        if fireflies_service.is_enabled:
+            contact_email = ""
+            contact = deal_data.get("Contact_Name")
+            if isinstance(contact, dict) and contact.get("Email"):
+                # Use the email when the lookup already carries it
+                contact_email = contact["Email"]
+            elif isinstance(contact, dict) and contact.get("id"):
+                logger.info(f"[Deal {deal_id}] Step 4: Resolving contact email (contact_id: {contact['id']})")
+                try:
+                    contact_email = await zoho_crm_service.get_contact_email(contact["id"])
+                    logger.info(f"[Deal {deal_id}] Step 4: Contact email resolved — {contact_email or '(empty)'}")
+                except Exception as e:
+                    logger.warning(f"[Deal {deal_id}] Step 4: Could not fetch contact email — {e}")
+            
+            if contact_email:
+                logger.info(f"[Deal {deal_id}] Step 4: Fetching Fireflies meeting notes for {contact_email}")
+                meeting_text, meetings = await asyncio.to_thread(
+                    fireflies_service.get_meetings_and_notes_for_email, contact_email
+                )
+                logger.info(f"[Deal {deal_id}] Step 4 done: Got {len(meeting_text)} chars of meeting notes, {len(meetings)} meeting(s)")
+                logger.opt(lazy=True).debug("[Deal {}] Meeting notes:\n{}", lambda: deal_id, lambda: meeting_text)
+            else:
+                logger.info(f"[Deal {deal_id}] Step 4 done: No contact email — skipping Fireflies")
+        else:
+            logger.info(f"[Deal {deal_id}] Step 4 done: Fireflies not configured — skipped")
+    except Exception as e:
+        logger.warning(f"[Deal {deal_id}] Step 4 failed: {e}")
+    return meeting_text, meetings
+
+
+async def _analyze(
+    deal_id: str,
+    deal_data: Dict[str, Any],
+    attachment_text: str,
+    meeting_text: str,
+) -> DealAnalysis:
+    """Step 5: Run LLM deal analysis (main analysis + scoring rubric)."""
+    logger.info(f"[Deal {deal_id}] Step 5: Running LLM deal analysis (attachment_text={len(attachment_text)} chars, meeting_text={len(meeting_text)} chars)")
+    analysis = await bedrock_limit.to_thread(
+        deal_analysis_service.analyze_deal,
+        deal_data=deal_data,
+        attachment_text=attachment_text if attachment_text else None,
+        meeting_text=meeting_text if meeting_text else None
+    )
+    logger.info(f"[Deal {deal_id}] Step 5 done: LLM analysis complete — fit_score={analysis.fit_score}, confidence={analysis.confidence_level}")
+    
+    # Add support_required from Zoho if not already set
+    support_required = deal_data.get("Support_Required")
+    if not analysis.support_required and support_required:
+        analysis.support_required = support_required
+    return analysis
+
+
+async def _find_related(
+    deal_id: str,
+    deal_data: Dict[str, Any],
+    analysis: DealAnalysis,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Steps 6 & 7: Search marketing materials and find similar customers.
+    
+    Both depend only on the analysis, so they run concurrently.
+    
+    Returns:
+        Tuple of (marketing_materials, similar_customers)
+    """
+    marketing_materials = []
+    search_data = {
+        "Company": deal_data.get("Deal_Name"),
+        "Industry": deal_data.get("Industry") or analysis.vertical,
+        "Description": deal_data.get("Description") or analysis.product_description,
+    }
+    
+    if marketing_vector_store.is_indexed:
+        logger.info(f"[Deal {deal_id}] Step 6: Searching marketing materials in vector store")
+        marketing_task = asyncio.to_thread(marketing_vector_store.search_for_lead, search_data, top_k=5)
+    else:
+        logger.info(f"[Deal {deal_id}] Step 6 done: Vector store not indexed — skipped")
+        marketing_task = asyncio.sleep(0, result=[])
+    
+    logger.info(f"[Deal {deal_id}] Step 7: Finding similar customers via LLM")
+    similar_task = bedrock_limit.to_thread(
+        similar_customers_service.find_similar_customers,
+        lead_data=search_data,
+        analysis_data=analysis,
+    )
+    
+    marketing_result, similar_result = await asyncio.gather(
+        marketing_task, similar_task, return_exceptions=True
+    )
+    
+    if isinstance(marketing_result, Exception):
+        logger.warning(f"[Deal {deal_id}] Step 6 failed: {marketing_result}")
+    elif marketing_vector_store.is_indexed:
+        marketing_materials = marketing_result
+        logger.info(f"[Deal {deal_id}] Step 6 done: Found {len(marketing_materials)} marketing material(s)")
+    
+    if isinstance(similar_result, Exception):
+        logger.warning(f"[Deal {deal_id}] Step 7 failed: {similar_result}")
+        similar_customers = []
+    else:
+        similar_customers = similar_result
+        logger.info(f"[Deal {deal_id}] Step 7 done: Found {len(similar_customers)} similar customer(s)")
+    
+    return marketing_materials, similar_customers
+
+
+def _schedule_cache_save(
+    deal_id: str,
+    background_tasks: BackgroundTasks,
+    analysis: DealAnalysis,
+    marketing_materials: List[Dict[str, Any]],
+    similar_customers: List[Dict[str, Any]],
+    meetings: List[Dict[str, Any]],
+    content_hash: Optional[str] = None,
+) -> None:
+    """Step 8: Cache results in DynamoDB after the response is sent."""
+    if deal_analysis_cache.is_enabled:
+        # Make the result visible to waiting requests before the DynamoDB write lands
+        deal_analysis_cache.remember(
+            deal_id, (analysis, marketing_materials, similar_customers, meetings), content_hash
+        )
+        logger.info(f"[Deal {deal_id}] Step 8: Scheduling DynamoDB cache save in background")
+        background_tasks.add_task(
+            deal_analysis_cache.save_analysis,
+            deal_id,
+            analysis,
+            marketing_materials,
+            similar_customers,
+            meetings,
+            content_hash,
+        )
+    else:
+        logger.info(f"[Deal {deal_id}] Step 8 done: DynamoDB cache disabled — skipped")
+
+
+async def _run_analysis_pipeline(
+    deal_id: str,
+    deal_data: Dict[str, Any],
+    refresh_analysis: bool,
+    background_tasks: BackgroundTasks,
+) -> Tuple[tuple, bool]:
+    """
+    Steps 3-8: Build the analysis for a deal that missed the cache.
+    
+    Only one request per deal runs the pipeline at a time (shared with the
+    streaming endpoint); a request that waited on the lock reuses the result
+    cached by the one before it. get_deal additionally coalesces concurrent
+    callers onto a single run via _analysis_flights.
+    
+    Returns:
+        ((analysis, marketing_materials, similar_customers, meetings), from_cache)
+    """
+    async with _analysis_locks.hold(deal_id):
+        if not refresh_analysis:
+            cached_data = await _load_cached(deal_id, refresh_analysis=False)
+            if cached_data:
+                return cached_data, True
+        
+        # Steps 3-4: Attachments and meeting notes are independent, so fetch them together
+        # (each step logs and swallows its own failures)
+        attachment_text, (meeting_text, meetings) = await asyncio.gather(
+            _extract_attachment_text(deal_id),
+            _fetch_meeting_notes(deal_id, deal_data),
+        )
+        
+        input_hash = await asyncio.to_thread(
+            deal_analysis_service.compute_input_hash, deal_data, attachment_text, meeting_text
+        )
+        if refresh_analysis:
+            unchanged = await _load_if_unchanged(deal_id, input_hash)
+            if unchanged:
+                return unchanged, True
+        
+        # Step 5: LLM analysis
+        analysis = await _analyze(deal_id, deal_data, attachment_text, meeting_text)
+        
+        # Steps 6-7: Marketing materials and similar customers
+        marketing_materials, similar_customers = await _find_related(deal_id, deal_data, analysis)
+        
+        # Step 8: Cache results
+        _schedule_cache_save(
+            deal_id, background_tasks, analysis, marketing_materials,
+            similar_customers, meetings, input_hash,
+        )
+        return (analysis, marketing_materials, similar_customers, meetings), False
+
+
+@router.get("/{deal_id}", response_model=None, responses={200: {"model": EnrichedDealResponse}})
 async def get_deal(
+    request: Request,
+    background_tasks: BackgroundTasks,
     deal_id: str = Path(..., description="Zoho Deal ID"),
     skip_analysis: bool = Query(False, description="Skip LLM analysis and return only deal data"),
     refresh_analysis: bool = Query(False, description="Force regenerate analysis (ignore cache)"),
+    full_fields: bool = Query(False, description="Fetch every Zoho field instead of the analysis projection"),
 ):
     """
     Get a specific deal by ID with AI-powered Canada market fit analysis.
@@ -121,226 +749,93 @@ async def get_deal(
     Query Parameters:
     - skip_analysis=true: Return only deal data without any analysis
     - refresh_analysis=true: Force regenerate analysis (ignore cache)
+    - full_fields=true: Return (and analyze) every Zoho field, for debugging
     """
     try:
         logger.info(f"[Deal {deal_id}] === START get_deal (skip_analysis={skip_analysis}, refresh_analysis={refresh_analysis}) ===")
         
         # Step 1: Fetch deal data from Zoho
-        logger.info(f"[Deal {deal_id}] Step 1: Fetching deal data from Zoho CRM")
-        result = await zoho_crm_service.get_deal_by_id(deal_id)
-        
-        if not result.get("data"):
-            raise HTTPException(status_code=404, detail="Deal not found")
-        
-        deal_data = result["data"][0]
-        logger.info(f"[Deal {deal_id}] Step 1 done: Deal fetched — '{deal_data.get('Deal_Name', 'N/A')}'")
-        logger.info(f"[Deal {deal_id}] Deal fields:\n" + "\n".join(f"  {k}: {v}" for k, v in deal_data.items()))
+        deal_data = await _fetch_deal(deal_id, full_fields)
         
         # Step 2: Handle analysis
         marketing_materials = []
         similar_customers = []
         meetings = []
+        cached_data = None
         
         if skip_analysis:
             logger.info(f"[Deal {deal_id}] Analysis skipped by user request")
-            analysis = DealAnalysis(
-                company_name=deal_data.get("Deal_Name") or "Unknown",
-                country="Unknown",
-                region="Unknown",
-                product_description="Analysis skipped",
-                vertical="Unknown",
-                business_model="Unknown",
-                motion="Unknown",
-                raise_stage="Unknown",
-                company_size="Unknown",
-                likely_icp_canada="Unknown",
-                icp_mapping="Unknown",
-                fit_score=5,
-                fit_assessment="Analysis was explicitly skipped",
-                support_required=deal_data.get("Support_Required", ""),
-                key_insights=[],
-                questions_to_ask=[],
-                confidence_level="Low",
-                notes=["Analysis was skipped by user request"],
-            )
+            analysis = _placeholder_analysis(deal_data, skip_analysis=True)
             analysis_available = False
             from_cache = False
         elif not bedrock_service.is_configured:
             logger.warning(f"[Deal {deal_id}] AWS Bedrock not configured, returning default analysis")
-            analysis = DealAnalysis(
-                company_name=deal_data.get("Deal_Name") or "Unknown",
-                country="Unknown",
-                region="Unknown",
-                product_description="Unable to analyze - LLM not configured",
-                vertical="Unknown",
-                business_model="Unknown",
-                motion="Unknown",
-                raise_stage="Unknown",
-                company_size="Unknown",
-                likely_icp_canada="Unknown",
-                icp_mapping="Unknown",
-                fit_score=5,
-                fit_assessment="Analysis not available - AWS Bedrock not configured",
-                support_required=deal_data.get("Support_Required", ""),
-                key_insights=[],
-                questions_to_ask=[
-                    "What is your core product and who is your primary customer?",
-                    "Have you explored the Canadian market before?",
-                    "What is your current GTM motion?",
-                    "What stage of funding are you at?",
-                    "What would success in Canada look like for you?",
-                ],
-                confidence_level="Low",
-                notes=["AWS Bedrock LLM not configured"],
-            )
+            analysis = _placeholder_analysis(deal_data, skip_analysis=False)
             analysis_available = False
             from_cache = False
         else:
-            # Step 2: Check DynamoDB cache (unless refresh requested)
-            cached_data = None
-            
-            if not refresh_analysis and deal_analysis_cache.is_enabled:
-                logger.info(f"[Deal {deal_id}] Step 2: Checking DynamoDB cache")
-                cached_data = deal_analysis_cache.get_cached_data(deal_id)
+            cached_data = await _load_cached(deal_id, refresh_analysis)
             
             if cached_data:
-                if len(cached_data) == 4:
-                    analysis, marketing_materials, similar_customers, meetings = cached_data
-                else:
-                    # Backward compatibility: old cached entries without meetings
-                    analysis, marketing_materials, similar_customers = cached_data
-                    meetings = []
-                logger.info(f"[Deal {deal_id}] Step 2 done: Cache HIT — {len(marketing_materials)} materials, {len(similar_customers)} similar customers, {len(meetings)} meetings")
+                analysis, marketing_materials, similar_customers, meetings = cached_data
                 analysis_available = True
                 from_cache = True
             else:
-                if refresh_analysis:
-                    logger.info(f"[Deal {deal_id}] Step 2: Cache skipped (refresh_analysis=true)")
-                else:
-                    logger.info(f"[Deal {deal_id}] Step 2 done: Cache MISS — running full analysis pipeline")
-                
-                # Step 3: Fetch and extract text from attachments
-                attachment_text = ""
-                try:
-                    logger.info(f"[Deal {deal_id}] Step 3: Fetching attachments from Zoho CRM")
-                    attachments = await zoho_crm_service.get_deal_attachments_with_content(deal_id)
-                    
-                    if attachments:
-                        logger.info(f"[Deal {deal_id}] Step 3: Extracting text from {len(attachments)} attachment(s)")
-                        extractions = document_extractor.extract_from_attachments(attachments)
-                        
-                        if extractions:
-                            attachment_text = document_extractor.combine_extracted_text(extractions)
-                            logger.info(f"[Deal {deal_id}] Step 3 done: Extracted {len(attachment_text)} chars from {len(extractions)} document(s)")
-                            logger.info(f"[Deal {deal_id}] Extracted text:\n{attachment_text}")
-                        else:
-                            logger.info(f"[Deal {deal_id}] Step 3 done: No text extracted from attachments")
-                    else:
-                        logger.info(f"[Deal {deal_id}] Step 3 done: No attachments found")
-                        
-                except Exception as e:
-                    logger.warning(f"[Deal {deal_id}] Step 3 failed: {e}")
-                
-                # Step 4: Fetch Fireflies meeting notes
-                meeting_text = ""
-                try:
-                    if fireflies_service.is_enabled:
-                        contact_email = ""
-                        contact = deal_data.get("Contact_Name")
-                        if isinstance(contact, dict) and contact.get("id"):
-                            logger.info(f"[Deal {deal_id}] Step 4: Fetching contact email from Zoho (contact_id: {contact['id']})")
-                            try:
-                                contact_result = await zoho_crm_service.get_contact_by_id(contact["id"])
-                                contact_data = (contact_result.get("data") or [{}])[0]
-                                contact_email = contact_data.get("Email", "")
-                                logger.info(f"[Deal {deal_id}] Step 4: Contact email resolved — {contact_email or '(empty)'}")
-                            except Exception as e:
-                                logger.warning(f"[Deal {deal_id}] Step 4: Could not fetch contact email — {e}")
-                        
-                        if contact_email:
-                            logger.info(f"[Deal {deal_id}] Step 4: Fetching Fireflies meeting notes for {contact_email}")
-                            meeting_text, meetings = fireflies_service.get_meetings_and_notes_for_email(contact_email)
-                            logger.info(f"[Deal {deal_id}] Step 4 done: Got {len(meeting_text)} chars of meeting notes, {len(meetings)} meeting(s)")
-                            logger.info(f"[Deal {deal_id}] Meeting notes:\n{meeting_text}")
-                        else:
-                            logger.info(f"[Deal {deal_id}] Step 4 done: No contact email — skipping Fireflies")
-                    else:
-                        logger.info(f"[Deal {deal_id}] Step 4 done: Fireflies not configured — skipped")
-                except Exception as e:
-                    logger.warning(f"[Deal {deal_id}] Step 4 failed: {e}")
-                
-                # Step 5: Run LLM deal analysis (main analysis + scoring rubric)
-                logger.info(f"[Deal {deal_id}] Step 5: Running LLM deal analysis (attachment_text={len(attachment_text)} chars, meeting_text={len(meeting_text)} chars)")
-                analysis = deal_analysis_service.analyze_deal(
-                    deal_data=deal_data,
-                    attachment_text=attachment_text if attachment_text else None,
-                    meeting_text=meeting_text if meeting_text else None
+                ((analysis, marketing_materials, similar_customers, meetings), from_cache), shared = (
+                    await _analysis_flights.run(
+                        deal_id, _run_analysis_pipeline,
+                        deal_id, deal_data, refresh_analysis, background_tasks,
+                    )
                 )
-                logger.info(f"[Deal {deal_id}] Step 5 done: LLM analysis complete — fit_score={analysis.fit_score}, confidence={analysis.confidence_level}")
-                
-                # Add support_required from Zoho if not already set
-                if not analysis.support_required and deal_data.get("Support_Required"):
-                    analysis.support_required = deal_data.get("Support_Required", "")
-                
+                if shared:
+                    logger.info(f"[Deal {deal_id}] Joined in-flight analysis from a concurrent request")
+                    from_cache = True
                 analysis_available = True
-                from_cache = False
-                
-                # Step 6: Search marketing materials
-                search_data = {
-                    "Company": deal_data.get("Deal_Name"),
-                    "Industry": deal_data.get("Industry") or analysis.vertical,
-                    "Description": deal_data.get("Description") or analysis.product_description,
-                }
-                
-                if marketing_vector_store.is_indexed:
-                    try:
-                        logger.info(f"[Deal {deal_id}] Step 6: Searching marketing materials in vector store")
-                        marketing_materials = marketing_vector_store.search_for_lead(search_data, top_k=5)
-                        logger.info(f"[Deal {deal_id}] Step 6 done: Found {len(marketing_materials)} marketing material(s)")
-                    except Exception as e:
-                        logger.warning(f"[Deal {deal_id}] Step 6 failed: {e}")
-                        marketing_materials = []
-                else:
-                    logger.info(f"[Deal {deal_id}] Step 6 done: Vector store not indexed — skipped")
-                
-                # Step 7: Find similar customers via LLM
-                try:
-                    logger.info(f"[Deal {deal_id}] Step 7: Finding similar customers via LLM")
-                    analysis_dict = analysis.model_dump() if hasattr(analysis, "model_dump") else analysis.dict()
-                    similar_customers = similar_customers_service.find_similar_customers(
-                        lead_data=search_data,
-                        analysis_data=analysis_dict
-                    )
-                    logger.info(f"[Deal {deal_id}] Step 7 done: Found {len(similar_customers)} similar customer(s)")
-                except Exception as e:
-                    logger.warning(f"[Deal {deal_id}] Step 7 failed: {e}")
-                    similar_customers = []
-                
-                # Step 8: Cache results in DynamoDB
-                if deal_analysis_cache.is_enabled:
-                    logger.info(f"[Deal {deal_id}] Step 8: Saving results to DynamoDB cache")
-                    deal_analysis_cache.save_analysis(
-                        deal_id, 
-                        analysis, 
-                        marketing_materials,
-                        similar_customers,
-                        meetings
-                    )
-                    logger.info(f"[Deal {deal_id}] Step 8 done: Cached successfully")
-                else:
-                    logger.info(f"[Deal {deal_id}] Step 8 done: DynamoDB cache disabled — skipped")
         
         logger.info(f"[Deal {deal_id}] === END get_deal (analysis_available={analysis_available}, from_cache={from_cache}) ===")
         
-        return EnrichedDealResponse(
-            data=deal_data,
-            analysis=analysis,
-            analysis_available=analysis_available,
-            from_cache=from_cache,
-            marketing_materials=marketing_materials,
-            similar_customers=similar_customers,
-            meetings=meetings,
+        # Serialized analysis parts: reused per cached entry on a hit, encoded
+        # fresh otherwise. The ETag covers this content, not just a summary of
+        # it, and leaves out from_cache so a MISS and the following HIT match.
+        if cached_data:
+            fragment = deal_analysis_cache.get_json_fragment(deal_id, cached_data)
+        else:
+            fragment = deal_analysis_cache.encode_fragment(
+                (analysis, marketing_materials, similar_customers, meetings)
+            )
+        
+        modified_time = deal_data.get("Modified_Time")
+        etag = compute_etag(
+            deal_id,
+            modified_time,
+            analysis_available,
+            full_fields,
+            content_digest(fragment),
         )
+        headers = {
+            "ETag": etag,
+            "Cache-Control": _DEAL_CACHE_CONTROL,
+            "X-Cache": "HIT" if cached_data else "MISS",
+        }
+        last_modified = to_http_date(modified_time)
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        
+        # Same shape as EnrichedDealResponse (meetings are already MeetingNote-shaped dicts)
+        body = b"".join((
+            b'{"data":',
+            orjson.dumps(deal_data),
+            b',"analysis_available":',
+            b"true" if analysis_available else b"false",
+            b',"from_cache":',
+            b"true" if from_cache else b"false",
+            b",",
+            fragment,
+            b"}",
+        ))
+        return Response(body, media_type="application/json", headers=headers)
         
     except HTTPException:
         raise
@@ -349,8 +844,96 @@ async def get_deal(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _cached_ndjson_lines(cached_data: tuple) -> List[bytes]:
+    """Encode a cached (analysis, materials, similar, meetings) tuple as NDJSON events."""
+    analysis, marketing_materials, similar_customers, meetings = cached_data
+    return [
+        ndjson_line("analysis", analysis.model_dump()),
+        ndjson_line("meetings", meetings),
+        ndjson_line("marketing_materials", marketing_materials),
+        ndjson_line("similar_customers", similar_customers),
+        ndjson_line("done", {"analysis_available": True, "from_cache": True}),
+    ]
+
+
+@router.get("/{deal_id}/stream")
+async def stream_deal(
+    background_tasks: BackgroundTasks,
+    deal_id: str = Path(..., description="Zoho Deal ID"),
+    refresh_analysis: bool = Query(False, description="Force regenerate analysis (ignore cache)"),
+    full_fields: bool = Query(False, description="Fetch every Zoho field instead of the analysis projection"),
+):
+    """
+    Stream a deal and its analysis as newline-delimited JSON.
+    
+    Runs the same pipeline as GET /deals/{deal_id} but emits each part as soon
+    as it is ready, so the client can render deal data before the LLM finishes.
+    
+    Each line is an object {"event": ..., "payload": ...} with events, in order:
+    data, analysis, meetings, marketing_materials, similar_customers, done.
+    An "error" event is emitted if the pipeline fails after streaming began.
+    """
+    # Fetch the deal up front so a missing deal is still a plain 404
+    deal_data = await _fetch_deal(deal_id, full_fields)
+    
+    async def generate():
+        yield ndjson_line("data", deal_data)
+        try:
+            if not bedrock_service.is_configured:
+                analysis = _placeholder_analysis(deal_data, skip_analysis=False)
+                yield ndjson_line("analysis", analysis.model_dump())
+                yield ndjson_line("done", {"analysis_available": False, "from_cache": False})
+                return
+            
+            cached_data = await _load_cached(deal_id, refresh_analysis)
+            if cached_data:
+                for line in _cached_ndjson_lines(cached_data):
+                    yield line
+                return
+            
+            async with _analysis_locks.hold(deal_id):
+                if not refresh_analysis:
+                    cached_data = await _load_cached(deal_id, refresh_analysis=False)
+                    if cached_data:
+                        for line in _cached_ndjson_lines(cached_data):
+                            yield line
+                        return
+                
+                attachment_text, (meeting_text, meetings) = await asyncio.gather(
+                    _extract_attachment_text(deal_id),
+                    _fetch_meeting_notes(deal_id, deal_data),
+                )
+                input_hash = await asyncio.to_thread(
+                    deal_analysis_service.compute_input_hash, deal_data, attachment_text, meeting_text
+                )
+                unchanged = await _load_if_unchanged(deal_id, input_hash) if refresh_analysis else None
+                if unchanged:
+                    for line in _cached_ndjson_lines(unchanged):
+                        yield line
+                    return
+                
+                analysis = await _analyze(deal_id, deal_data, attachment_text, meeting_text)
+                yield ndjson_line("analysis", analysis.model_dump())
+                yield ndjson_line("meetings", meetings)
+                
+                marketing_materials, similar_customers = await _find_related(deal_id, deal_data, analysis)
+                yield ndjson_line("marketing_materials", marketing_materials)
+                yield ndjson_line("similar_customers", similar_customers)
+                
+                _schedule_cache_save(
+                    deal_id, background_tasks, analysis, marketing_materials,
+                    similar_customers, meetings, input_hash,
+                )
+            yield ndjson_line("done", {"analysis_available": True, "from_cache": False})
+        except Exception as e:
+            logger.error(f"[Deal {deal_id}] === FAILED stream_deal: {e} ===")
+            yield ndjson_line("error", {"detail": str(e)})
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson", background=background_tasks)
+
+
 @router.post("/", response_model=DealResponse)
-async def create_deal(deal: DealCreate):
+async def create_deal(deal: DealCreate, background_tasks: BackgroundTasks):
     """
     Create a new deal in Zoho CRM.
     """
@@ -358,6 +941,9 @@ async def create_deal(deal: DealCreate):
         result = await zoho_crm_service.create_deal(deal.model_dump(exclude_none=True))
         
         if result.get("data"):
+            created_id = result["data"][0].get("details", {}).get("id")
+            if created_id and deal_stage_index.is_enabled:
+                background_tasks.add_task(_refresh_stage_index_entry, created_id)
             return DealResponse(data=result["data"][0])
         
         raise HTTPException(status_code=400, detail="Failed to create deal")
@@ -371,6 +957,7 @@ async def create_deal(deal: DealCreate):
 
 @router.put("/{deal_id}", response_model=DealResponse)
 async def update_deal(
+    background_tasks: BackgroundTasks,
     deal_id: str = Path(..., description="Zoho Deal ID"),
     deal: DealUpdate = ...,
 ):
@@ -384,6 +971,8 @@ async def update_deal(
         )
         
         if result.get("data"):
+            if deal_stage_index.is_enabled:
+                background_tasks.add_task(_refresh_stage_index_entry, deal_id)
             return DealResponse(data=result["data"][0])
         
         raise HTTPException(status_code=400, detail="Failed to update deal")
@@ -397,6 +986,7 @@ async def update_deal(
 
 @router.delete("/{deal_id}")
 async def delete_deal(
+    background_tasks: BackgroundTasks,
     deal_id: str = Path(..., description="Zoho Deal ID"),
 ):
     """
@@ -404,6 +994,8 @@ async def delete_deal(
     """
     try:
         await zoho_crm_service.delete_deal(deal_id)
+        if deal_stage_index.is_enabled:
+            background_tasks.add_task(deal_stage_index.remove_deal, deal_id)
         return {"message": "Deal deleted successfully", "id": deal_id}
         
     except Exception as e:
@@ -411,6 +1003,32 @@ async def delete_deal(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/webhook/zoho")
+async def zoho_deal_webhook(
+    background_tasks: BackgroundTasks,
+    deal_id: str = Body(..., embed=True, description="ID of the deal that changed"),
+    x_webhook_token: Optional[str] = Header(None),
+):
+    """
+    Zoho workflow webhook for deal changes.
+    
+    Configure a Zoho workflow rule on deal create/edit/stage change to POST
+    {"deal_id": "${Deals.Deal Id}"} here so the stage index picks up the
+    change without waiting for the next full stage sync. Requests must carry
+    ZOHO_WEBHOOK_TOKEN in the X-Webhook-Token header; with no token
+    configured the webhook is disabled (503).
+    """
+    if not settings.ZOHO_WEBHOOK_TOKEN:
+        # Never accept unauthenticated calls that trigger Zoho reads and index writes
+        raise HTTPException(status_code=503, detail="Webhook token not configured")
+    if not hmac.compare_digest((x_webhook_token or "").encode(), settings.ZOHO_WEBHOOK_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid webhook token")
+    
+    if deal_stage_index.is_enabled:
+        background_tasks.add_task(_refresh_stage_index_entry, deal_id)
+    return {"message": "Accepted", "id": deal_id}
+
+
 # @router.get("/search/")
 # async def search_deals(
 #     deal_name: Optional[str] = Query(None, description="Search by deal name"),
@@ -471,6 +1089,30 @@ async def delete_deal(
 #         raise HTTPException(status_code=500, detail=str(e))
 
 
+# (field, operator) pairs OR-ed together for a broad search_query
+_BROAD_SEARCH_FIELDS = (
+    ("Deal_Name", "starts_with"),
+    ("Account_Name", "starts_with"),
+    ("Contact_Name", "starts_with"),
+    ("Owner.name", "equals"),
+)
+# Query parameter -> (field, operator) for targeted searches
+_SEARCH_FIELDS = {
+    "deal_name": ("Deal_Name", "starts_with"),
+    "account_name": ("Account_Name", "starts_with"),
+    "contact_name": ("Contact_Name", "starts_with"),
+    "stage": ("Stage", "equals"),
+}
+
+
+def _clean_or_400(value: str) -> str:
+    """Validate a search term, turning bad input into a 400."""
+    try:
+        return validate_search_term(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/search/")
 async def search_deals(
     search_query: Optional[str] = Query(
@@ -503,26 +1145,23 @@ async def search_deals(
             search_criteria = criteria
         elif search_query:
             # Search across multiple fields using OR
-            conditions = [
-                f"(Deal_Name:starts_with:{search_query})",
-                f"(Account_Name:starts_with:{search_query})",
-                f"(Contact_Name:starts_with:{search_query})",
-                f"(Owner.name:equals:{search_query})"
-            ]
-            # Proper OR formatting: (((condition1)or(condition2)or(condition3)))
-            search_criteria = "((" + ")or(".join(conditions) + "))"
-            
+            q = _clean_or_400(search_query)
+            search_criteria = build_criteria(
+                tuple((field, op, q) for field, op in _BROAD_SEARCH_FIELDS), "or"
+            )
         else:
             # Individual field searches
-            conditions = []
-            if deal_name:
-                conditions.append(f"(Deal_Name:starts_with:{deal_name})")
-            if account_name:
-                conditions.append(f"(Account_Name:starts_with:{account_name})")
-            if contact_name:
-                conditions.append(f"(Contact_Name:starts_with:{contact_name})")
-            if stage:
-                conditions.append(f"(Stage:equals:{stage})")
+            values = {
+                "deal_name": deal_name,
+                "account_name": account_name,
+                "contact_name": contact_name,
+                "stage": stage,
+            }
+            conditions = tuple(
+                (*_SEARCH_FIELDS[param], _clean_or_400(value))
+                for param, value in values.items()
+                if value
+            )
             
             if not conditions:
                 raise HTTPException(
@@ -530,11 +1169,8 @@ async def search_deals(
                     detail="At least one search parameter is required"
                 )
             
-            # Properly format multiple conditions with AND
-            if len(conditions) > 1:
-                search_criteria = "((" + ")and(".join(conditions) + "))"
-            else:
-                search_criteria = conditions[0]
+            # Multiple conditions are combined with AND
+            search_criteria = build_criteria(conditions)
         
         logger.info(f"Search criteria: {search_criteria}")
         result = await zoho_crm_service.search_deals(
@@ -548,10 +1184,10 @@ async def search_deals(
         info.setdefault("page", page)
         info.setdefault("per_page", per_page)
         info.setdefault("more_records", False)
-        return {
+        return ORJSONResponse({
             "data": data,
             "info": info,
-        }
+        })
         
     except HTTPException:
         raise
@@ -2,11 +2,19 @@
 Lead management endpoints.
 """
 import asyncio
-from typing import Optional, List
-from fastapi import APIRouter, Query, Path, HTTPException
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Query, Path, HTTPException, Body
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from loguru import logger
 
+from app.core.cache import TTLCache
+from app.core.concurrency import bedrock_limit
+from app.core.config import settings
+from app.core.streaming import ndjson_line
 from app.services.zoho.crm_service import zoho_crm_service
+from app.services.zoho.criteria import build_criteria, validate_search_term
 from app.services.llm.bedrock_service import lead_analysis_service, bedrock_service
 from app.services.llm.similar_customers_service import similar_customers_service
 from app.services.dynamodb.lead_cache import lead_analysis_cache
@@ -15,6 +23,7 @@ from app.services.document.extractor import document_extractor
 from app.services.web.scraper import website_scraper
 from app.schemas.lead import (
     LeadResponse,
+    LeadBulkResponse,
     LeadListResponse,
     LeadCreate,
     LeadUpdate,
@@ -23,6 +32,9 @@ from app.schemas.lead_analysis import EnrichedLeadResponse, LeadAnalysis
 
 router = APIRouter()
 
+# Lead IDs Zoho recently reported as missing; repeat lookups 404 without a round-trip
+_missing_leads = TTLCache(maxsize=10_000, ttl=settings.LEAD_NOT_FOUND_CACHE_TTL)
+
 @router.get("/", response_model=LeadListResponse)
 async def list_leads(
     page: int = Query(1, ge=1, description="Page number"),
@@ -49,20 +61,21 @@ async def list_leads(
     
     By default, when filtering by lead_source (e.g., LinkedIn Ads), ALL matching leads 
     are fetched by paginating through all results. Set fetch_all=false to use pagination.
+    With fetch_all=true the response is streamed as each Zoho page arrives.
     """
     try:
-        field_list = fields.split(",") if fields else None
+        field_list = _parse_fields(fields) if fields else None
         
         # If lead_source filter is provided
         if lead_source:
-            criteria = f"(Lead_Source:equals:{lead_source})"
+            criteria = build_criteria((("Lead_Source", "equals", _clean_or_400(lead_source)),))
             
             if fetch_all:
-                # Fetch ALL matching leads by paginating through all pages
-                logger.info(f"Fetching ALL leads with source: {lead_source}")
-                result = await zoho_crm_service.search_all_leads(
-                    criteria=criteria,
-                    fields=field_list,
+                # Stream ALL matching leads page by page instead of buffering them
+                logger.info(f"Streaming ALL leads with source: {lead_source}")
+                return StreamingResponse(
+                    _stream_all_leads(criteria, field_list),
+                    media_type="application/json",
                 )
             else:
                 # Use regular pagination
@@ -84,24 +97,278 @@ async def list_leads(
         leads = result.get("data", [])
         info = result.get("info", {})
         
-        return LeadListResponse(
-            data=leads,
-            page=info.get("page", page),
-            per_page=info.get("per_page", per_page),
-            total_count=info.get("count", len(leads)),
-            more_records=info.get("more_records", False),
-        )
+        # Same shape as LeadListResponse; leads are already plain dicts from Zoho
+        return ORJSONResponse({
+            "data": leads,
+            "page": info.get("page", page),
+            "per_page": info.get("per_page", per_page),
+            "total_count": info.get("count", len(leads)),
+            "more_records": info.get("more_records", False),
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching leads: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Fields clients may request in lead lists
+_ALLOWED_LEAD_FIELDS = frozenset(zoho_crm_service.DEFAULT_LEAD_FIELDS)
+
+
+@lru_cache(maxsize=512)
+def _parse_fields(spec: str) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated fields parameter into known lead field names.
+    
+    Unknown and duplicate names are dropped before the request reaches Zoho;
+    the result is a tuple so it can be shared between requests.
+    
+    Raises:
+        HTTPException: 400 if no requested field is allowed
+    """
+    requested = (name.strip() for name in spec.split(","))
+    field_list = tuple(dict.fromkeys(name for name in requested if name in _ALLOWED_LEAD_FIELDS))
+    if not field_list:
+        raise HTTPException(status_code=400, detail="No valid fields requested")
+    return field_list
+
+
+async def _stream_all_leads(criteria: str, field_list: Optional[List[str]]):
+    """
+    Yield a LeadListResponse-shaped JSON document one Zoho page at a time.
+    
+    The leads array is written as pages arrive; the totals follow it once
+    the last page is in.
+    """
+    total = 0
+    yield b'{"data":['
+    async for leads in zoho_crm_service.iter_search_leads_pages(criteria, field_list):
+        chunk = orjson.dumps(leads)[1:-1]
+        yield chunk if total == 0 else b"," + chunk
+        total += len(leads)
+    yield b'],' + orjson.dumps({
+        "page": 1,
+        "per_page": total,
+        "total_count": total,
+        "more_records": False,
+    })[1:]
+
+
+async def _fetch_lead(lead_id: str, fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    """Step 1: Fetch lead data from Zoho (404 if missing), optionally only some fields."""
+    if lead_id in _missing_leads:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    
+    result = await zoho_crm_service.get_lead_by_id(lead_id, fields=fields)
+    if not result.get("data"):
+        _missing_leads.set(lead_id, True)
+        raise HTTPException(status_code=404, detail="Lead not found")
+    return result["data"][0]
+
+
+_SKIPPED_TEMPLATE = LeadAnalysis(
+    company_name="Unknown",
+    country="Unknown",
+    region="Unknown",
+    product_description="Analysis skipped",
+    vertical="Unknown",
+    business_model="Unknown",
+    motion="Unknown",
+    raise_stage="Unknown",
+    company_size="Unknown",
+    likely_icp_canada="Unknown",
+    fit_score=5,
+    fit_assessment="Analysis was explicitly skipped",
+    key_insights=[],
+    questions_to_ask=[],
+    confidence_level="Low",
+    notes=["Analysis was skipped by user request"],
+)
+
+# Lead fields _placeholder_analysis reads, always fetched with a fields projection
+_PLACEHOLDER_FIELDS = ("Company", "Country", "Industry")
+
+_NO_BEDROCK_TEMPLATE = LeadAnalysis(
+    company_name="Unknown",
+    country="Unknown",
+    region="Unknown",
+    product_description="Unable to analyze - LLM not configured",
+    vertical="Unknown",
+    business_model="Unknown",
+    motion="Unknown",
+    raise_stage="Unknown",
+    company_size="Unknown",
+    likely_icp_canada="Unknown",
+    fit_score=5,
+    fit_assessment="Analysis not available - AWS Bedrock not configured",
+    key_insights=[],
+    questions_to_ask=[
+        "What is your core product and who is your primary customer?",
+        "Have you explored the Canadian market before?",
+        "What is your current GTM motion?",
+        "What stage of funding are you at?",
+        "What would success in Canada look like for you?",
+    ],
+    confidence_level="Low",
+    notes=["AWS Bedrock LLM not configured"],
+)
+
+
+def _placeholder_analysis(lead_data: Dict[str, Any], skip_analysis: bool) -> LeadAnalysis:
+    """Build the analysis returned when analysis is skipped or Bedrock is not configured."""
+    template = _SKIPPED_TEMPLATE if skip_analysis else _NO_BEDROCK_TEMPLATE
+    return template.model_copy(update={
+        "company_name": lead_data.get("Company") or "Unknown",
+        "country": lead_data.get("Country") or "Unknown",
+        "vertical": lead_data.get("Industry") or "Unknown",
+    })
+
+
+async def _extract_attachment_text(lead_id: str) -> str:
+    """Step 2b: Fetch attachments (pitch decks, PDFs, etc.) and extract their text."""
+    attachment_text = ""
+    try:
+        logger.info(f"Fetching attachments for lead {lead_id}...")
+        attachments = await zoho_crm_service.get_lead_attachments_with_content(lead_id)
+        
+        if attachments:
+            logger.info(f"Found {len(attachments)} attachments for lead {lead_id}")
+            
+            # Extract text from documents
+            extractions = await document_extractor.extract_from_attachments(attachments)
+            
+            if extractions:
+                attachment_text = document_extractor.combine_extracted_text(extractions)
+                logger.info(f"Extracted {len(attachment_text)} chars from {len(extractions)} documents")
+        else:
+            logger.debug(f"No attachments found for lead {lead_id}")
+            
+    except Exception as e:
+        logger.warning(f"Error fetching/extracting attachments: {e}")
+    return attachment_text
+
+
+async def _scrape_profiles(lead_id: str, lead_data: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Step 2b2: Scrape the lead's website and LinkedIn profile in parallel (best-effort).
+    
+    Returns:
+        Tuple of (website_text, linkedin_text), None where unavailable
+    """
+    website_url = lead_data.get("Website") or ""
+    linkedin_url = lead_data.get("LinkedIn_Profile") or ""
+    website_text = None
+    linkedin_text = None
+    
+    scrape_tasks = []
+    if website_url.strip():
+        scrape_tasks.append(("website", website_scraper.fetch_page_text(website_url)))
+    if linkedin_url.strip():
+        scrape_tasks.append(("linkedin", website_scraper.fetch_page_text(linkedin_url)))
+    
+    if scrape_tasks:
+        logger.info(f"Scraping {len(scrape_tasks)} URL(s) for lead {lead_id}: "
+                    f"website={'yes' if website_url.strip() else 'no'}, "
+                    f"linkedin={'yes' if linkedin_url.strip() else 'no'}")
+        try:
+            results = await asyncio.gather(
+                *[task for _, task in scrape_tasks],
+                return_exceptions=True
+            )
+            for (label, _), result in zip(scrape_tasks, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Scrape failed for {label}: {result}")
+                elif result:
+                    if label == "website":
+                        website_text = result
+                        logger.info(f"Scraped {len(result)} chars from website")
+                    else:
+                        linkedin_text = result
+                        logger.info(f"Scraped {len(result)} chars from LinkedIn")
+        except Exception as e:
+            logger.warning(f"Error during parallel scraping: {e}")
+    return website_text, linkedin_text
+
+
+async def _generate_analysis(
+    lead_data: Dict[str, Any],
+    attachment_text: str,
+    website_text: Optional[str],
+    linkedin_text: Optional[str],
+) -> Tuple[LeadAnalysis, Optional[str]]:
+    """
+    Step 2c: Generate the analysis using Bedrock LLM (including all enriched content).
+    
+    Reuses the analysis of any lead with the same company profile and
+    enrichment content (looked up by input signature) before calling Bedrock.
+    
+    Returns:
+        Tuple of (analysis, signature) where signature is None if the analysis
+        is the fallback returned when the LLM failed and must not be shared
+    """
+    signature = await asyncio.to_thread(
+        lead_analysis_service.compute_signature, lead_data, attachment_text, website_text, linkedin_text
+    )
+    if lead_analysis_cache.is_enabled:
+        analysis = await lead_analysis_cache.get_by_signature(signature)
+        if analysis is not None:
+            return analysis, signature
+    
+    analysis = await bedrock_limit.to_thread(
+        lead_analysis_service.analyze_lead,
+        lead_data=lead_data,
+        attachment_text=attachment_text if attachment_text else None,
+        website_text=website_text,
+        linkedin_text=linkedin_text,
+    )
+    if lead_analysis_service.is_fallback(analysis):
+        return analysis, None
+    return analysis, signature
+
+
+async def _search_marketing_materials(lead_id: str, lead_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Step 2d: Get relevant marketing materials (if indexed)."""
+    if not marketing_vector_store.is_indexed:
+        return []
+    try:
+        marketing_materials = await asyncio.to_thread(marketing_vector_store.search_for_lead, lead_data, top_k=5)
+        logger.info(f"Found {len(marketing_materials)} relevant marketing materials for lead {lead_id}")
+        return marketing_materials
+    except Exception as e:
+        logger.warning(f"Error fetching marketing materials: {e}")
+        return []
+
+
+async def _find_similar_customers(
+    lead_id: str,
+    lead_data: Dict[str, Any],
+    analysis: LeadAnalysis,
+) -> List[Dict[str, Any]]:
+    """Step 2e: Find similar customers using LLM."""
+    try:
+        similar_customers = await bedrock_limit.to_thread(
+            similar_customers_service.find_similar_customers,
+            lead_data=lead_data,
+            analysis_data=analysis,
+        )
+        logger.info(f"Found {len(similar_customers)} similar customers for lead {lead_id}")
+        return similar_customers
+    except Exception as e:
+        logger.warning(f"Error finding similar customers: {e}")
+        return []
+
+
 @router.get("/{lead_id}", response_model=EnrichedLeadResponse)
 async def get_lead(
     lead_id: str = Path(..., description="Zoho Lead ID"),
     skip_analysis: bool = Query(False, description="Skip LLM analysis and return only lead data"),
     refresh_analysis: bool = Query(False, description="Force regenerate analysis (ignore cache)"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated lead fields to return (only with skip_analysis=true)"
+    ),
 ):
     """
     Get a specific lead by ID with AI-powered Canada market fit analysis.
@@ -125,15 +392,15 @@ async def get_lead(
     Query Parameters:
     - skip_analysis=true: Return only lead data without any analysis
     - refresh_analysis=true: Force regenerate analysis (ignore cache)
+    - fields: With skip_analysis=true, fetch only these fields from Zoho
+      (e.g. for list tiles); analysis always needs the full record
     """
     try:
-        # Step 1: Fetch lead data from Zoho
-        result = await zoho_crm_service.get_lead_by_id(lead_id)
-        
-        if not result.get("data"):
-            raise HTTPException(status_code=404, detail="Lead not found")
-        
-        lead_data = result["data"][0]
+        # Step 1: Fetch lead data from Zoho (projected when analysis is skipped)
+        field_list = None
+        if skip_analysis and fields:
+            field_list = tuple(dict.fromkeys(_parse_fields(fields) + _PLACEHOLDER_FIELDS))
+        lead_data = await _fetch_lead(lead_id, field_list)
         
         # Step 2: Handle analysis
         marketing_materials = []
@@ -141,53 +408,13 @@ async def get_lead(
         
         if skip_analysis:
             # Return default analysis if explicitly skipped
-            analysis = LeadAnalysis(
-                company_name=lead_data.get("Company") or "Unknown",
-                country=lead_data.get("Country") or "Unknown",
-                region="Unknown",
-                product_description="Analysis skipped",
-                vertical=lead_data.get("Industry") or "Unknown",
-                business_model="Unknown",
-                motion="Unknown",
-                raise_stage="Unknown",
-                company_size="Unknown",
-                likely_icp_canada="Unknown",
-                fit_score=5,
-                fit_assessment="Analysis was explicitly skipped",
-                key_insights=[],
-                questions_to_ask=[],
-                confidence_level="Low",
-                notes=["Analysis was skipped by user request"],
-            )
+            analysis = _placeholder_analysis(lead_data, skip_analysis=True)
             analysis_available = False
             from_cache = False
         elif not bedrock_service.is_configured:
             # Bedrock not configured
             logger.warning("AWS Bedrock not configured, returning default analysis")
-            analysis = LeadAnalysis(
-                company_name=lead_data.get("Company") or "Unknown",
-                country=lead_data.get("Country") or "Unknown",
-                region="Unknown",
-                product_description="Unable to analyze - LLM not configured",
-                vertical=lead_data.get("Industry") or "Unknown",
-                business_model="Unknown",
-                motion="Unknown",
-                raise_stage="Unknown",
-                company_size="Unknown",
-                likely_icp_canada="Unknown",
-                fit_score=5,
-                fit_assessment="Analysis not available - AWS Bedrock not configured",
-                key_insights=[],
-                questions_to_ask=[
-                    "What is your core product and who is your primary customer?",
-                    "Have you explored the Canadian market before?",
-                    "What is your current GTM motion?",
-                    "What stage of funding are you at?",
-                    "What would success in Canada look like for you?",
-                ],
-                confidence_level="Low",
-                notes=["AWS Bedrock LLM not configured"],
-            )
+            analysis = _placeholder_analysis(lead_data, skip_analysis=False)
             analysis_available = False
             from_cache = False
         else:
@@ -195,7 +422,7 @@ async def get_lead(
             cached_data = None
             
             if not refresh_analysis and lead_analysis_cache.is_enabled:
-                cached_data = lead_analysis_cache.get_cached_data(lead_id)
+                cached_data = await lead_analysis_cache.get_cached_data(lead_id)
             
             if cached_data:
                 # Use cached analysis, marketing materials, and similar customers
@@ -204,111 +431,45 @@ async def get_lead(
                 analysis_available = True
                 from_cache = True
             else:
-                # Step 2b: Fetch and extract text from attachments (pitch decks, PDFs, etc.)
-                attachment_text = ""
-                try:
-                    logger.info(f"Fetching attachments for lead {lead_id}...")
-                    attachments = await zoho_crm_service.get_lead_attachments_with_content(lead_id)
-                    
-                    if attachments:
-                        logger.info(f"Found {len(attachments)} attachments for lead {lead_id}")
-                        
-                        # Extract text from documents
-                        extractions = document_extractor.extract_from_attachments(attachments)
-                        
-                        if extractions:
-                            attachment_text = document_extractor.combine_extracted_text(extractions)
-                            logger.info(f"Extracted {len(attachment_text)} chars from {len(extractions)} documents")
-                    else:
-                        logger.debug(f"No attachments found for lead {lead_id}")
-                        
-                except Exception as e:
-                    logger.warning(f"Error fetching/extracting attachments: {e}")
-                
-                # Step 2b2: Scrape Website and LinkedIn profile in parallel (best-effort)
-                website_url = lead_data.get("Website") or ""
-                linkedin_url = lead_data.get("LinkedIn_Profile") or ""
-                website_text = None
-                linkedin_text = None
-                
-                scrape_tasks = []
-                if website_url.strip():
-                    scrape_tasks.append(("website", website_scraper.fetch_page_text(website_url)))
-                if linkedin_url.strip():
-                    scrape_tasks.append(("linkedin", website_scraper.fetch_page_text(linkedin_url)))
-                
-                if scrape_tasks:
-                    logger.info(f"Scraping {len(scrape_tasks)} URL(s) for lead {lead_id}: "
-                                f"website={'yes' if website_url.strip() else 'no'}, "
-                                f"linkedin={'yes' if linkedin_url.strip() else 'no'}")
-                    try:
-                        results = await asyncio.gather(
-                            *[task for _, task in scrape_tasks],
-                            return_exceptions=True
-                        )
-                        for (label, _), result in zip(scrape_tasks, results):
-                            if isinstance(result, Exception):
-                                logger.warning(f"Scrape failed for {label}: {result}")
-                            elif result:
-                                if label == "website":
-                                    website_text = result
-                                    logger.info(f"Scraped {len(result)} chars from website")
-                                else:
-                                    linkedin_text = result
-                                    logger.info(f"Scraped {len(result)} chars from LinkedIn")
-                    except Exception as e:
-                        logger.warning(f"Error during parallel scraping: {e}")
+                # Steps 2b-2b2: Attachments and website/LinkedIn scrapes are independent,
+                # so fetch them together (each step logs and swallows its own failures)
+                attachment_text, (website_text, linkedin_text) = await asyncio.gather(
+                    _extract_attachment_text(lead_id),
+                    _scrape_profiles(lead_id, lead_data),
+                )
                 
-                # Step 2c: Generate new analysis using Bedrock LLM (including all enriched content)
+                # Steps 2c-2d: The LLM analysis and the marketing search only need the
+                # lead data, so run them concurrently
                 logger.info(f"Generating LLM analysis for lead {lead_id}")
-                analysis = lead_analysis_service.analyze_lead(
-                    lead_data=lead_data,
-                    attachment_text=attachment_text if attachment_text else None,
-                    website_text=website_text,
-                    linkedin_text=linkedin_text,
+                (analysis, signature), marketing_materials = await asyncio.gather(
+                    _generate_analysis(lead_data, attachment_text, website_text, linkedin_text),
+                    _search_marketing_materials(lead_id, lead_data),
                 )
                 analysis_available = True
                 from_cache = False
                 
-                # Step 2d: Get relevant marketing materials (if indexed)
-                if marketing_vector_store.is_indexed:
-                    try:
-                        marketing_materials = marketing_vector_store.search_for_lead(lead_data, top_k=5)
-                        logger.info(f"Found {len(marketing_materials)} relevant marketing materials for lead {lead_id}")
-                    except Exception as e:
-                        logger.warning(f"Error fetching marketing materials: {e}")
-                        marketing_materials = []
-                
-                # Step 2e: Find similar customers using LLM
-                try:
-                    # Convert analysis to dict for context
-                    analysis_dict = analysis.model_dump() if hasattr(analysis, "model_dump") else analysis.dict()
-                    similar_customers = similar_customers_service.find_similar_customers(
-                        lead_data=lead_data,
-                        analysis_data=analysis_dict
-                    )
-                    logger.info(f"Found {len(similar_customers)} similar customers for lead {lead_id}")
-                except Exception as e:
-                    logger.warning(f"Error finding similar customers: {e}")
-                    similar_customers = []
+                # Step 2e: Find similar customers using LLM (needs the analysis)
+                similar_customers = await _find_similar_customers(lead_id, lead_data, analysis)
                 
                 # Step 2f: Cache everything in DynamoDB
                 if lead_analysis_cache.is_enabled:
-                    lead_analysis_cache.save_analysis(
-                        lead_id, 
+                    await lead_analysis_cache.save_analysis(
+                        lead_id,
                         analysis, 
                         marketing_materials,
-                        similar_customers
+                        similar_customers,
+                        signature=signature,
                     )
         
-        return EnrichedLeadResponse(
-            data=lead_data,
-            analysis=analysis,
-            analysis_available=analysis_available,
-            from_cache=from_cache,
-            marketing_materials=marketing_materials,
-            similar_customers=similar_customers,
-        )
+        # Same shape as EnrichedLeadResponse
+        return ORJSONResponse({
+            "data": lead_data,
+            "analysis": analysis.model_dump(mode="json"),
+            "analysis_available": analysis_available,
+            "from_cache": from_cache,
+            "marketing_materials": marketing_materials,
+            "similar_customers": similar_customers,
+        })
         
     except HTTPException:
         raise
@@ -317,6 +478,83 @@ async def get_lead(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{lead_id}/stream")
+async def stream_lead(
+    lead_id: str = Path(..., description="Zoho Lead ID"),
+    refresh_analysis: bool = Query(False, description="Force regenerate analysis (ignore cache)"),
+):
+    """
+    Stream a lead and its analysis as newline-delimited JSON.
+    
+    Runs the same pipeline as GET /leads/{lead_id} but emits each part as soon
+    as it is ready, so the client can render lead data before the LLM finishes.
+    
+    Each line is an object {"event": ..., "payload": ...} with events: data,
+    then analysis and marketing_materials (whichever finishes first), then
+    similar_customers and done. An "error" event is emitted if the pipeline
+    fails after streaming began.
+    """
+    # Fetch the lead up front so a missing lead is still a plain 404
+    lead_data = await _fetch_lead(lead_id)
+    
+    async def tagged(event: str, coro):
+        return event, await coro
+    
+    async def generate():
+        yield ndjson_line("data", lead_data)
+        try:
+            if not bedrock_service.is_configured:
+                yield ndjson_line("analysis", _placeholder_analysis(lead_data, skip_analysis=False).model_dump())
+                yield ndjson_line("done", {"analysis_available": False, "from_cache": False})
+                return
+            
+            cached_data = None
+            if not refresh_analysis and lead_analysis_cache.is_enabled:
+                cached_data = await lead_analysis_cache.get_cached_data(lead_id)
+            if cached_data:
+                analysis, marketing_materials, similar_customers = cached_data
+                yield ndjson_line("analysis", analysis.model_dump())
+                yield ndjson_line("marketing_materials", marketing_materials)
+                yield ndjson_line("similar_customers", similar_customers)
+                yield ndjson_line("done", {"analysis_available": True, "from_cache": True})
+                return
+            
+            attachment_text, (website_text, linkedin_text) = await asyncio.gather(
+                _extract_attachment_text(lead_id),
+                _scrape_profiles(lead_id, lead_data),
+            )
+            
+            for next_done in asyncio.as_completed([
+                tagged("analysis", _generate_analysis(lead_data, attachment_text, website_text, linkedin_text)),
+                tagged("marketing_materials", _search_marketing_materials(lead_id, lead_data)),
+            ]):
+                event, value = await next_done
+                if event == "analysis":
+                    analysis, signature = value
+                    yield ndjson_line("analysis", analysis.model_dump())
+                else:
+                    marketing_materials = value
+                    yield ndjson_line("marketing_materials", marketing_materials)
+            
+            similar_customers = await _find_similar_customers(lead_id, lead_data, analysis)
+            yield ndjson_line("similar_customers", similar_customers)
+            
+            if lead_analysis_cache.is_enabled:
+                await lead_analysis_cache.save_analysis(
+                    lead_id,
+                    analysis,
+                    marketing_materials,
+                    similar_customers,
+                    signature=signature,
+                )
+            yield ndjson_line("done", {"analysis_available": True, "from_cache": False})
+        except Exception as e:
+            logger.error(f"Error streaming lead {lead_id}: {e}")
+            yield ndjson_line("error", {"detail": str(e)})
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.post("/", response_model=LeadResponse)
 async def create_lead(lead: LeadCreate):
     """
@@ -337,6 +575,37 @@ async def create_lead(lead: LeadCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/bulk", response_model=LeadBulkResponse)
+async def create_leads_bulk(
+    leads: List[LeadCreate] = Body(
+        ...,
+        min_length=1,
+        max_length=zoho_crm_service.MAX_RECORDS_PER_WRITE,
+        description="Leads to create (at most 100 per request)",
+    ),
+):
+    """
+    Create multiple leads in Zoho CRM with a single API call.
+    
+    Zoho reports success or failure per record, so a partially failed batch
+    still returns 200 with the failures counted in `failed`.
+    """
+    try:
+        result = await zoho_crm_service.create_leads_bulk(
+            [lead.model_dump(exclude_none=True) for lead in leads]
+        )
+        records = result.get("data", [])
+        created = sum(1 for record in records if record.get("status") == "success")
+        logger.info(f"Bulk lead insert: {created} created, {len(records) - created} failed")
+        return LeadBulkResponse(data=records, created=created, failed=len(records) - created)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating leads in bulk: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.put("/{lead_id}", response_model=LeadResponse)
 async def update_lead(
     lead_id: str = Path(..., description="Zoho Lead ID"),
@@ -444,6 +713,36 @@ async def delete_lead(
 #         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Criteria templates for search_leads
+# (field, operator) pairs OR-ed together for a broad search_query
+_BROAD_SEARCH_FIELDS = (
+    ("First_Name", "starts_with"),
+    ("Last_Name", "starts_with"),
+    ("Email", "starts_with"),
+    ("Company", "starts_with"),
+    ("Owner.name", "equals"),
+)
+# (field, operator) pairs OR-ed together for the name parameter
+_NAME_SEARCH_FIELDS = (
+    ("First_Name", "starts_with"),
+    ("Last_Name", "starts_with"),
+)
+# Query parameter -> (field, operator) for targeted searches
+_SEARCH_FIELDS = {
+    "email": ("Email", "equals"),
+    "phone": ("Phone", "equals"),
+    "company": ("Company", "equals"),
+}
+
+
+def _clean_or_400(value: str) -> str:
+    """Validate a search term, turning bad input into a 400."""
+    try:
+        return validate_search_term(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/search/")
 async def search_leads(
     search_query: Optional[str] = Query(
@@ -469,34 +768,25 @@ async def search_leads(
         if criteria:
             search_criteria = criteria
         elif search_query:
-            # FIXED: Proper OR formatting for Zoho CRM
-            # Each condition needs proper parentheses and 'or' between them
-            conditions = [
-                f"(First_Name:starts_with:{search_query})",
-                f"(Last_Name:starts_with:{search_query})",
-                f"(Email:starts_with:{search_query})",  # Changed from contains
-                f"(Company:starts_with:{search_query})",
-                f"(Owner.name:equals:{search_query})"
-            ]
-            # Join with ' or ' (note the spaces)
-            search_criteria = "((" + ")or(".join(conditions) + "))"
-            
+            # Search across multiple fields using OR
+            q = _clean_or_400(search_query)
+            search_criteria = build_criteria(
+                tuple((field, op, q) for field, op in _BROAD_SEARCH_FIELDS), "or"
+            )
         else:
-            # Individual field searches
+            # Individual field searches; each part is already parenthesized
             conditions = []
             if name:
-                name_conditions = [
-                    f"(First_Name:starts_with:{name})",
-                    f"(Last_Name:starts_with:{name})",
-                ]
-                # For name search with OR
-                conditions.append("((" + ")or(".join(name_conditions) + "))")
-            if email:
-                conditions.append(f"(Email:equals:{email})")
-            if phone:
-                conditions.append(f"(Phone:equals:{phone})")
-            if company:
-                conditions.append(f"(Company:equals:{company})")
+                n = _clean_or_400(name)
+                conditions.append(build_criteria(
+                    tuple((field, op, n) for field, op in _NAME_SEARCH_FIELDS), "or"
+                ))
+            values = {"email": email, "phone": phone, "company": company}
+            conditions.extend(
+                build_criteria(((*_SEARCH_FIELDS[param], _clean_or_400(value)),))
+                for param, value in values.items()
+                if value
+            )
             
             if not conditions:
                 raise HTTPException(
@@ -504,9 +794,9 @@ async def search_leads(
                     detail="At least one search parameter is required"
                 )
             
-            # Join multiple conditions with 'and'
+            # Multiple conditions are combined with AND
             if len(conditions) > 1:
-                search_criteria = "((" + ")and(".join(conditions) + "))"
+                search_criteria = "(" + "and".join(conditions) + ")"
             else:
                 search_criteria = conditions[0]
         
@@ -6,15 +6,18 @@ Provides:
 - Search for relevant materials
 - Get vector store status
 """
-import os
-import shutil
+import asyncio
+import tempfile
+from pathlib import Path
 from typing import Optional, List
-from fastapi import APIRouter, UploadFile, File, Query, HTTPException
-from fastapi.responses import JSONResponse
+import aiofiles
+from fastapi import APIRouter, UploadFile, File, Query, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
 from loguru import logger
 
 from app.services.vector.marketing_vector_store import marketing_vector_store
 from app.core.config import settings
+from app.core.etag import compute_etag, is_not_modified
 
 router = APIRouter()
 
@@ -22,6 +25,12 @@ router = APIRouter()
 UPLOAD_DIR = settings.BASE_DIR / "data" / "uploads"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# Bytes read from the upload per write
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Material pages only change on re-index; clients reuse them, then revalidate with If-None-Match
+_MATERIALS_CACHE_CONTROL = "private, max-age=300"
+
 
 @router.post("/index")
 async def index_marketing_materials(
@@ -38,24 +47,36 @@ async def index_marketing_materials(
     - Other Notes: Additional notes
     
     This is a one-time operation. Re-uploading will replace the existing index.
+    Files larger than MARKETING_UPLOAD_MAX_BYTES are rejected with 413.
     """
-    # Validate file type
-    if not file.filename.endswith(('.xlsx', '.xls')):
+    # Validate file type; ingestion streams rows with openpyxl, which can't read legacy .xls
+    if not file.filename.endswith('.xlsx'):
         raise HTTPException(
             status_code=400,
-            detail="Invalid file type. Please upload an Excel file (.xlsx or .xls)"
+            detail="Invalid file type. Please upload an Excel file (.xlsx)"
         )
     
     try:
-        # Save uploaded file
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        logger.info(f"Uploaded file saved: {file_path}")
-        
-        # Index the materials
-        result = marketing_vector_store.index_from_excel(str(file_path))
+        # Per-request directory: concurrent uploads of the same filename don't collide,
+        # and the file is removed with it
+        with tempfile.TemporaryDirectory(dir=UPLOAD_DIR) as upload_dir:
+            # Save uploaded file in chunks, stopping as soon as it exceeds the cap
+            file_path = Path(upload_dir) / Path(file.filename).name
+            size = 0
+            async with aiofiles.open(file_path, "wb") as buffer:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > settings.MARKETING_UPLOAD_MAX_BYTES:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File too large (max {settings.MARKETING_UPLOAD_MAX_BYTES} bytes)"
+                        )
+                    await buffer.write(chunk)
+            
+            logger.info(f"Uploaded file saved: {file_path} ({size} bytes)")
+            
+            # Index the materials (parsing and embedding block, so keep them off the event loop)
+            result = await asyncio.to_thread(marketing_vector_store.index_from_excel, str(file_path))
         
         if result["success"]:
             return JSONResponse(
@@ -77,10 +98,6 @@ async def index_marketing_materials(
     except Exception as e:
         logger.error(f"Error processing upload: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        # Clean up uploaded file
-        if file_path.exists():
-            os.remove(file_path)
 
 
 @router.get("/search")
@@ -144,11 +161,15 @@ async def clear_marketing_index():
 
 @router.get("/materials")
 async def list_indexed_materials(
+    request: Request,
     limit: int = Query(50, ge=1, le=200, description="Maximum materials to return"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
 ):
     """
     List all indexed marketing materials.
+    
+    Pages carry an ETag derived from the indexed materials, so repeat reads
+    are answered with 304 Not Modified until the index changes.
     """
     if not marketing_vector_store.is_indexed:
         return {
@@ -157,15 +178,19 @@ async def list_indexed_materials(
             "message": "No materials indexed yet"
         }
     
-    materials = marketing_vector_store.materials
-    total = len(materials)
-    
-    # Paginate
-    paginated = materials[offset:offset + limit]
+    etag = compute_etag(marketing_vector_store.fingerprint, offset, limit)
+    headers = {"ETag": etag, "Cache-Control": _MATERIALS_CACHE_CONTROL}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
     
-    return {
-        "materials": [m.to_dict() for m in paginated],
-        "total": total,
-        "offset": offset,
-        "limit": limit,
-    }
+    # Material dicts are built once per index change, so a page is just a slice
+    material_dicts = marketing_vector_store.material_dicts
+    return ORJSONResponse(
+        {
+            "materials": material_dicts[offset:offset + limit],
+            "total": len(material_dicts),
+            "offset": offset,
+            "limit": limit,
+        },
+        headers=headers,
+    )
@@ -4,16 +4,46 @@ Settings endpoints for managing system configuration.
 Allows viewing and updating LLM prompts at runtime for both
 the Leads and Application (Deals) modules.
 """
-from typing import Optional
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import re
+from typing import Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel, ValidationInfo, field_validator
 from loguru import logger
 
+from app.core.etag import is_not_modified
 from app.services.llm.prompt_manager import prompt_manager
 
 router = APIRouter()
 
 
+# Prompt field -> (label used in errors, placeholders it must contain)
+_REQUIRED_PLACEHOLDERS = {
+    "analysis_prompt": ("Lead analysis prompt", ("{lead_data}",)),
+    "deal_analysis_prompt": ("Deal analysis prompt", ("{deal_data}",)),
+    "deal_scoring_prompt": ("Deal scoring prompt", ("{deal_data}", "{analysis_summary}")),
+}
+
+# One alternation per field so each prompt is scanned once for all its placeholders
+_PLACEHOLDER_PATTERNS = {
+    field: re.compile("|".join(map(re.escape, placeholders)))
+    for field, (_, placeholders) in _REQUIRED_PLACEHOLDERS.items()
+}
+
+
+def _check_placeholders(field: str, prompt: str) -> None:
+    """
+    Ensure a prompt contains every placeholder required for its field.
+    
+    Raises:
+        ValueError: Naming the first missing placeholder
+    """
+    label, placeholders = _REQUIRED_PLACEHOLDERS[field]
+    found = set(_PLACEHOLDER_PATTERNS[field].findall(prompt))
+    for placeholder in placeholders:
+        if placeholder not in found:
+            raise ValueError(f"{label} must contain {placeholder} placeholder")
+
+
 class PromptsResponse(BaseModel):
     """Response containing all prompts from both modules."""
     # Lead prompts
@@ -36,6 +66,14 @@ class PromptUpdateRequest(BaseModel):
     deal_analysis_prompt: Optional[str] = None
     deal_scoring_system_prompt: Optional[str] = None
     deal_scoring_prompt: Optional[str] = None
+    
+    @field_validator(*_REQUIRED_PLACEHOLDERS)
+    @classmethod
+    def must_contain_placeholders(cls, v: Optional[str], info: ValidationInfo) -> Optional[str]:
+        """Reject prompts missing a required placeholder at parse time (422)."""
+        if v is not None:
+            _check_placeholders(info.field_name, v)
+        return v
 
 
 class PromptUpdateResponse(BaseModel):
@@ -52,14 +90,31 @@ class PromptUpdateResponse(BaseModel):
     deal_scoring_prompt: str
 
 
+# (etag, serialized PromptsResponse) of the last prompts served
+_prompts_body: Optional[Tuple[str, bytes]] = None
+
+
 @router.get("/prompts", response_model=PromptsResponse)
-async def get_prompts():
+async def get_prompts(request: Request):
     """
     Get all current LLM prompts for both Leads and Application modules.
+    
+    Responses carry an ETag of the prompt content; a matching If-None-Match
+    gets 304 Not Modified.
     """
+    global _prompts_body
     try:
-        prompts = prompt_manager.get_all_prompts()
-        return PromptsResponse(**prompts)
+        prompts, etag = prompt_manager.get_all_prompts_tagged()
+        headers = {"ETag": etag}
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        
+        # Serialize once per prompt content rather than on every poll
+        cached = _prompts_body
+        if cached is None or cached[0] != etag:
+            cached = (etag, PromptsResponse(**prompts).model_dump_json().encode())
+            _prompts_body = cached
+        return Response(cached[1], media_type="application/json", headers=headers)
     except Exception as e:
         logger.error(f"Error getting prompts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -73,41 +128,12 @@ async def update_prompts(request: PromptUpdateRequest):
     You can update any combination of prompts. Only provided (non-null) fields
     are updated; others remain unchanged.
     
-    Validation rules:
+    Validation rules (enforced by PromptUpdateRequest, 422 on failure):
     - analysis_prompt must contain {lead_data} placeholder
     - deal_analysis_prompt must contain {deal_data} placeholder
     - deal_scoring_prompt must contain {deal_data} and {analysis_summary} placeholders
     """
     try:
-        # Validate lead analysis prompt
-        if request.analysis_prompt is not None:
-            if "{lead_data}" not in request.analysis_prompt:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Lead analysis prompt must contain {lead_data} placeholder"
-                )
-        
-        # Validate deal analysis prompt
-        if request.deal_analysis_prompt is not None:
-            if "{deal_data}" not in request.deal_analysis_prompt:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Deal analysis prompt must contain {deal_data} placeholder"
-                )
-        
-        # Validate deal scoring prompt
-        if request.deal_scoring_prompt is not None:
-            if "{deal_data}" not in request.deal_scoring_prompt:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Deal scoring prompt must contain {deal_data} placeholder"
-                )
-            if "{analysis_summary}" not in request.deal_scoring_prompt:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Deal scoring prompt must contain {analysis_summary} placeholder"
-                )
-        
         # Build kwargs for update
         update_kwargs = {}
         if request.system_prompt is not None:
@@ -3,29 +3,57 @@ User authentication endpoints.
 
 Handles user signup, login, and profile management.
 """
+import re
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, Header
-from pydantic import BaseModel, EmailStr, Field
+from fastapi import APIRouter, HTTPException, Depends, Request
+from pydantic import BaseModel, Field, field_validator
 from loguru import logger
 
 from app.services.dynamodb.user_service import user_service
-from app.core.security import create_access_token, get_token_data
+from app.core.cache import TTLCache
+from app.core.concurrency import SingleFlight, dynamodb_limit
+from app.core.config import settings
+from app.core.security import authenticate_bearer, create_access_token
 
 router = APIRouter()
 
+# Lowercased email -> profile row read by /me
+_profile_cache = TTLCache(maxsize=10_000, ttl=settings.USER_PROFILE_CACHE_TTL)
+_profile_flights = SingleFlight()
+
+# Syntactic check only; accounts are keyed by the lowercased address
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _normalize_email(value: str) -> str:
+    """
+    Validate an email address and lowercase it.
+    
+    Raises:
+        ValueError: If the value is not an email address
+    """
+    value = value.strip()
+    if not _EMAIL_RE.match(value):
+        raise ValueError("value is not a valid email address")
+    return value.lower()
+
 
 # Request/Response Models
 class SignupRequest(BaseModel):
     """User signup request."""
-    email: EmailStr = Field(..., description="User's email address")
+    email: str = Field(..., description="User's email address")
     password: str = Field(..., min_length=6, description="Password (min 6 characters)")
     name: str = Field(..., min_length=2, description="User's full name")
+    
+    _check_email = field_validator("email")(_normalize_email)
 
 
 class LoginRequest(BaseModel):
     """User login request."""
-    email: EmailStr = Field(..., description="User's email address")
+    email: str = Field(..., description="User's email address")
     password: str = Field(..., description="User's password")
+    
+    _check_email = field_validator("email")(_normalize_email)
 
 
 class UserResponse(BaseModel):
@@ -50,19 +78,43 @@ class ChangePasswordRequest(BaseModel):
 
 
 # Helper function to get current user from token
-async def get_current_user(authorization: Optional[str] = Header(None)) -> Optional[dict]:
-    """Extract and verify user from Authorization header."""
-    if not authorization:
-        return None
+async def get_current_user(request: Request) -> Optional[dict]:
+    """
+    Get the user authenticated by AuthMiddleware.
     
-    # Extract token from "Bearer <token>" format
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
-        return None
+    Falls back to verifying the Authorization header here when the
+    middleware did not run for this request.
+    """
+    if hasattr(request.state, "user"):
+        return request.state.user
+    return authenticate_bearer(request.headers.get("authorization"))
+
+
+async def _read_user(email: str) -> Optional[dict]:
+    """Read a user row from DynamoDB and cache it for /me."""
+    user_data = await dynamodb_limit.to_thread(user_service.get_user, email)
+    if user_data is not None and settings.USER_PROFILE_CACHE_TTL:
+        _profile_cache.set(email, user_data)
+    return user_data
+
+
+async def _load_user(email: str) -> Optional[dict]:
+    """
+    Get a user's profile, reading DynamoDB at most once per TTL.
     
-    token = parts[1]
-    user_data = get_token_data(token)
+    Concurrent misses for the same user (e.g. several components calling
+    /me on page load) share a single read.
     
+    Args:
+        email: User's email address
+        
+    Returns:
+        User data (treat as read-only), or None if the user does not exist
+    """
+    email = email.lower()
+    user_data = _profile_cache.get(email)
+    if user_data is None:
+        user_data, _ = await _profile_flights.run(email, _read_user, email)
     return user_data
 
 
@@ -156,8 +208,8 @@ async def get_current_user_profile(user: dict = Depends(get_current_user)):
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    # Get fresh user data from database
-    user_data = user_service.get_user(user["email"])
+    # Get user data from the database (briefly cached)
+    user_data = await _load_user(user["email"])
     
     if not user_data:
         raise HTTPException(status_code=404, detail="User not found")
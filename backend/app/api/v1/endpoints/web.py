@@ -4,13 +4,20 @@ Web scraping endpoints for fetching company data from URLs.
 When a user searches for a URL and no matching leads are found,
 these endpoints can be used to extract company information from the website.
 """
+import asyncio
 import re
 from typing import Optional, List, Dict, Any
 from urllib.parse import urlparse
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from loguru import logger
+import orjson
 
+from app.core.cache import TTLCache
+from app.core.concurrency import bedrock_limit
+from app.core.config import settings
+from app.core.etag import compute_etag, is_not_modified
 from app.services.web.scraper import website_scraper
 from app.services.llm.bedrock_service import lead_analysis_service
 from app.services.llm.similar_customers_service import similar_customers_service
@@ -20,6 +27,13 @@ from app.schemas.lead_analysis import LeadAnalysis, EnrichedLeadResponse
 
 router = APIRouter()
 
+# Cheap shape check (optional scheme, dotted host with a TLD, optional port
+# and path) that rejects search-bar text like "hello world" before any parsing
+_URL_FAST = re.compile(r"^(?:https?://)?[\w.-]+\.[a-z]{2,}(?::\d+)?(?:[/?#]\S*)?$", re.IGNORECASE)
+
+# Normalized URL -> (response data, etag) of a successful /fetch
+_fetch_cache = TTLCache(maxsize=settings.WEB_FETCH_CACHE_SIZE, ttl=settings.WEB_FETCH_CACHE_TTL)
+
 
 class WebsiteDataResponse(BaseModel):
     """Response model for scraped website data."""
@@ -47,7 +61,8 @@ class UrlValidationResponse(BaseModel):
 
 @router.get("/fetch", response_model=WebsiteDataResponse)
 async def fetch_website_data(
-    url: str = Query(..., description="The URL to fetch data from")
+    request: Request,
+    url: str = Query(..., description="The URL to fetch data from"),
 ):
     """
     Fetch and extract company information from a website URL.
@@ -64,19 +79,35 @@ async def fetch_website_data(
     - User searches for a URL in the search bar
     - No matching leads are found
     - User wants to preview company data before creating a lead
+    
+    Responses carry an ETag of the extracted data; a retry whose
+    If-None-Match still matches gets 304 Not Modified without a body.
     """
     logger.info(f"Fetching website data for: {url}")
     
     if not url or not url.strip():
         raise HTTPException(status_code=400, detail="URL is required")
     
-    # Fetch the data
-    result = await website_scraper.fetch_website_data(url)
-    
-    if not result.get("success"):
-        logger.warning(f"Failed to fetch {url}: {result.get('error')}")
+    cache_key = website_scraper.normalize_url(url)
+    cached = _fetch_cache.get(cache_key) if settings.WEB_FETCH_CACHE_TTL else None
+    if cached is not None:
+        logger.debug(f"Website data cache HIT for {cache_key}")
+        data, etag = cached
+    else:
+        # Fetch the data
+        result = await website_scraper.fetch_website_data(url)
+        
+        data = WebsiteDataResponse(**result).model_dump()
+        etag = compute_etag(data)
+        if result.get("success"):
+            _fetch_cache.set(cache_key, (data, etag))
+        else:
+            logger.warning(f"Failed to fetch {url}: {result.get('error')}")
     
-    return WebsiteDataResponse(**result)
+    headers = {"ETag": etag}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(data, headers=headers)
 
 
 @router.get("/validate", response_model=UrlValidationResponse)
@@ -88,6 +119,10 @@ async def validate_url(
     
     Returns whether the URL is valid and the normalized version.
     """
+    url = url.strip()
+    if not _URL_FAST.match(url):
+        return UrlValidationResponse(is_valid=False)
+    
     is_valid = website_scraper.is_valid_url(url)
     normalized = website_scraper.normalize_url(url) if is_valid else None
     
@@ -111,6 +146,58 @@ class WebsiteAnalysisRequest(BaseModel):
     logo_url: Optional[str] = None
 
 
+def _enriched_response(
+    data: Dict[str, Any],
+    analysis: LeadAnalysis,
+    from_cache: bool,
+    marketing_materials: List[Dict[str, Any]],
+    similar_customers: List[Dict[str, Any]],
+    analysis_available: bool = True,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Build an EnrichedLeadResponse-shaped body from pre-encoded JSON pieces.
+    
+    The analysis is serialized straight to JSON by pydantic-core instead of
+    going through an intermediate dict. Null fields in the website data and
+    analysis are left out; most of the website-derived lead fields are empty
+    for a typical site.
+    """
+    body = b"".join((
+        b'{"data":',
+        orjson.dumps({key: value for key, value in data.items() if value is not None}),
+        b',"analysis":',
+        analysis.model_dump_json(exclude_none=True).encode(),
+        b',"analysis_available":',
+        b"true" if analysis_available else b"false",
+        b',"from_cache":',
+        b"true" if from_cache else b"false",
+        b',"marketing_materials":',
+        orjson.dumps(marketing_materials),
+        b',"similar_customers":',
+        orjson.dumps(similar_customers),
+        b"}",
+    ))
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def _search_marketing_materials(lead_like_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Find relevant marketing materials for website data (empty on failure)."""
+    try:
+        # Use search_for_lead - same method as leads endpoint. Results are
+        # fresh dicts already in the response shape, so they are used as-is.
+        marketing_materials = await asyncio.to_thread(
+            marketing_vector_store.search_for_lead,
+            lead_data=lead_like_data,
+            top_k=5
+        )
+        logger.info(f"Found {len(marketing_materials)} relevant marketing materials")
+        return marketing_materials
+    except Exception as e:
+        logger.warning(f"Could not fetch marketing materials: {e}")
+        return []
+
+
 @router.post("/analyze", response_model=EnrichedLeadResponse)
 async def analyze_website(request: WebsiteAnalysisRequest):
     """
@@ -163,65 +250,43 @@ async def analyze_website(request: WebsiteAnalysisRequest):
         if request.address:
             lead_like_data["Street"] = request.address
         
-        # Run LLM analysis (same as Zoho leads)
-        logger.info("Running LLM analysis on website data...")
-        analysis = lead_analysis_service.analyze_lead(lead_like_data)
+        # Run LLM analysis and the marketing search (which only needs the
+        # website data) concurrently, same as Zoho leads
+        logger.info("Running LLM analysis and marketing materials search on website data...")
+        analysis, marketing_materials = await asyncio.gather(
+            bedrock_limit.to_thread(lead_analysis_service.analyze_lead, lead_like_data),
+            _search_marketing_materials(lead_like_data),
+        )
         
         # Find similar customers (same as Zoho leads)
         logger.info("Finding similar customers...")
-        analysis_dict = analysis.model_dump() if hasattr(analysis, 'model_dump') else analysis.dict()
-        similar_customers_data = similar_customers_service.find_similar_customers(
+        similar_customers_data = await bedrock_limit.to_thread(
+            similar_customers_service.find_similar_customers,
             lead_data=lead_like_data,
-            analysis_data=analysis_dict
+            analysis_data=analysis
         )
         
-        # Find relevant marketing materials (same as Zoho leads)
-        logger.info("Finding relevant marketing materials...")
-        marketing_materials = []
-        try:
-            # Use search_for_lead - same method as leads endpoint
-            materials = marketing_vector_store.search_for_lead(
-                lead_data=lead_like_data,
-                top_k=5
-            )
-            marketing_materials = [
-                {
-                    "material_id": m.get("material_id", ""),
-                    "title": m.get("title", ""),
-                    "link": m.get("link", ""),
-                    "industry": m.get("industry", ""),
-                    "business_topics": m.get("business_topics", ""),
-                    "similarity_score": m.get("similarity_score", 0.0),
-                }
-                for m in materials
-            ]
-            logger.info(f"Found {len(marketing_materials)} relevant marketing materials")
-        except Exception as e:
-            logger.warning(f"Could not fetch marketing materials: {e}")
-        
         logger.info(f"Website analysis completed: fit_score={analysis.fit_score}")
         
         # Return same format as EnrichedLeadResponse
-        return EnrichedLeadResponse(
+        return _enriched_response(
             data=lead_like_data,
             analysis=analysis,
-            analysis_available=True,
             from_cache=False,
             marketing_materials=marketing_materials,
-            similar_customers=similar_customers_data
+            similar_customers=similar_customers_data,
         )
         
     except Exception as e:
         logger.error(f"Error analyzing website: {e}")
         # Return error in same format
-        from app.schemas.lead_analysis import LeadAnalysis as LA
-        return EnrichedLeadResponse(
+        return _enriched_response(
             data={"Company": request.company_name or request.domain, "Website": request.url, "error": str(e)},
-            analysis=LA(company_name=request.company_name or "Unknown"),
-            analysis_available=False,
+            analysis=LeadAnalysis(company_name=request.company_name or "Unknown"),
             from_cache=False,
             marketing_materials=[],
-            similar_customers=[]
+            similar_customers=[],
+            analysis_available=False,
         )
 
 
@@ -233,19 +298,21 @@ def _normalize_domain(url: str) -> str:
     parsed = urlparse(url)
     domain = parsed.netloc or parsed.path.split("/")[0]
     # Remove www. prefix for consistent keying
-    domain = re.sub(r"^www\.", "", domain).lower().strip()
+    domain = domain.lower().strip().removeprefix("www.")
     return domain
 
 
 @router.get("/evaluate", response_model=EnrichedLeadResponse)
 async def evaluate_website(
+    background_tasks: BackgroundTasks,
     url: str = Query(..., description="The website URL to evaluate")
 ):
     """
     One-shot endpoint: scrape a website, run LLM analysis, and cache in DynamoDB.
     
     If the URL has been evaluated before, returns cached results immediately.
-    Otherwise: scrapes → analyzes with LLM → caches → returns.
+    Otherwise: scrapes → analyzes with LLM → returns, then caches in the
+    background after the response is sent.
     
     The cache key is `web_{domain}` stored in the leads DynamoDB table.
     """
@@ -263,7 +330,7 @@ async def evaluate_website(
     
     # --- 1. Check DynamoDB cache ---
     try:
-        cached = lead_analysis_cache.get_cached_data(cache_key)
+        cached = await lead_analysis_cache.get_cached_data(cache_key)
         if cached:
             analysis, marketing_materials, similar_customers = cached
             logger.info(f"Cache HIT for website {domain}")
@@ -281,26 +348,38 @@ async def evaluate_website(
                 "Last_Name": "",
                 "_source": "website",
             }
-            return EnrichedLeadResponse(
+            return _enriched_response(
                 data=lead_like_data,
                 analysis=analysis,
-                analysis_available=True,
                 from_cache=True,
                 marketing_materials=marketing_materials,
-                similar_customers=similar_customers
+                similar_customers=similar_customers,
+                headers={"X-Cache": "HIT"},
             )
     except Exception as e:
         logger.warning(f"Cache lookup failed for {cache_key}: {e}")
     
-    # --- 2. Scrape the website ---
+    # --- 2. Scrape the website and its full page text (for richer LLM context) ---
     logger.info(f"Cache MISS for website {domain} — scraping...")
-    scrape_result = await website_scraper.fetch_website_data(url)
+    scrape_result, website_text = await asyncio.gather(
+        website_scraper.fetch_website_data(url),
+        website_scraper.fetch_page_text(url),
+        return_exceptions=True,
+    )
     
+    if isinstance(scrape_result, Exception):
+        scrape_result = {"success": False, "error": str(scrape_result)}
     if not scrape_result.get("success"):
         error_msg = scrape_result.get("error", "Failed to fetch website data")
         logger.warning(f"Scrape failed for {url}: {error_msg}")
         raise HTTPException(status_code=422, detail=f"Could not fetch website: {error_msg}")
     
+    if isinstance(website_text, Exception):
+        logger.warning(f"Could not scrape page text for {domain}: {website_text}")
+        website_text = None
+    elif website_text:
+        logger.info(f"Scraped {len(website_text)} chars of page text for {domain}")
+    
     # --- 3. Build lead-like data for LLM ---
     company_name = scrape_result.get("company_name") or scrape_result.get("domain") or domain
     description = scrape_result.get("description") or ""
@@ -332,81 +411,53 @@ async def evaluate_website(
     if scrape_result.get("address"):
         lead_like_data["Street"] = scrape_result["address"]
     
-    # --- 4. Scrape full page text for richer LLM context ---
-    website_text = None
-    try:
-        website_text = await website_scraper.fetch_page_text(url)
-        if website_text:
-            logger.info(f"Scraped {len(website_text)} chars of page text for {domain}")
-    except Exception as e:
-        logger.warning(f"Could not scrape page text for {domain}: {e}")
-    
-    # --- 5. Run LLM analysis ---
-    logger.info(f"Running LLM analysis for website {domain}...")
+    # --- 4. Run LLM analysis and the marketing materials search concurrently ---
+    logger.info(f"Running LLM analysis and marketing materials search for website {domain}...")
     try:
-        analysis = lead_analysis_service.analyze_lead(
-            lead_like_data,
-            website_text=website_text,
+        analysis, marketing_materials = await asyncio.gather(
+            bedrock_limit.to_thread(
+                lead_analysis_service.analyze_lead,
+                lead_like_data,
+                website_text=website_text,
+            ),
+            _search_marketing_materials(lead_like_data),
         )
     except Exception as e:
         logger.error(f"LLM analysis failed for {domain}: {e}")
         raise HTTPException(status_code=500, detail=f"LLM analysis failed: {str(e)}")
     
-    # --- 6. Find similar customers ---
+    # --- 5. Find similar customers ---
     logger.info("Finding similar customers...")
     similar_customers_data: List[Dict[str, Any]] = []
     try:
-        analysis_dict = analysis.model_dump() if hasattr(analysis, 'model_dump') else analysis.dict()
-        similar_customers_data = similar_customers_service.find_similar_customers(
+        similar_customers_data = await bedrock_limit.to_thread(
+            similar_customers_service.find_similar_customers,
             lead_data=lead_like_data,
-            analysis_data=analysis_dict
+            analysis_data=analysis
         )
     except Exception as e:
         logger.warning(f"Could not find similar customers: {e}")
     
-    # --- 7. Find marketing materials ---
-    logger.info("Finding marketing materials...")
-    marketing_materials: List[Dict[str, Any]] = []
-    try:
-        materials = marketing_vector_store.search_for_lead(
-            lead_data=lead_like_data,
-            top_k=5
-        )
-        marketing_materials = [
-            {
-                "material_id": m.get("material_id", ""),
-                "title": m.get("title", ""),
-                "link": m.get("link", ""),
-                "industry": m.get("industry", ""),
-                "business_topics": m.get("business_topics", ""),
-                "similarity_score": m.get("similarity_score", 0.0),
-            }
-            for m in materials
-        ]
-        logger.info(f"Found {len(marketing_materials)} relevant marketing materials")
-    except Exception as e:
-        logger.warning(f"Could not fetch marketing materials: {e}")
-    
-    # --- 8. Cache in DynamoDB ---
-    logger.info(f"Caching website evaluation for {domain}...")
-    try:
-        lead_analysis_cache.save_analysis(
+    # --- 6. Cache in DynamoDB after the response is sent ---
+    if lead_analysis_cache.is_enabled:
+        # Make the result visible to repeat requests before the DynamoDB write lands
+        lead_analysis_cache.remember(cache_key, (analysis, marketing_materials, similar_customers_data))
+        logger.info(f"Scheduling DynamoDB cache save for website {domain} in background")
+        background_tasks.add_task(
+            lead_analysis_cache.save_analysis,
             lead_id=cache_key,
             analysis=analysis,
             marketing_materials=marketing_materials,
             similar_customers=similar_customers_data
         )
-        logger.info(f"Successfully cached website evaluation for {domain}")
-    except Exception as e:
-        logger.warning(f"Failed to cache website evaluation for {domain}: {e}")
     
     logger.info(f"Website evaluation completed: domain={domain}, fit_score={analysis.fit_score}")
     
-    return EnrichedLeadResponse(
+    return _enriched_response(
         data=lead_like_data,
         analysis=analysis,
-        analysis_available=True,
         from_cache=False,
         marketing_materials=marketing_materials,
-        similar_customers=similar_customers_data
+        similar_customers=similar_customers_data,
+        headers={"X-Cache": "MISS"},
     )
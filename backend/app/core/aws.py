@@ -0,0 +1,119 @@
+"""
+Shared AWS clients.
+
+boto3 clients are thread-safe and expensive to build (credential chain
+resolution, endpoint metadata, connection pool), so one DynamoDB resource
+and one Bedrock runtime client are created per process and reused by
+every service.
+
+Services on the request path can also use the aioboto3 DynamoDB resource,
+which is opened on startup and runs I/O on the event loop instead of
+occupying a worker thread per call.
+"""
+from contextlib import AsyncExitStack
+from functools import lru_cache
+from typing import Optional
+
+import aioboto3
+import boto3
+from botocore.config import Config
+from loguru import logger
+
+from app.core.config import settings
+
+
+BOTO_CONFIG = Config(
+    max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+    retries={"max_attempts": 2, "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
+
+@lru_cache(maxsize=None)
+def get_session() -> boto3.session.Session:
+    """
+    Get the process-wide boto3 session.
+
+    Uses explicit credentials when configured, otherwise the default
+    credential chain (IAM role, env vars, etc.).
+    """
+    return boto3.session.Session(**_session_kwargs())
+
+
+def _session_kwargs() -> dict:
+    """Region and, when configured, explicit credentials for a session."""
+    kwargs = {"region_name": settings.AWS_REGION}
+    if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
+        kwargs["aws_access_key_id"] = settings.AWS_ACCESS_KEY_ID
+        kwargs["aws_secret_access_key"] = settings.AWS_SECRET_ACCESS_KEY
+    return kwargs
+
+
+@lru_cache(maxsize=None)
+def get_dynamodb_resource():
+    """Get the shared DynamoDB resource."""
+    return get_session().resource("dynamodb", config=BOTO_CONFIG)
+
+
+def get_dynamodb_client():
+    """Get the shared low-level DynamoDB client (same connection pool as the resource)."""
+    return get_dynamodb_resource().meta.client
+
+
+@lru_cache(maxsize=None)
+def get_bedrock_runtime_client():
+    """Get the shared Bedrock runtime client."""
+    return get_session().client("bedrock-runtime", config=BOTO_CONFIG)
+
+
+def warm_up_clients() -> None:
+    """Build the shared clients up front so the first request doesn't pay for it."""
+    get_dynamodb_resource()
+    get_bedrock_runtime_client()
+
+
+_async_stack: Optional[AsyncExitStack] = None
+_async_dynamodb = None
+
+
+async def init_async_dynamodb_resource():
+    """
+    Open the shared aioboto3 DynamoDB resource.
+
+    Called from the application lifespan on startup.
+
+    Returns:
+        The shared aioboto3 DynamoDB service resource
+    """
+    global _async_stack, _async_dynamodb
+    if _async_dynamodb is None:
+        stack = AsyncExitStack()
+        session = aioboto3.Session(**_session_kwargs())
+        _async_dynamodb = await stack.enter_async_context(
+            session.resource("dynamodb", config=BOTO_CONFIG)
+        )
+        _async_stack = stack
+        logger.info("Async DynamoDB resource initialized")
+    return _async_dynamodb
+
+
+async def get_async_dynamodb_resource():
+    """
+    Get the shared aioboto3 DynamoDB resource.
+
+    Falls back to opening it lazily when the lifespan has not run
+    (e.g. in tests using ASGITransport).
+    """
+    if _async_dynamodb is None:
+        return await init_async_dynamodb_resource()
+    return _async_dynamodb
+
+
+async def close_async_dynamodb_resource() -> None:
+    """Close the shared aioboto3 DynamoDB resource. Called from the lifespan on shutdown."""
+    global _async_stack, _async_dynamodb
+    if _async_stack is not None:
+        await _async_stack.aclose()
+        logger.info("Async DynamoDB resource closed")
+    _async_stack = None
+    _async_dynamodb = None
@@ -0,0 +1,156 @@
+"""
+Concurrency helpers shared by the API endpoints.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+import anyio
+import anyio.to_thread
+
+from app.core.config import settings
+
+
+T = TypeVar("T")
+
+
+class KeyedLock:
+    """
+    A map of asyncio locks keyed by an identifier (e.g. a deal ID).
+
+    Lets concurrent requests for the same record queue behind one another
+    while requests for different records proceed in parallel. Locks are
+    dropped from the map once no request holds or waits on them.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self._users: Dict[Hashable, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        """
+        Acquire the lock for key for the duration of the context.
+
+        Args:
+            key: Identifier to serialize on
+        """
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if self._users[key] == 0:
+                del self._users[key]
+                del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+    
+    The first caller for a key starts the coroutine as a task; callers that
+    arrive while it is in flight await the same result (or exception)
+    instead of running it again. Every caller awaits the task through
+    asyncio.shield, so a caller that is cancelled (e.g. its client
+    disconnected) stops waiting without cancelling the run for the others.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+    
+    async def run(self, key: Hashable, func: Callable[..., Awaitable[T]], *args: Any) -> Tuple[T, bool]:
+        """
+        Run func(*args) once per key at a time.
+        
+        Args:
+            key: Identifier to coalesce on
+            func: Coroutine function to run
+            args: Positional arguments for func
+            
+        Returns:
+            Tuple of (result, shared) where shared is True if this caller
+            joined a call started by another request
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(func(*args))
+            self._calls[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        return await asyncio.shield(task), shared
+    
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drop a finished run (and mark its exception retrieved if nobody awaited it)."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class ConcurrencyLimit:
+    """
+    Bounded concurrency for calls to a rate-limited upstream (Bedrock, Zoho)
+    or a scarce local resource (CPU-bound document extraction).
+
+    A burst of requests queues here instead of fanning out into throttling
+    errors and retry storms upstream, or oversubscribing the worker threads.
+    Backed by an anyio CapacityLimiter, which also bounds to_thread() calls
+    directly. Usage counters are exposed via status() for monitoring.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        """The underlying limiter (created on first use, inside the event loop)."""
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.limit)
+        return self._limiter
+
+    async def __aenter__(self) -> "ConcurrencyLimit":
+        await self.limiter.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.limiter.release()
+
+    async def to_thread(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call in a worker thread while holding a slot.
+
+        Args:
+            func: Blocking callable
+            args: Positional arguments for func
+            kwargs: Keyword arguments for func
+            
+        Returns:
+            The callable's return value
+        """
+        return await anyio.to_thread.run_sync(partial(func, *args, **kwargs), limiter=self.limiter)
+
+    def status(self) -> Dict[str, int]:
+        """Get current usage of this limit."""
+        if self._limiter is None:
+            return {"limit": self.limit, "in_use": 0, "waiting": 0}
+        stats = self._limiter.statistics()
+        return {"limit": self.limit, "in_use": stats.borrowed_tokens, "waiting": stats.tasks_waiting}
+
+
+# Shared limits for upstream services and CPU-bound work
+bedrock_limit = ConcurrencyLimit("bedrock", settings.BEDROCK_MAX_CONCURRENCY)
+zoho_limit = ConcurrencyLimit("zoho", settings.ZOHO_MAX_CONCURRENCY)
+extraction_limit = ConcurrencyLimit("extraction", settings.EXTRACTION_MAX_CONCURRENCY)
+dynamodb_limit = ConcurrencyLimit("dynamodb", settings.DYNAMODB_MAX_CONCURRENCY)
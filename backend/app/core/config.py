@@ -1,6 +1,7 @@
 """
 Application configuration using python-dotenv.
 """
+import json
 import os
 from typing import List
 from pathlib import Path
@@ -15,13 +16,19 @@ load_dotenv(ENV_FILE)
 
 
 def get_list_from_env(key: str, default: List[str]) -> List[str]:
-    """Parse a JSON-like list from environment variable."""
+    """Parse a JSON list (or a bare comma-separated list) from environment variable."""
     value = os.getenv(key)
-    if value:
-        # Remove brackets and split by comma
-        value = value.strip("[]")
-        return [item.strip().strip('"').strip("'") for item in value.split(",")]
-    return default
+    if not value:
+        return default
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, list):
+        return [str(item) for item in parsed]
+    # Not JSON: strip only the outer brackets, then split by comma
+    items = (item.strip().strip("'\"") for item in value.strip().strip("[]").split(","))
+    return [item for item in items if item]
 
 
 class Settings:
@@ -36,7 +43,16 @@ class Settings:
     PROJECT_NAME: str = os.getenv("PROJECT_NAME", "TBDC Backend")
     VERSION: str = os.getenv("VERSION", "1.0.0")
     DEBUG: bool = os.getenv("DEBUG", "false").lower() in ("true", "1", "yes")
+    # Log DEBUG records, including full deal fields, prompts and extracted text
+    VERBOSE_LOGS: bool = os.getenv("VERBOSE_LOGS", "false").lower() in ("true", "1", "yes")
     API_V1_STR: str = os.getenv("API_V1_STR", "/api/v1")
+    
+    # Worker threads for blocking calls (boto3, LLM, document parsing)
+    THREAD_POOL_SIZE: int = int(os.getenv("THREAD_POOL_SIZE", "64"))
+    
+    # Shared outbound HTTP connection pool (Zoho, OAuth)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "128"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "64"))
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = get_list_from_env(
@@ -61,6 +77,18 @@ class Settings:
     
     # Token refresh buffer (refresh token X seconds before expiry)
     ZOHO_TOKEN_REFRESH_BUFFER: int = int(os.getenv("ZOHO_TOKEN_REFRESH_BUFFER", "300"))
+    
+    # Maximum concurrent in-flight Zoho API requests per process
+    ZOHO_MAX_CONCURRENCY: int = int(os.getenv("ZOHO_MAX_CONCURRENCY", "20"))
+    # Search result pages requested ahead of the one being consumed when fetching all pages
+    ZOHO_PAGE_PREFETCH: int = int(os.getenv("ZOHO_PAGE_PREFETCH", "4"))
+    
+    # Filter deal lists by stage with COQL (indexed, server-side sort) instead of the search API
+    ZOHO_COQL_ENABLED: bool = os.getenv("ZOHO_COQL_ENABLED", "true").lower() in ("true", "1", "yes")
+    # Seconds a contact's email is reused when resolving deal meeting notes
+    ZOHO_CONTACT_EMAIL_CACHE_TTL: int = int(os.getenv("ZOHO_CONTACT_EMAIL_CACHE_TTL", "3600"))
+    # Seconds a lead ID Zoho reported as missing is answered with 404 without asking again
+    LEAD_NOT_FOUND_CACHE_TTL: int = int(os.getenv("LEAD_NOT_FOUND_CACHE_TTL", "60"))
 
     # Database (optional - for token persistence)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./tokens.db")
@@ -70,16 +98,65 @@ class Settings:
     AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID", "")
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
     
+    # Connection pool size shared by the boto3 DynamoDB and Bedrock clients
+    AWS_MAX_POOL_CONNECTIONS: int = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+    
     # Bedrock Model Configuration
     BEDROCK_MODEL_ID: str = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-sonnet-20240229-v1:0")
     BEDROCK_MAX_TOKENS: int = int(os.getenv("BEDROCK_MAX_TOKENS", "4096"))
     BEDROCK_TEMPERATURE: float = float(os.getenv("BEDROCK_TEMPERATURE", "0.3"))
     
+    # Maximum concurrent in-flight Bedrock LLM calls per process
+    BEDROCK_MAX_CONCURRENCY: int = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "8"))
+    
+    # Maximum concurrent document extractions (CPU-bound) and sync DynamoDB calls
+    EXTRACTION_MAX_CONCURRENCY: int = int(os.getenv("EXTRACTION_MAX_CONCURRENCY", str(os.cpu_count() or 4)))
+    DYNAMODB_MAX_CONCURRENCY: int = int(os.getenv("DYNAMODB_MAX_CONCURRENCY", "32"))
+    # Parse attachments in a process pool of EXTRACTION_MAX_CONCURRENCY workers (false = threads)
+    EXTRACTION_PROCESSES: bool = os.getenv("EXTRACTION_PROCESSES", "true").lower() in ("true", "1", "yes")
+    
+    # Semantic cache for similar-customer lookups (opt-in): reuse the result for
+    # deals/leads whose context embedding has cosine similarity >= threshold
+    SIMILAR_CUSTOMERS_SEMANTIC_CACHE: bool = os.getenv("SIMILAR_CUSTOMERS_SEMANTIC_CACHE", "false").lower() in ("true", "1", "yes")
+    SIMILAR_CUSTOMERS_CACHE_THRESHOLD: float = float(os.getenv("SIMILAR_CUSTOMERS_CACHE_THRESHOLD", "0.97"))
+    SIMILAR_CUSTOMERS_CACHE_TTL: int = int(os.getenv("SIMILAR_CUSTOMERS_CACHE_TTL", "604800"))
+    
+    # Semantic cache for lead analyses (opt-in): reuse the analysis of a lead whose
+    # company profile embedding has cosine similarity >= threshold and whose company
+    # name and website match (leads without attachments)
+    LEAD_ANALYSIS_SEMANTIC_CACHE: bool = os.getenv("LEAD_ANALYSIS_SEMANTIC_CACHE", "false").lower() in ("true", "1", "yes")
+    LEAD_ANALYSIS_CACHE_THRESHOLD: float = float(os.getenv("LEAD_ANALYSIS_CACHE_THRESHOLD", "0.97"))
+    LEAD_ANALYSIS_CACHE_TTL: int = int(os.getenv("LEAD_ANALYSIS_CACHE_TTL", "604800"))
+    
+    # Largest marketing materials spreadsheet accepted for indexing
+    MARKETING_UPLOAD_MAX_BYTES: int = int(os.getenv("MARKETING_UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+    
+    # Website data scraped for GET /web/fetch is reused for this many seconds (0 = off)
+    WEB_FETCH_CACHE_TTL: int = int(os.getenv("WEB_FETCH_CACHE_TTL", "600"))
+    WEB_FETCH_CACHE_SIZE: int = int(os.getenv("WEB_FETCH_CACHE_SIZE", "1024"))
+    # Seconds a site's ETag/Last-Modified is kept for conditional re-fetches
+    WEB_FETCH_VALIDATOR_TTL: int = int(os.getenv("WEB_FETCH_VALIDATOR_TTL", "86400"))
+    
     # DynamoDB Configuration (for caching lead analysis and prompts)
     DYNAMODB_TABLE_NAME: str = os.getenv("DYNAMODB_TABLE_NAME", "leads")
     DYNAMODB_DEAL_TABLE_NAME: str = os.getenv("DYNAMODB_DEAL_TABLE_NAME", "tbdc_deal_analysis")
     DYNAMODB_PROMPTS_TABLE_NAME: str = os.getenv("DYNAMODB_PROMPTS_TABLE_NAME", "prompts")
     DYNAMODB_ENABLED: bool = os.getenv("DYNAMODB_ENABLED", "true").lower() in ("true", "1", "yes")
+    # Seconds prompts read from DynamoDB are reused before reading again (0 = every read)
+    PROMPT_CACHE_TTL: int = int(os.getenv("PROMPT_CACHE_TTL", "60"))
+    
+    # Serve stage-filtered deal lists from a DynamoDB snapshot instead of Zoho search
+    DYNAMODB_DEAL_STAGE_TABLE_NAME: str = os.getenv("DYNAMODB_DEAL_STAGE_TABLE_NAME", "tbdc_deal_stage_index")
+    DEAL_STAGE_INDEX_ENABLED: bool = os.getenv("DEAL_STAGE_INDEX_ENABLED", "false").lower() in ("true", "1", "yes")
+    DEAL_STAGE_INDEX_TTL: int = int(os.getenv("DEAL_STAGE_INDEX_TTL", "900"))
+    # Shared secret Zoho sends in the X-Webhook-Token header (empty = webhook disabled)
+    ZOHO_WEBHOOK_TOKEN: str = os.getenv("ZOHO_WEBHOOK_TOKEN", "")
+    
+    # In-process cache in front of DynamoDB analysis lookups
+    ANALYSIS_MEMORY_CACHE_SIZE: int = int(os.getenv("ANALYSIS_MEMORY_CACHE_SIZE", "2048"))
+    ANALYSIS_MEMORY_CACHE_TTL: int = int(os.getenv("ANALYSIS_MEMORY_CACHE_TTL", "300"))
+    # Store cached analyses as one compressed binary attribute instead of JSON strings
+    DEAL_CACHE_COMPRESSION: bool = os.getenv("DEAL_CACHE_COMPRESSION", "true").lower() in ("true", "1", "yes")
     
     # Fireflies.ai Configuration
     FIREFLIES_API_KEY: str = os.getenv("FIREFLIES_API_KEY", "")
@@ -88,6 +165,10 @@ class Settings:
     # JWT Authentication
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "tbdc-super-secret-key-change-in-production")
     JWT_EXPIRE_HOURS: int = int(os.getenv("JWT_EXPIRE_HOURS", "24"))
+    # Seconds a verified token's user data is reused without re-verifying (never past exp)
+    AUTH_TOKEN_CACHE_TTL: int = int(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+    # Seconds a user's profile row is reused by /me before re-reading DynamoDB
+    USER_PROFILE_CACHE_TTL: int = int(os.getenv("USER_PROFILE_CACHE_TTL", "30"))
 
 
 # Create singleton settings instance
@@ -0,0 +1,78 @@
+"""
+Helpers for HTTP conditional GETs (ETag / If-None-Match).
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Optional
+
+from fastapi import Request
+
+
+def compute_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from cheap identifying values.
+
+    Args:
+        parts: JSON-serializable values that change whenever the response does
+
+    Returns:
+        Quoted ETag header value
+    """
+    raw = json.dumps(parts, default=str, separators=(",", ":")).encode()
+    return f'"{hashlib.blake2b(raw, digest_size=8).hexdigest()}"'
+
+
+def content_digest(body: bytes) -> str:
+    """
+    Fingerprint serialized content for use as an ETag part.
+
+    Args:
+        body: Serialized representation (or the part of it that can change)
+
+    Returns:
+        Hex digest of body
+    """
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Check whether the client already holds the representation for this ETag.
+
+    Args:
+        request: Incoming request
+        etag: Quoted ETag of the current representation
+
+    Returns:
+        True if If-None-Match matches and a 304 can be returned
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def to_http_date(timestamp: Optional[str]) -> Optional[str]:
+    """
+    Convert an ISO-8601 timestamp (as returned by Zoho) to an HTTP date.
+
+    Args:
+        timestamp: ISO timestamp with offset, e.g. "2024-01-15T10:20:30-05:00"
+
+    Returns:
+        RFC 7231 date string for Last-Modified, or None if unparseable
+    """
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return None
+    return format_datetime(parsed.astimezone(timezone.utc), usegmt=True)
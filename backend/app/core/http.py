@@ -0,0 +1,69 @@
+"""
+Shared HTTP client for outbound requests.
+
+A single pooled httpx.AsyncClient is created on application startup and
+closed on shutdown so that outbound calls reuse keep-alive connections
+instead of paying a TCP/TLS handshake per request.
+"""
+from typing import Optional
+
+import httpx
+from loguru import logger
+
+from app.core.config import settings
+
+
+http_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Create the pooled AsyncClient with the shared limits and timeout."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+        ),
+        timeout=httpx.Timeout(30.0),
+        http2=True,
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """
+    Create the shared HTTP client.
+
+    Called from the application lifespan on startup.
+
+    Returns:
+        The shared httpx.AsyncClient
+    """
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = _build_client()
+        logger.info("Shared HTTP client initialized")
+    return http_client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client.
+
+    Falls back to creating the client lazily when the lifespan has not
+    run (e.g. in tests using ASGITransport).
+
+    Returns:
+        The shared httpx.AsyncClient
+    """
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = _build_client()
+    return http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client. Called from the lifespan on shutdown."""
+    global http_client
+    if http_client is not None and not http_client.is_closed:
+        await http_client.aclose()
+        logger.info("Shared HTTP client closed")
+    http_client = None
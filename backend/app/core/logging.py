@@ -1,7 +1,13 @@
 """
 Logging configuration using loguru.
+
+Sinks are enqueued, so formatting and I/O happen on loguru's writer thread
+instead of blocking the event loop. Large payload dumps (deal fields, prompts,
+extracted text) are logged lazily at DEBUG and only rendered when
+VERBOSE_LOGS is on.
 """
 import sys
+from typing import Any, Dict
 from loguru import logger
 
 from app.core.config import settings
@@ -15,13 +21,14 @@ def setup_logging():
     logger.remove()
     
     # Add console handler with appropriate level
-    log_level = "INFO"
+    log_level = "DEBUG" if settings.VERBOSE_LOGS else "INFO"
     
     logger.add(
         sys.stdout,
         colorize=True,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
         level=log_level,
+        enqueue=True,
     )
     
     # Add file handler for production
@@ -31,11 +38,18 @@ def setup_logging():
             rotation="10 MB",
             retention="10 days",
             compression="gz",
-            level="INFO",
+            level=log_level,
+            enqueue=True,
         )
     
     return logger
 
 
-# Initialize logger
-app_logger = setup_logging()
+def format_fields(data: Dict[str, Any]) -> str:
+    """
+    Render a dict as indented "key: value" lines for verbose logs.
+    
+    Pass it to a lazy logger call so it only runs when the record is emitted:
+    logger.opt(lazy=True).debug("Fields:\n{}", lambda: format_fields(data))
+    """
+    return "\n".join(f"  {k}: {v}" for k, v in data.items())
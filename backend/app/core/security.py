@@ -3,11 +3,14 @@ Security utilities for authentication.
 
 Handles JWT token generation and validation.
 """
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from loguru import logger
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 
@@ -16,6 +19,11 @@ SECRET_KEY = settings.JWT_SECRET_KEY if hasattr(settings, 'JWT_SECRET_KEY') else
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
+_BEARER_PREFIX = "bearer "
+
+# SHA-256 of a verified token -> its user data (raw tokens are never kept)
+_token_cache = TTLCache(maxsize=10_000, ttl=settings.AUTH_TOKEN_CACHE_TTL)
+
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -69,18 +77,65 @@ def get_token_data(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         User data dict or None if invalid
     """
+    # jwt.decode already rejects expired tokens
     payload = verify_token(token)
     
     if payload is None:
         return None
     
-    # Check expiration
-    exp = payload.get("exp")
-    if exp and datetime.utcnow().timestamp() > exp:
-        return None
-    
+    return _user_data(payload)
+
+
+def _user_data(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the user fields out of a verified token payload."""
     return {
         "email": payload.get("email"),
         "name": payload.get("name"),
         "role": payload.get("role"),
     }
+
+
+def authenticate_bearer(authorization: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Get user data from an Authorization header.
+    
+    Verified tokens are cached (by digest) for AUTH_TOKEN_CACHE_TTL seconds,
+    never past their expiry, so repeat requests skip signature checks.
+    
+    Args:
+        authorization: Header value in "Bearer <token>" format
+        
+    Returns:
+        User data dict or None if missing or invalid
+    """
+    if not authorization:
+        return None
+    
+    # Extract token from "Bearer <token>" format (prefix check, no split)
+    if len(authorization) <= len(_BEARER_PREFIX) or authorization[:len(_BEARER_PREFIX)].lower() != _BEARER_PREFIX:
+        return None
+    
+    token = authorization[len(_BEARER_PREFIX):].strip()
+    if not token:
+        return None
+    if not settings.AUTH_TOKEN_CACHE_TTL:
+        return get_token_data(token)
+    
+    cache_key = hashlib.sha256(token.encode()).digest()
+    user_data = _token_cache.get(cache_key)
+    if user_data is not None:
+        return dict(user_data)
+    
+    payload = verify_token(token)
+    if payload is None:
+        return None
+    
+    user_data = _user_data(payload)
+    ttl = settings.AUTH_TOKEN_CACHE_TTL
+    exp = payload.get("exp")
+    if exp:
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        _token_cache.set(cache_key, dict(user_data), ttl=ttl)
+    
+    return user_data
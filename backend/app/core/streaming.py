@@ -0,0 +1,19 @@
+"""
+Helpers for streaming endpoint responses as newline-delimited JSON.
+"""
+import json
+from typing import Any
+
+
+def ndjson_line(event: str, payload: Any) -> bytes:
+    """
+    Encode one NDJSON event line.
+
+    Args:
+        event: Event name (e.g. "data", "analysis", "done")
+        payload: JSON-serializable payload
+
+    Returns:
+        The encoded line, including the trailing newline
+    """
+    return (json.dumps({"event": event, "payload": payload}, default=str) + "\n").encode()
@@ -1,18 +1,30 @@
 """
 Main FastAPI application entry point.
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from loguru import logger
 
+from app.core.aws import warm_up_clients, init_async_dynamodb_resource, close_async_dynamodb_resource
+from app.core.concurrency import bedrock_limit, dynamodb_limit, extraction_limit, zoho_limit
 from app.core.config import settings
+from app.core.http import init_http_client, close_http_client
+from app.core.logging import setup_logging
+from app.middleware.auth import AuthMiddleware
 from app.middleware.zoho_token import ZohoTokenMiddleware
 from app.api.v1.router import api_router
 from app.services.zoho.token_manager import zoho_token_manager
 from app.services.dynamodb.lead_cache import lead_analysis_cache
 from app.services.dynamodb.deal_cache import deal_analysis_cache
+from app.services.dynamodb.deal_stage_index import deal_stage_index
 from app.services.dynamodb.prompt_store import prompt_store
+from app.services.document.extractor import shutdown_process_pool
 
 
 @asynccontextmanager
@@ -20,6 +32,23 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events.
     """
+    # Startup: Size the thread pools used for blocking calls
+    # (asyncio.to_thread uses the loop executor, run_in_threadpool uses anyio)
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.THREAD_POOL_SIZE)
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREAD_POOL_SIZE
+    
+    # Startup: Create shared HTTP client for outbound requests
+    await init_http_client()
+    
+    # Startup: Build shared AWS clients once (credential chain, connection pool)
+    try:
+        await asyncio.to_thread(warm_up_clients)
+        await init_async_dynamodb_resource()
+    except Exception as e:
+        logger.warning(f"Could not initialize AWS clients at startup: {e}")
+    
     # Startup: Initialize Zoho token manager
     await zoho_token_manager.initialize()
     
@@ -45,6 +74,16 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Error initializing DynamoDB deal table: {e}")
         
+        # Initialize deal stage index table
+        if deal_stage_index.is_enabled:
+            try:
+                if deal_stage_index.ensure_table_exists():
+                    logger.info(f"DynamoDB stage index table '{settings.DYNAMODB_DEAL_STAGE_TABLE_NAME}' is ready")
+                else:
+                    logger.warning("DynamoDB stage index table initialization failed - stage lists will use Zoho search")
+            except Exception as e:
+                logger.error(f"Error initializing DynamoDB stage index table: {e}")
+        
         # Initialize prompts table and sync seed prompts
         if prompt_store.is_enabled:
             try:
@@ -65,12 +104,19 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown: Cleanup resources
     await zoho_token_manager.close()
+    await close_http_client()
+    await close_async_dynamodb_resource()
+    shutdown_process_pool()
+    # Flush records still queued for the log sinks
+    await logger.complete()
 
 
 def create_application() -> FastAPI:
     """
     Application factory for creating FastAPI instance.
     """
+    setup_logging()
+
     app = FastAPI(
         title=settings.PROJECT_NAME,
         description="Backend API for Zoho CRM Integration",
@@ -79,9 +125,13 @@ def create_application() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
-    # Add Zoho Token Management Middleware FIRST (runs second)
+    # Resolve the signed-in user for user routes (runs last)
+    app.add_middleware(AuthMiddleware)
+
+    # Add Zoho Token Management Middleware (runs second)
     app.add_middleware(ZohoTokenMiddleware)
 
     # Configure CORS LAST (runs first on incoming requests)
@@ -130,3 +180,14 @@ async def cache_health_check():
         "lead_cache": lead_cache_status,
         "deal_cache": deal_cache_status,
     }
+
+
+@app.get("/health/concurrency")
+async def concurrency_health_check():
+    """Report usage of the shared concurrency limits."""
+    return {
+        "bedrock": bedrock_limit.status(),
+        "zoho": zoho_limit.status(),
+        "extraction": extraction_limit.status(),
+        "dynamodb": dynamodb_limit.status(),
+    }
@@ -1,4 +1,5 @@
 # Middleware module
+from app.middleware.auth import AuthMiddleware
 from app.middleware.zoho_token import ZohoTokenMiddleware
 
-__all__ = ["ZohoTokenMiddleware"]
+__all__ = ["AuthMiddleware", "ZohoTokenMiddleware"]
@@ -0,0 +1,41 @@
+"""
+User Authentication Middleware.
+
+Verifies the bearer token once per request and exposes the user to
+endpoints through request state.
+"""
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.security import authenticate_bearer
+
+
+class AuthMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware that resolves the current user from the Authorization header.
+    
+    Sets request.state.user to the verified user data, or None when the
+    header is missing or the token is invalid. Rejecting unauthenticated
+    requests is left to the endpoints.
+    """
+    
+    # Routes that read the current user
+    AUTH_ROUTE_PREFIXES = [
+        "/api/v1/users/",
+    ]
+    
+    async def dispatch(self, request: Request, call_next) -> Response:
+        """
+        Attach the authenticated user to the request state.
+        """
+        if request.method != "OPTIONS" and self._requires_user(request.url.path):
+            request.state.user = authenticate_bearer(request.headers.get("authorization"))
+        
+        return await call_next(request)
+    
+    def _requires_user(self, path: str) -> bool:
+        """
+        Check if the path reads the current user.
+        """
+        return any(path.startswith(prefix) for prefix in self.AUTH_ROUTE_PREFIXES)
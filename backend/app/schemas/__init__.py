@@ -1,4 +1,10 @@
 # Schemas module
-from app.schemas.lead import LeadCreate, LeadUpdate, LeadResponse, LeadListResponse
+import pydantic
 
-__all__ = ["LeadCreate", "LeadUpdate", "LeadResponse", "LeadListResponse"]
+# Schemas and services call the pydantic v2 API (model_dump, model_copy) directly
+if not pydantic.VERSION.startswith("2"):
+    raise RuntimeError(f"pydantic v2 is required, found {pydantic.VERSION}")
+
+from app.schemas.lead import LeadCreate, LeadUpdate, LeadResponse, LeadBulkResponse, LeadListResponse
+
+__all__ = ["LeadCreate", "LeadUpdate", "LeadResponse", "LeadBulkResponse", "LeadListResponse"]
@@ -2,7 +2,7 @@
 Deal schemas for request/response validation.
 """
 from typing import Optional, List, Any, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from decimal import Decimal
 
 
@@ -54,8 +54,7 @@ class DealResponse(BaseModel):
     
     data: Dict[str, Any] = Field(..., description="Deal data from Zoho")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class DealListResponse(BaseModel):
@@ -66,3 +65,4 @@ class DealListResponse(BaseModel):
     per_page: int = Field(50, description="Records per page")
     total_count: int = Field(0, description="Total number of records in this response")
     more_records: bool = Field(False, description="Whether more records are available")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if more records are available")
@@ -3,7 +3,7 @@ Deal Analysis schemas for LLM-generated insights.
 Tailored for TBDC's Application module - evaluating deals for Canada market fit.
 """
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class MeetingNote(BaseModel):
@@ -171,8 +171,7 @@ class DealAnalysis(BaseModel):
         description="Important caveats (B2C focus, services-heavy, regulatory friction, unclear product, etc.)"
     )
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class DealWithAnalysis(BaseModel):
@@ -182,8 +181,7 @@ class DealWithAnalysis(BaseModel):
     deal_data: Dict[str, Any] = Field(..., description="Raw deal data from Zoho")
     analysis: DealAnalysis = Field(..., description="AI-generated analysis")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class EnrichedDealResponse(BaseModel):
@@ -207,5 +205,4 @@ class EnrichedDealResponse(BaseModel):
         description="Fireflies meeting transcripts with notes and action items"
     )
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
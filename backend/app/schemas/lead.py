@@ -2,7 +2,7 @@
 Lead schemas for request/response validation.
 """
 from typing import Optional, List, Any, Dict
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class LeadBase(BaseModel):
@@ -61,8 +61,15 @@ class LeadResponse(BaseModel):
     
     data: Dict[str, Any] = Field(..., description="Lead data from Zoho")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
+
+
+class LeadBulkResponse(BaseModel):
+    """Response schema for a bulk lead insert."""
+    
+    data: List[Dict[str, Any]] = Field(default_factory=list, description="Per-record results from Zoho, in request order")
+    created: int = Field(0, description="Number of leads created")
+    failed: int = Field(0, description="Number of leads Zoho rejected")
 
 
 class LeadListResponse(BaseModel):
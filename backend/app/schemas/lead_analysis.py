@@ -3,7 +3,7 @@ Lead Analysis schemas for LLM-generated insights.
 Tailored for TBDC's Pivot program - evaluating startups for Canada market fit.
 """
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class LeadAnalysis(BaseModel):
@@ -88,8 +88,7 @@ class LeadAnalysis(BaseModel):
         description="Important caveats (B2C focus, services-heavy, regulatory friction, unclear product, etc.)"
     )
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class LeadWithAnalysis(BaseModel):
@@ -99,8 +98,7 @@ class LeadWithAnalysis(BaseModel):
     lead_data: Dict[str, Any] = Field(..., description="Raw lead data from Zoho")
     analysis: LeadAnalysis = Field(..., description="AI-generated analysis")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class MarketingMaterialMatch(BaseModel):
@@ -143,5 +141,4 @@ class EnrichedLeadResponse(BaseModel):
         description="Similar customers identified by LLM analysis"
     )
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
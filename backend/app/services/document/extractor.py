@@ -7,11 +7,57 @@ Extracts text content from various document types including:
 - PowerPoint presentations (.ppt, .pptx)
 - Text files (.txt, .rtf)
 - Excel spreadsheets (.xls, .xlsx)
+
+Parsing is CPU-bound, so on the request path it runs in a process pool
+(EXTRACTION_PROCESSES) to get around the GIL; several attachments are
+parsed in parallel on multi-core hosts.
 """
+import asyncio
+import hashlib
 import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Dict, Any, List
 from loguru import logger
 
+from app.core.cache import TTLCache
+from app.core.concurrency import extraction_limit
+from app.core.config import settings
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the shared extraction process pool (created on first use).
+    
+    Returns:
+        The pool, or None if process-based extraction is disabled
+    """
+    global _process_pool
+    if _process_pool is None and settings.EXTRACTION_PROCESSES:
+        # spawn: forking a process that already runs threads (boto3, the
+        # event loop's executors) can deadlock the child
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.EXTRACTION_MAX_CONCURRENCY,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the extraction process pool. Called from the lifespan on shutdown."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def _extract_text_in_process(content: bytes, file_name: str) -> Optional[str]:
+    """Process pool entry point (module-level so it pickles by reference)."""
+    return document_extractor.extract_text(content, file_name)
+
 
 class DocumentExtractor:
     """
@@ -27,6 +73,11 @@ class DocumentExtractor:
     # Maximum text length to extract (to avoid huge prompts)
     MAX_TEXT_LENGTH = 15000
     
+    def __init__(self):
+        # Extracted text keyed by content SHA-256, so identical decks attached
+        # to several deals/leads are only parsed once
+        self._text_cache = TTLCache(maxsize=256, ttl=3600)
+    
     def extract_text(self, content: bytes, file_name: str) -> Optional[str]:
         """
         Extract text from document content.
@@ -61,35 +112,80 @@ class DocumentExtractor:
             logger.error(f"Error extracting text from {file_name}: {e}")
             return None
     
-    def extract_from_attachments(
+    async def extract_from_attachments(
         self, 
         attachments: List[Dict[str, Any]]
     ) -> Dict[str, str]:
         """
-        Extract text from multiple attachments.
+        Extract text from multiple attachments in parallel.
         
         Args:
             attachments: List of attachment dicts with 'content' and 'file_name'
             
         Returns:
-            Dict mapping file_name to extracted text
+            Dict mapping file_name to extracted text (in attachment order)
         """
+        texts = await asyncio.gather(*(self.extract_one_async(a) for a in attachments))
+        
         results = {}
+        for attachment, text in zip(attachments, texts):
+            if text:
+                results[attachment.get("file_name", "unknown")] = text
         
-        for attachment in attachments:
-            file_name = attachment.get("file_name", "unknown")
-            content = attachment.get("content")
+        return results
+    
+    async def extract_one_async(self, attachment: Dict[str, Any]) -> Optional[str]:
+        """
+        Extract (and truncate) text from a single attachment.
+        
+        Parses in the process pool (or a worker thread when EXTRACTION_PROCESSES
+        is off) without blocking the event loop. Results are cached by content hash.
+        
+        Args:
+            attachment: Attachment dict with 'content', 'file_name' and optionally 'sha256'
             
-            if content:
-                text = self.extract_text(content, file_name)
-                if text:
-                    # Truncate if too long
-                    if len(text) > self.MAX_TEXT_LENGTH:
-                        text = text[:self.MAX_TEXT_LENGTH] + "\n\n[... content truncated ...]"
-                    results[file_name] = text
-                    logger.info(f"Extracted {len(text)} chars from {file_name}")
+        Returns:
+            Extracted text or None if nothing could be extracted
+        """
+        file_name = attachment.get("file_name", "unknown")
+        content = attachment.get("content")
+        if not content:
+            return None
         
-        return results
+        cache_key = self._cache_key(attachment)
+        text = self._text_cache.get(cache_key)
+        if text is not None:
+            logger.info(f"Reusing extracted text for {file_name} (content hash match)")
+            return text or None
+        
+        pool = get_process_pool()
+        if pool is None:
+            text = await extraction_limit.to_thread(self.extract_text, content, file_name)
+        else:
+            try:
+                text = await asyncio.get_running_loop().run_in_executor(
+                    pool, _extract_text_in_process, content, file_name
+                )
+            except Exception as e:
+                # e.g. BrokenProcessPool if a worker died on a malformed file
+                logger.error(f"Error extracting text from {file_name} in process pool: {e}")
+                text = None
+        return self._store(cache_key, file_name, text)
+    
+    def _cache_key(self, attachment: Dict[str, Any]) -> tuple:
+        """Cache key for an attachment: content hash plus extension."""
+        content_hash = attachment.get("sha256") or hashlib.sha256(attachment["content"]).hexdigest()
+        return (content_hash, self._get_extension(attachment.get("file_name", "unknown")))
+    
+    def _store(self, cache_key: tuple, file_name: str, text: Optional[str]) -> Optional[str]:
+        """Truncate freshly extracted text and cache it."""
+        if text:
+            # Truncate if too long
+            if len(text) > self.MAX_TEXT_LENGTH:
+                text = text[:self.MAX_TEXT_LENGTH] + "\n\n[... content truncated ...]"
+            logger.info(f"Extracted {len(text)} chars from {file_name}")
+        self._text_cache.set(cache_key, text or "")
+        return text
     
     def combine_extracted_text(
         self, 
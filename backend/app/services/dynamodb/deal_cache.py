@@ -3,16 +3,73 @@ DynamoDB service for caching deal analysis and marketing materials.
 
 Stores LLM-generated analysis and marketing material recommendations
 in a separate 'tbdc_deal_analysis' table to keep deal data isolated from leads.
+
+Reads and writes on the request path go through the shared aioboto3
+resource; table setup and status checks use the sync boto3 client.
 """
-import json
+import asyncio
+import zlib
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
-import boto3
+import orjson
 from botocore.exceptions import ClientError
 from loguru import logger
 
+from app.core.cache import TTLCache
+from app.core.compression import build_zdict, compress_json, decompress_json
+from app.core.aws import get_dynamodb_client, get_async_dynamodb_resource
+from app.core.concurrency import KeyedLock
 from app.core.config import settings
-from app.schemas.deal_analysis import DealAnalysis
+from app.schemas.deal_analysis import DealAnalysis, PricingLineItem, PricingSummary, RevenueCustomer
+
+
+# Format tag stored with compressed payloads. The dictionary below must never
+# change for an existing tag: add a new tag (and keep decoding the old one).
+PAYLOAD_FORMAT = "zlib-v1"
+
+_PAYLOAD_ZDICT = build_zdict((
+    # Marketing materials, similar customers and meetings
+    "material_id", "link", "business_topics", "similarity_score", "website",
+    "why_similar", "date", "action_items", "notes", "id", "title",
+    # Nested analysis models
+    "service_name", "category", "quantity", "unit_price_eur", "total_price_eur",
+    "recommended_services", "total_cost_eur", "pricing_notes",
+    "name", "industry", "revenue_contribution", "description",
+    # DealAnalysis
+    "company_name", "country", "region", "summary", "product_description",
+    "vertical", "business_model", "motion", "raise_stage", "company_size",
+    "revenue_summary", "top_5_customers_summary", "revenue_top_5_customers",
+    "scoring_rubric", "fit_score", "fit_assessment", "icp_mapping",
+    "likely_icp_canada", "support_required", "support_recommendations",
+    "pricing_summary", "key_insights", "questions_to_ask", "confidence_level",
+    # Payload envelope
+    "meetings", "similar_customers", "marketing_materials", "analysis",
+))
+
+
+def _construct_analysis(data: Dict[str, Any]) -> DealAnalysis:
+    """
+    Rebuild a cached DealAnalysis without re-running validation.
+    
+    The stored JSON was produced by model_dump() of an already-validated
+    model, so model_construct is safe; nested models are constructed
+    explicitly so attribute access and serialization behave as usual.
+    """
+    data = dict(data)
+    data["revenue_top_5_customers"] = [
+        RevenueCustomer.model_construct(**customer)
+        for customer in data.get("revenue_top_5_customers") or []
+    ]
+    pricing = data.get("pricing_summary")
+    if pricing:
+        data["pricing_summary"] = PricingSummary.model_construct(**{
+            **pricing,
+            "recommended_services": [
+                PricingLineItem.model_construct(**service)
+                for service in pricing.get("recommended_services") or []
+            ],
+        })
+    return DealAnalysis.model_construct(**data)
 
 
 class DealAnalysisCache:
@@ -23,19 +80,39 @@ class DealAnalysisCache:
     
     Table Schema (tbdc_deal_analysis):
     - deal_id (PK): Zoho Deal ID
-    - analysis: JSON string of DealAnalysis
-    - marketing_materials: JSON string of marketing material list
-    - similar_customers: JSON string of similar customers list
+    - payload: Compressed JSON of analysis, marketing_materials,
+      similar_customers and meetings (see app.core.compression)
+    - payload_format: Encoding of payload ("zlib-v1")
+    - analysis / marketing_materials / similar_customers / meetings: JSON
+      strings, written instead of payload when DEAL_CACHE_COMPRESSION is off
+      (and by older versions)
     - company_name: Company/deal name for reference
     - fit_score: For easier querying/filtering
+    - content_hash: Hash of the analysis inputs (deal fields, attachments, meetings, prompts)
     - created_at: ISO timestamp when analysis was created
     - updated_at: ISO timestamp when analysis was last updated
+    
+    Hot entries are also kept in an in-process TTL cache so repeat views
+    skip the DynamoDB round trip.
     """
     
     def __init__(self):
         self._client = None
-        self._table = None
         self._table_checked = False
+        self._mem = TTLCache(
+            maxsize=settings.ANALYSIS_MEMORY_CACHE_SIZE,
+            ttl=settings.ANALYSIS_MEMORY_CACHE_TTL,
+        )
+        self._hashes = TTLCache(
+            maxsize=settings.ANALYSIS_MEMORY_CACHE_SIZE,
+            ttl=settings.ANALYSIS_MEMORY_CACHE_TTL,
+        )
+        # deal_id -> (cached tuple, its serialized JSON), see get_json_fragment
+        self._fragments = TTLCache(
+            maxsize=settings.ANALYSIS_MEMORY_CACHE_SIZE,
+            ttl=settings.ANALYSIS_MEMORY_CACHE_TTL,
+        )
+        self._read_locks = KeyedLock()
     
     @property
     def table_name(self) -> str:
@@ -43,27 +120,21 @@ class DealAnalysisCache:
         return settings.DYNAMODB_DEAL_TABLE_NAME
     
     def _get_client(self):
-        """Get or create DynamoDB client."""
+        """Get the shared DynamoDB client."""
         if self._client is None:
-            kwargs = {"region_name": settings.AWS_REGION}
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                kwargs["aws_access_key_id"] = settings.AWS_ACCESS_KEY_ID
-                kwargs["aws_secret_access_key"] = settings.AWS_SECRET_ACCESS_KEY
-            
-            self._client = boto3.client("dynamodb", **kwargs)
+            self._client = get_dynamodb_client()
         return self._client
     
-    def _get_table(self):
-        """Get or create DynamoDB table resource."""
-        if self._table is None:
-            kwargs = {"region_name": settings.AWS_REGION}
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                kwargs["aws_access_key_id"] = settings.AWS_ACCESS_KEY_ID
-                kwargs["aws_secret_access_key"] = settings.AWS_SECRET_ACCESS_KEY
-            
-            dynamodb = boto3.resource("dynamodb", **kwargs)
-            self._table = dynamodb.Table(self.table_name)
-        return self._table
+    async def _get_table(self):
+        """Get the async DynamoDB table resource (backed by the shared aioboto3 resource)."""
+        resource = await get_async_dynamodb_resource()
+        return await resource.Table(self.table_name)
+    
+    async def _check_table(self) -> None:
+        """Ensure the table exists before first access."""
+        if not self._table_checked:
+            await asyncio.to_thread(self.ensure_table_exists)
+            self._table_checked = True
     
     @property
     def is_enabled(self) -> bool:
@@ -169,7 +240,7 @@ class DealAnalysisCache:
             logger.error(f"Unexpected error in ensure_table_exists: {e}")
             return False
     
-    def get_analysis(self, deal_id: str) -> Optional[DealAnalysis]:
+    async def get_analysis(self, deal_id: str) -> Optional[DealAnalysis]:
         """
         Retrieve cached analysis for a deal.
         
@@ -179,12 +250,12 @@ class DealAnalysisCache:
         Returns:
             DealAnalysis if found in cache, None otherwise
         """
-        result = self.get_cached_data(deal_id)
+        result = await self.get_cached_data(deal_id)
         if result:
             return result[0]
         return None
     
-    def get_cached_data(self, deal_id: str) -> Optional[tuple]:
+    async def get_cached_data(self, deal_id: str) -> Optional[tuple]:
         """
         Retrieve cached analysis, marketing materials, similar customers, and meetings for a deal.
         
@@ -197,36 +268,35 @@ class DealAnalysisCache:
         if not self.is_enabled:
             return None
         
-        # Ensure table exists before first access
-        if not self._table_checked:
-            self.ensure_table_exists()
-            self._table_checked = True
+        cached = self._mem.get(deal_id)
+        if cached is not None:
+            logger.debug(f"Memory cache HIT for deal {deal_id}")
+            return cached
+        
+        # One DynamoDB read per deal at a time; requests that queued behind it
+        # pick the result up from memory
+        async with self._read_locks.hold(deal_id):
+            cached = self._mem.get(deal_id)
+            if cached is not None:
+                return cached
+            return await self._read_cached_data(deal_id)
+    
+    async def _read_cached_data(self, deal_id: str) -> Optional[tuple]:
+        """Read a deal's cached data from DynamoDB and keep a copy in memory."""
+        await self._check_table()
         
         try:
-            table = self._get_table()
-            response = table.get_item(Key={"deal_id": deal_id})
+            table = await self._get_table()
+            response = await table.get_item(Key={"deal_id": deal_id})
             
             if "Item" in response:
                 item = response["Item"]
-                analysis_data = json.loads(item["analysis"])
-                
-                # Get marketing materials if available
-                marketing_materials = []
-                if "marketing_materials" in item and item["marketing_materials"]:
-                    marketing_materials = json.loads(item["marketing_materials"])
-                
-                # Get similar customers if available
-                similar_customers = []
-                if "similar_customers" in item and item["similar_customers"]:
-                    similar_customers = json.loads(item["similar_customers"])
-                
-                # Get meetings if available
-                meetings = []
-                if "meetings" in item and item["meetings"]:
-                    meetings = json.loads(item["meetings"])
+                analysis_data, marketing_materials, similar_customers, meetings = self._decode_item(item)
                 
                 logger.info(f"Cache HIT for deal {deal_id}")
-                return (DealAnalysis(**analysis_data), marketing_materials, similar_customers, meetings)
+                result = (_construct_analysis(analysis_data), marketing_materials, similar_customers, meetings)
+                self._mem.set(deal_id, result)
+                return result
             
             logger.debug(f"Cache MISS for deal {deal_id}")
             return None
@@ -234,20 +304,110 @@ class DealAnalysisCache:
         except ClientError as e:
             logger.error(f"Error retrieving deal from DynamoDB: {e}")
             return None
-        except json.JSONDecodeError as e:
+        except (orjson.JSONDecodeError, zlib.error, ValueError) as e:
             logger.error(f"Error parsing cached deal data: {e}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error in get_cached_data for deal: {e}")
             return None
     
-    def save_analysis(
+    @staticmethod
+    def _encode_payload(
+        analysis: DealAnalysis,
+        marketing_materials: Optional[List[Dict[str, Any]]],
+        similar_customers: Optional[List[Dict[str, Any]]],
+        meetings: Optional[List[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Build the payload attributes of a cache item."""
+        if not settings.DEAL_CACHE_COMPRESSION:
+            return {
+                "analysis": analysis.model_dump_json(),
+                "marketing_materials": orjson.dumps(marketing_materials or []).decode(),
+                "similar_customers": orjson.dumps(similar_customers or []).decode(),
+                "meetings": orjson.dumps(meetings or []).decode(),
+            }
+        payload = {
+            "analysis": analysis.model_dump(mode="json"),
+            "marketing_materials": marketing_materials or [],
+            "similar_customers": similar_customers or [],
+            "meetings": meetings or [],
+        }
+        return {
+            "payload": compress_json(payload, _PAYLOAD_ZDICT),
+            "payload_format": PAYLOAD_FORMAT,
+        }
+    
+    @staticmethod
+    def _decode_item(item: Dict[str, Any]) -> tuple:
+        """
+        Decode the payload attributes of a cache item.
+        
+        Returns:
+            Tuple of (analysis dict, marketing_materials, similar_customers, meetings)
+        
+        Raises:
+            ValueError: If the payload format is unknown
+        """
+        if "payload" in item:
+            if item.get("payload_format") != PAYLOAD_FORMAT:
+                raise ValueError(f"Unknown payload format: {item.get('payload_format')!r}")
+            # aioboto3 returns Binary attributes wrapped in boto3's Binary type
+            blob = getattr(item["payload"], "value", item["payload"])
+            payload = decompress_json(blob, _PAYLOAD_ZDICT)
+            return (
+                payload["analysis"],
+                payload.get("marketing_materials") or [],
+                payload.get("similar_customers") or [],
+                payload.get("meetings") or [],
+            )
+        
+        # Uncompressed items: one JSON string attribute per part
+        return (
+            orjson.loads(item["analysis"]),
+            orjson.loads(item["marketing_materials"]) if item.get("marketing_materials") else [],
+            orjson.loads(item["similar_customers"]) if item.get("similar_customers") else [],
+            orjson.loads(item["meetings"]) if item.get("meetings") else [],
+        )
+    
+    async def get_content_hash(self, deal_id: str) -> Optional[str]:
+        """
+        Get the input hash stored with a deal's cached analysis.
+        
+        Args:
+            deal_id: Zoho Deal ID
+            
+        Returns:
+            The stored content hash, or None if not cached / not recorded
+        """
+        if not self.is_enabled:
+            return None
+        
+        content_hash = self._hashes.get(deal_id)
+        if content_hash is not None:
+            return content_hash
+        
+        try:
+            table = await self._get_table()
+            response = await table.get_item(
+                Key={"deal_id": deal_id},
+                ProjectionExpression="content_hash",
+            )
+            content_hash = response.get("Item", {}).get("content_hash")
+            if content_hash:
+                self._hashes.set(deal_id, content_hash)
+            return content_hash
+        except Exception as e:
+            logger.error(f"Error retrieving content hash for deal {deal_id}: {e}")
+            return None
+    
+    async def save_analysis(
         self, 
         deal_id: str, 
         analysis: DealAnalysis,
         marketing_materials: Optional[List[Dict[str, Any]]] = None,
         similar_customers: Optional[List[Dict[str, Any]]] = None,
-        meetings: Optional[List[Dict[str, Any]]] = None
+        meetings: Optional[List[Dict[str, Any]]] = None,
+        content_hash: Optional[str] = None,
     ) -> bool:
         """
         Save analysis, marketing materials, similar customers, and meetings to cache.
@@ -258,6 +418,7 @@ class DealAnalysisCache:
             marketing_materials: List of marketing material dicts to cache
             similar_customers: List of similar customer dicts to cache
             meetings: List of meeting note dicts to cache
+            content_hash: Hash of the inputs the analysis was generated from
             
         Returns:
             True if saved successfully, False otherwise
@@ -265,34 +426,30 @@ class DealAnalysisCache:
         if not self.is_enabled:
             return False
         
-        # Ensure table exists before first access
-        if not self._table_checked:
-            self.ensure_table_exists()
-            self._table_checked = True
+        await self._check_table()
         
         try:
-            table = self._get_table()
+            table = await self._get_table()
             now = datetime.utcnow().isoformat()
             
-            # Convert analysis to dict, handling Pydantic model
-            if hasattr(analysis, "model_dump"):
-                analysis_dict = analysis.model_dump()
-            else:
-                analysis_dict = analysis.dict()
-            
             item = {
                 "deal_id": deal_id,
-                "analysis": json.dumps(analysis_dict),
-                "marketing_materials": json.dumps(marketing_materials or []),
-                "similar_customers": json.dumps(similar_customers or []),
-                "meetings": json.dumps(meetings or []),
-                "company_name": analysis_dict.get("company_name", "Unknown"),
-                "fit_score": analysis_dict.get("fit_score", 5),
+                **self._encode_payload(analysis, marketing_materials, similar_customers, meetings),
+                "company_name": analysis.company_name,
+                "fit_score": analysis.fit_score,
                 "created_at": now,
                 "updated_at": now,
             }
+            if content_hash:
+                item["content_hash"] = content_hash
             
-            table.put_item(Item=item)
+            await table.put_item(Item=item)
+            self._mem.set(
+                deal_id,
+                (analysis, marketing_materials or [], similar_customers or [], meetings or []),
+            )
+            if content_hash:
+                self._hashes.set(deal_id, content_hash)
             logger.info(
                 f"Cached deal analysis, {len(marketing_materials or [])} materials, "
                 f"{len(similar_customers or [])} similar customers, "
@@ -307,7 +464,7 @@ class DealAnalysisCache:
             logger.error(f"Unexpected error in save_analysis for deal: {e}")
             return False
     
-    def delete_analysis(self, deal_id: str) -> bool:
+    async def delete_analysis(self, deal_id: str) -> bool:
         """
         Delete cached analysis for a deal.
         
@@ -320,9 +477,13 @@ class DealAnalysisCache:
         if not self.is_enabled:
             return False
         
+        self._mem.pop(deal_id)
+        self._hashes.pop(deal_id)
+        self._fragments.pop(deal_id)
+        
         try:
-            table = self._get_table()
-            table.delete_item(Key={"deal_id": deal_id})
+            table = await self._get_table()
+            await table.delete_item(Key={"deal_id": deal_id})
             logger.info(f"Deleted cached analysis for deal {deal_id}")
             return True
             
@@ -330,7 +491,7 @@ class DealAnalysisCache:
             logger.error(f"Error deleting deal from DynamoDB: {e}")
             return False
     
-    def update_analysis(self, deal_id: str, analysis: DealAnalysis) -> bool:
+    async def update_analysis(self, deal_id: str, analysis: DealAnalysis) -> bool:
         """
         Update existing cached analysis (or create if not exists).
         
@@ -341,7 +502,74 @@ class DealAnalysisCache:
         Returns:
             True if updated successfully, False otherwise
         """
-        return self.save_analysis(deal_id, analysis)
+        return await self.save_analysis(deal_id, analysis)
+    
+    def remember(self, deal_id: str, cached_data: tuple, content_hash: Optional[str] = None) -> None:
+        """
+        Put a freshly generated result in the in-process cache only.
+        
+        Args:
+            deal_id: Zoho Deal ID
+            cached_data: Tuple of (analysis, marketing_materials, similar_customers, meetings)
+            content_hash: Hash of the inputs the analysis was generated from
+        """
+        self._mem.set(deal_id, cached_data)
+        if content_hash:
+            self._hashes.set(deal_id, content_hash)
+    
+    def invalidate_memory(self, deal_id: str) -> None:
+        """
+        Drop the in-process copy of a deal's cached analysis.
+        
+        Args:
+            deal_id: Zoho Deal ID
+        """
+        self._mem.pop(deal_id)
+        self._fragments.pop(deal_id)
+    
+    def get_json_fragment(self, deal_id: str, cached_data: tuple) -> bytes:
+        """
+        Get the serialized analysis parts of a cached result.
+        
+        Returns the JSON object members (without braces)
+        "analysis":...,"marketing_materials":...,"similar_customers":...,"meetings":...
+        ready to be spliced into a response body. The bytes are reused for
+        as long as cached_data is the entry held in memory, so replacing or
+        dropping the entry invalidates them.
+        
+        Args:
+            deal_id: Zoho Deal ID
+            cached_data: Tuple of (analysis, marketing_materials, similar_customers, meetings)
+            
+        Returns:
+            Serialized JSON members
+        """
+        entry = self._fragments.get(deal_id)
+        if entry is not None and entry[0] is cached_data:
+            return entry[1]
+        
+        fragment = self.encode_fragment(cached_data)
+        self._fragments.set(deal_id, (cached_data, fragment))
+        return fragment
+    
+    @staticmethod
+    def encode_fragment(cached_data: tuple) -> bytes:
+        """
+        Serialize analysis parts to JSON object members without caching them.
+        
+        Args:
+            cached_data: Tuple of (analysis, marketing_materials, similar_customers, meetings)
+            
+        Returns:
+            Serialized JSON members, in the same format as get_json_fragment
+        """
+        analysis, marketing_materials, similar_customers, meetings = cached_data
+        return orjson.dumps({
+            "analysis": analysis.model_dump(mode="json"),
+            "marketing_materials": marketing_materials,
+            "similar_customers": similar_customers,
+            "meetings": meetings,
+        })[1:-1]
 
 
 # Create singleton instance
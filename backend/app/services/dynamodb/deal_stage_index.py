@@ -0,0 +1,307 @@
+"""
+DynamoDB-backed stage index for deals.
+
+Keeps a snapshot of the deal list records per stage so that
+`GET /deals?stage=...` can be served with a single DynamoDB query instead
+of a rate-limited Zoho search. Snapshots are rebuilt from Zoho in the
+background once they expire, and individual deals are moved between
+stages when they are changed through this API or a Zoho webhook.
+"""
+import json
+import time
+from typing import Optional, Dict, Any, List
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from loguru import logger
+
+from app.core.aws import get_dynamodb_client, get_dynamodb_resource
+from app.core.config import settings
+
+
+# Sort key of the per-stage item recording when the stage was last synced
+SYNC_MARKER = "#synced"
+
+DEAL_ID_INDEX = "deal_id-index"
+
+
+class DealStageIndex:
+    """
+    DynamoDB index of deal list records keyed by stage.
+
+    Table Schema (tbdc_deal_stage_index):
+    - stage (PK): Zoho deal stage
+    - deal_id (SK): Zoho Deal ID, or "#synced" for the sync marker
+    - deal: JSON string of the deal list record (DEFAULT_DEAL_FIELDS)
+    - modified_time: Zoho Modified_Time, used for ordering
+    - synced_at: Epoch seconds of the last full sync (sync marker only)
+
+    GSI deal_id-index (deal_id, keys only) finds a deal's current stage
+    when it moves.
+    """
+
+    def __init__(self):
+        self._table = None
+        self._table_checked = False
+        self._syncing: set = set()
+
+    @property
+    def table_name(self) -> str:
+        """Get the stage index table name from settings."""
+        return settings.DYNAMODB_DEAL_STAGE_TABLE_NAME
+
+    @property
+    def is_enabled(self) -> bool:
+        """Check if the stage index is enabled."""
+        return settings.DYNAMODB_ENABLED and settings.DEAL_STAGE_INDEX_ENABLED
+
+    def _get_table(self):
+        """Get the DynamoDB table resource (backed by the shared client)."""
+        if self._table is None:
+            self._table = get_dynamodb_resource().Table(self.table_name)
+        return self._table
+
+    def _check_table(self) -> None:
+        """Ensure the table exists before first access."""
+        if not self._table_checked:
+            self.ensure_table_exists()
+            self._table_checked = True
+
+    def ensure_table_exists(self) -> bool:
+        """
+        Check if the DynamoDB table exists, create if not.
+        Returns True if table exists or was created successfully.
+        """
+        if not self.is_enabled:
+            return False
+
+        client = get_dynamodb_client()
+        try:
+            client.describe_table(TableName=self.table_name)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ResourceNotFoundException":
+                logger.error(f"Error checking DynamoDB stage index table: {e}")
+                return False
+
+        logger.info(f"Creating DynamoDB stage index table '{self.table_name}'...")
+        try:
+            client.create_table(
+                TableName=self.table_name,
+                KeySchema=[
+                    {"AttributeName": "stage", "KeyType": "HASH"},
+                    {"AttributeName": "deal_id", "KeyType": "RANGE"},
+                ],
+                AttributeDefinitions=[
+                    {"AttributeName": "stage", "AttributeType": "S"},
+                    {"AttributeName": "deal_id", "AttributeType": "S"},
+                ],
+                GlobalSecondaryIndexes=[
+                    {
+                        "IndexName": DEAL_ID_INDEX,
+                        "KeySchema": [{"AttributeName": "deal_id", "KeyType": "HASH"}],
+                        "Projection": {"ProjectionType": "KEYS_ONLY"},
+                    },
+                ],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            client.get_waiter("table_exists").wait(TableName=self.table_name)
+            logger.info(f"DynamoDB stage index table '{self.table_name}' created successfully!")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to create DynamoDB stage index table: {e}")
+            return False
+
+    def get_stage_page(self, stage: str, page: int, per_page: int) -> Optional[Dict[str, Any]]:
+        """
+        Get one page of deals in a stage from the index.
+
+        Args:
+            stage: Deal stage
+            page: Page number (1-based)
+            per_page: Records per page
+
+        Returns:
+            Zoho-shaped result ({"data": [...], "info": {...}}), or None if
+            the stage has not been synced or its snapshot has expired
+        """
+        if not self.is_enabled:
+            return None
+
+        self._check_table()
+
+        try:
+            table = self._get_table()
+            items = []
+            kwargs = {"KeyConditionExpression": Key("stage").eq(stage)}
+            while True:
+                response = table.query(**kwargs)
+                items.extend(response.get("Items", []))
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except Exception as e:
+            logger.error(f"Error querying stage index for '{stage}': {e}")
+            return None
+
+        marker = next((item for item in items if item["deal_id"] == SYNC_MARKER), None)
+        if marker is None:
+            logger.debug(f"Stage index MISS for '{stage}' (never synced)")
+            return None
+        if time.time() - float(marker["synced_at"]) > settings.DEAL_STAGE_INDEX_TTL:
+            logger.debug(f"Stage index MISS for '{stage}' (expired)")
+            return None
+
+        records = [item for item in items if item["deal_id"] != SYNC_MARKER]
+        records.sort(key=lambda item: item.get("modified_time", ""), reverse=True)
+
+        start = (page - 1) * per_page
+        deals = [json.loads(item["deal"]) for item in records[start:start + per_page]]
+        logger.info(f"Stage index HIT for '{stage}': {len(deals)} of {len(records)} deals")
+        return {
+            "data": deals,
+            "info": {
+                "page": page,
+                "per_page": per_page,
+                "count": len(records),
+                "more_records": start + per_page < len(records),
+            },
+        }
+
+    def rebuild_stage(self, stage: str, deals: List[Dict[str, Any]]) -> bool:
+        """
+        Replace the snapshot of a stage with a complete list of its deals.
+
+        Args:
+            stage: Deal stage
+            deals: Every deal currently in the stage
+
+        Returns:
+            True if rebuilt successfully, False otherwise
+        """
+        if not self.is_enabled:
+            return False
+
+        self._check_table()
+
+        try:
+            table = self._get_table()
+            current_ids = {deal["id"] for deal in deals}
+            stale_ids = []
+            kwargs = {
+                "KeyConditionExpression": Key("stage").eq(stage),
+                "ProjectionExpression": "deal_id",
+            }
+            while True:
+                response = table.query(**kwargs)
+                stale_ids.extend(
+                    item["deal_id"] for item in response.get("Items", [])
+                    if item["deal_id"] != SYNC_MARKER and item["deal_id"] not in current_ids
+                )
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+            with table.batch_writer() as batch:
+                for deal_id in stale_ids:
+                    batch.delete_item(Key={"stage": stage, "deal_id": deal_id})
+                for deal in deals:
+                    batch.put_item(Item=self._to_item(stage, deal))
+            table.put_item(Item={"stage": stage, "deal_id": SYNC_MARKER, "synced_at": int(time.time())})
+
+            logger.info(f"Rebuilt stage index for '{stage}': {len(deals)} deals, {len(stale_ids)} removed")
+            return True
+        except Exception as e:
+            logger.error(f"Error rebuilding stage index for '{stage}': {e}")
+            return False
+
+    def upsert_deal(self, deal: Dict[str, Any]) -> bool:
+        """
+        Put a deal under its current stage, removing it from any other stage.
+
+        Args:
+            deal: Deal list record (must include id and Stage)
+
+        Returns:
+            True if updated successfully, False otherwise
+        """
+        if not self.is_enabled:
+            return False
+
+        self._check_table()
+
+        deal_id = deal["id"]
+        stage = deal.get("Stage")
+        try:
+            table = self._get_table()
+            for old_stage in self._stages_of(deal_id):
+                if old_stage != stage:
+                    table.delete_item(Key={"stage": old_stage, "deal_id": deal_id})
+            if stage:
+                table.put_item(Item=self._to_item(stage, deal))
+            logger.info(f"Stage index updated for deal {deal_id} (stage: {stage})")
+            return True
+        except Exception as e:
+            logger.error(f"Error updating stage index for deal {deal_id}: {e}")
+            return False
+
+    def remove_deal(self, deal_id: str) -> bool:
+        """
+        Remove a deal from every stage.
+
+        Args:
+            deal_id: Zoho Deal ID
+
+        Returns:
+            True if removed successfully, False otherwise
+        """
+        if not self.is_enabled:
+            return False
+
+        self._check_table()
+
+        try:
+            table = self._get_table()
+            for stage in self._stages_of(deal_id):
+                table.delete_item(Key={"stage": stage, "deal_id": deal_id})
+            return True
+        except Exception as e:
+            logger.error(f"Error removing deal {deal_id} from stage index: {e}")
+            return False
+
+    def claim_sync(self, stage: str) -> bool:
+        """
+        Mark a stage as being synced by this process.
+
+        Returns:
+            False if a sync for the stage is already running
+        """
+        if stage in self._syncing:
+            return False
+        self._syncing.add(stage)
+        return True
+
+    def release_sync(self, stage: str) -> None:
+        """Clear the in-progress mark set by claim_sync."""
+        self._syncing.discard(stage)
+
+    def _stages_of(self, deal_id: str) -> List[str]:
+        """Get the stages a deal is currently indexed under."""
+        response = self._get_table().query(
+            IndexName=DEAL_ID_INDEX,
+            KeyConditionExpression=Key("deal_id").eq(deal_id),
+        )
+        return [item["stage"] for item in response.get("Items", [])]
+
+    @staticmethod
+    def _to_item(stage: str, deal: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the DynamoDB item for a deal record."""
+        return {
+            "stage": stage,
+            "deal_id": deal["id"],
+            "deal": json.dumps(deal, default=str),
+            "modified_time": deal.get("Modified_Time") or "",
+        }
+
+
+# Create singleton instance
+deal_stage_index = DealStageIndex()
@@ -3,18 +3,27 @@ DynamoDB service for caching lead analysis and marketing materials.
 
 Stores LLM-generated analysis and marketing material recommendations
 to avoid repeated API calls for the same lead.
+
+Reads and writes on the request path go through the shared aioboto3
+resource; table setup and status checks use the sync boto3 client.
 """
+import asyncio
 import json
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
-import boto3
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 from loguru import logger
 
+from app.core.aws import get_dynamodb_client, get_async_dynamodb_resource
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.schemas.lead_analysis import LeadAnalysis
 
 
+SIGNATURE_INDEX = "signature-index"
+
+
 class LeadAnalysisCache:
     """
     DynamoDB-based cache for lead analysis and marketing materials.
@@ -26,49 +35,43 @@ class LeadAnalysisCache:
     - similar_customers: JSON string of similar customers list
     - company_name: Company name for reference
     - fit_score: For easier querying/filtering
+    - signature: Hash of the analysis inputs (see LeadAnalysisService.compute_signature)
     - created_at: ISO timestamp when analysis was created
     - updated_at: ISO timestamp when analysis was last updated
     
+    GSI signature-index (signature, projecting analysis) finds an existing
+    analysis for another lead with the same company profile.
+    
     Note: If you don't have a lead_id, you can use company_name as the key.
+    
+    Hot entries are also kept in an in-process TTL cache so repeat views
+    skip the DynamoDB round trip.
     """
     
     def __init__(self):
         self._client = None
-        self._table = None
         self._table_checked = False
+        self._mem = TTLCache(
+            maxsize=settings.ANALYSIS_MEMORY_CACHE_SIZE,
+            ttl=settings.ANALYSIS_MEMORY_CACHE_TTL,
+        )
     
     def _get_client(self):
-        """Get or create DynamoDB client.
-        
-        Uses explicit credentials if provided, otherwise falls back to
-        boto3's credential chain (IAM role, env vars, AWS config file).
-        """
+        """Get the shared DynamoDB client."""
         if self._client is None:
-            # Build kwargs - only include credentials if explicitly set
-            kwargs = {"region_name": settings.AWS_REGION}
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                kwargs["aws_access_key_id"] = settings.AWS_ACCESS_KEY_ID
-                kwargs["aws_secret_access_key"] = settings.AWS_SECRET_ACCESS_KEY
-            
-            self._client = boto3.client("dynamodb", **kwargs)
+            self._client = get_dynamodb_client()
         return self._client
     
-    def _get_table(self):
-        """Get or create DynamoDB table resource.
-        
-        Uses explicit credentials if provided, otherwise falls back to
-        boto3's credential chain (IAM role, env vars, AWS config file).
-        """
-        if self._table is None:
-            # Build kwargs - only include credentials if explicitly set
-            kwargs = {"region_name": settings.AWS_REGION}
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                kwargs["aws_access_key_id"] = settings.AWS_ACCESS_KEY_ID
-                kwargs["aws_secret_access_key"] = settings.AWS_SECRET_ACCESS_KEY
-            
-            dynamodb = boto3.resource("dynamodb", **kwargs)
-            self._table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME)
-        return self._table
+    async def _get_table(self):
+        """Get the async DynamoDB table resource (backed by the shared aioboto3 resource)."""
+        resource = await get_async_dynamodb_resource()
+        return await resource.Table(settings.DYNAMODB_TABLE_NAME)
+    
+    async def _check_table(self) -> None:
+        """Ensure the table exists before first access."""
+        if not self._table_checked:
+            await asyncio.to_thread(self.ensure_table_exists)
+            self._table_checked = True
     
     @property
     def is_enabled(self) -> bool:
@@ -132,6 +135,9 @@ class LeadAnalysisCache:
             response = client.describe_table(TableName=settings.DYNAMODB_TABLE_NAME)
             table_status = response.get("Table", {}).get("TableStatus", "UNKNOWN")
             logger.info(f"DynamoDB table '{settings.DYNAMODB_TABLE_NAME}' exists (status: {table_status})")
+            indexes = response.get("Table", {}).get("GlobalSecondaryIndexes", [])
+            if not any(index["IndexName"] == SIGNATURE_INDEX for index in indexes):
+                self._add_signature_index(client)
             return True
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
@@ -148,7 +154,9 @@ class LeadAnalysisCache:
                         ],
                         AttributeDefinitions=[
                             {"AttributeName": "lead_id", "AttributeType": "S"},
+                            {"AttributeName": "signature", "AttributeType": "S"},
                         ],
+                        GlobalSecondaryIndexes=[self._signature_index_spec()],
                         BillingMode="PAY_PER_REQUEST",  # On-demand pricing
                     )
                     # Wait for table to be created
@@ -180,7 +188,28 @@ class LeadAnalysisCache:
             logger.error(f"Unexpected error in ensure_table_exists: {e}")
             return False
     
-    def get_analysis(self, lead_id: str) -> Optional[LeadAnalysis]:
+    @staticmethod
+    def _signature_index_spec() -> Dict[str, Any]:
+        """GSI definition for looking up analyses by input signature."""
+        return {
+            "IndexName": SIGNATURE_INDEX,
+            "KeySchema": [{"AttributeName": "signature", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["analysis"]},
+        }
+    
+    def _add_signature_index(self, client) -> None:
+        """Add the signature GSI to a table created before it existed (backfills asynchronously)."""
+        try:
+            client.update_table(
+                TableName=settings.DYNAMODB_TABLE_NAME,
+                AttributeDefinitions=[{"AttributeName": "signature", "AttributeType": "S"}],
+                GlobalSecondaryIndexUpdates=[{"Create": self._signature_index_spec()}],
+            )
+            logger.info(f"Adding GSI '{SIGNATURE_INDEX}' to DynamoDB table '{settings.DYNAMODB_TABLE_NAME}'")
+        except ClientError as e:
+            logger.warning(f"Could not add GSI '{SIGNATURE_INDEX}': {e}")
+    
+    async def get_analysis(self, lead_id: str) -> Optional[LeadAnalysis]:
         """
         Retrieve cached analysis for a lead.
         
@@ -190,12 +219,12 @@ class LeadAnalysisCache:
         Returns:
             LeadAnalysis if found in cache, None otherwise
         """
-        result = self.get_cached_data(lead_id)
+        result = await self.get_cached_data(lead_id)
         if result:
             return result[0]  # Return just the analysis
         return None
     
-    def get_cached_data(self, lead_id: str) -> Optional[Tuple[LeadAnalysis, List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    async def get_cached_data(self, lead_id: str) -> Optional[Tuple[LeadAnalysis, List[Dict[str, Any]], List[Dict[str, Any]]]]:
         """
         Retrieve cached analysis, marketing materials, and similar customers for a lead.
         
@@ -208,15 +237,18 @@ class LeadAnalysisCache:
         if not self.is_enabled:
             return None
         
+        cached = self._mem.get(lead_id)
+        if cached is not None:
+            logger.debug(f"Memory cache HIT for lead {lead_id}")
+            return cached
+        
         # Ensure table exists before first access
-        if not self._table_checked:
-            self.ensure_table_exists()
-            self._table_checked = True
+        await self._check_table()
         
         try:
-            table = self._get_table()
+            table = await self._get_table()
             # Simple GetItem with partition key only
-            response = table.get_item(Key={"lead_id": lead_id})
+            response = await table.get_item(Key={"lead_id": lead_id})
             
             if "Item" in response:
                 item = response["Item"]
@@ -233,7 +265,9 @@ class LeadAnalysisCache:
                     similar_customers = json.loads(item["similar_customers"])
                 
                 logger.info(f"Cache HIT for lead {lead_id}")
-                return (LeadAnalysis(**analysis_data), marketing_materials, similar_customers)
+                result = (LeadAnalysis(**analysis_data), marketing_materials, similar_customers)
+                self._mem.set(lead_id, result)
+                return result
             
             logger.debug(f"Cache MISS for lead {lead_id}")
             return None
@@ -248,12 +282,52 @@ class LeadAnalysisCache:
             logger.error(f"Unexpected error in get_cached_data: {e}")
             return None
     
-    def save_analysis(
+    async def get_by_signature(self, signature: str) -> Optional[LeadAnalysis]:
+        """
+        Retrieve an analysis previously generated from identical inputs.
+        
+        Args:
+            signature: Hash of the analysis inputs
+            
+        Returns:
+            LeadAnalysis if any lead was analysed with this signature, None otherwise
+        """
+        if not self.is_enabled:
+            return None
+        
+        # Ensure table exists before first access
+        await self._check_table()
+        
+        try:
+            table = await self._get_table()
+            response = await table.query(
+                IndexName=SIGNATURE_INDEX,
+                KeyConditionExpression=Key("signature").eq(signature),
+                Limit=1,
+            )
+            items = response.get("Items", [])
+            if items:
+                logger.info(f"Signature cache HIT for {signature} (lead {items[0]['lead_id']})")
+                return LeadAnalysis(**json.loads(items[0]["analysis"]))
+            
+            logger.debug(f"Signature cache MISS for {signature}")
+            return None
+            
+        except ClientError as e:
+            # Also covers the index still backfilling after _add_signature_index
+            logger.warning(f"Error querying signature index: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error in get_by_signature: {e}")
+            return None
+    
+    async def save_analysis(
         self, 
         lead_id: str, 
         analysis: LeadAnalysis,
         marketing_materials: Optional[List[Dict[str, Any]]] = None,
-        similar_customers: Optional[List[Dict[str, Any]]] = None
+        similar_customers: Optional[List[Dict[str, Any]]] = None,
+        signature: Optional[str] = None,
     ) -> bool:
         """
         Save analysis, marketing materials, and similar customers to cache.
@@ -263,6 +337,8 @@ class LeadAnalysisCache:
             analysis: LeadAnalysis object to cache
             marketing_materials: List of marketing material dicts to cache
             similar_customers: List of similar customer dicts to cache
+            signature: Hash of the analysis inputs, indexed so other leads with
+                       the same inputs can reuse the analysis (omit for fallbacks)
             
         Returns:
             True if saved successfully, False otherwise
@@ -271,32 +347,29 @@ class LeadAnalysisCache:
             return False
         
         # Ensure table exists before first access
-        if not self._table_checked:
-            self.ensure_table_exists()
-            self._table_checked = True
+        await self._check_table()
         
         try:
-            table = self._get_table()
+            table = await self._get_table()
             now = datetime.utcnow().isoformat()
             
-            # Convert analysis to dict, handling Pydantic model
-            if hasattr(analysis, "model_dump"):
-                analysis_dict = analysis.model_dump()
-            else:
-                analysis_dict = analysis.dict()
-            
+            # Serialize straight to JSON (no intermediate dict) and read the
+            # indexed fields off the model
             item = {
                 "lead_id": lead_id,
-                "analysis": json.dumps(analysis_dict),
+                "analysis": analysis.model_dump_json(),
                 "marketing_materials": json.dumps(marketing_materials or []),
                 "similar_customers": json.dumps(similar_customers or []),
-                "company_name": analysis_dict.get("company_name", "Unknown"),
-                "fit_score": analysis_dict.get("fit_score", 5),
+                "company_name": analysis.company_name,
+                "fit_score": analysis.fit_score,
                 "created_at": now,
                 "updated_at": now,
             }
+            if signature:
+                item["signature"] = signature
             
-            table.put_item(Item=item)
+            await table.put_item(Item=item)
+            self._mem.set(lead_id, (analysis, marketing_materials or [], similar_customers or []))
             logger.info(f"Cached analysis, {len(marketing_materials or [])} materials, {len(similar_customers or [])} similar customers for lead {lead_id}")
             return True
             
@@ -307,7 +380,7 @@ class LeadAnalysisCache:
             logger.error(f"Unexpected error in save_analysis: {e}")
             return False
     
-    def delete_analysis(self, lead_id: str) -> bool:
+    async def delete_analysis(self, lead_id: str) -> bool:
         """
         Delete cached analysis for a lead.
         
@@ -320,10 +393,12 @@ class LeadAnalysisCache:
         if not self.is_enabled:
             return False
         
+        self._mem.pop(lead_id)
+        
         try:
-            table = self._get_table()
+            table = await self._get_table()
             # Simple DeleteItem with partition key only
-            table.delete_item(Key={"lead_id": lead_id})
+            await table.delete_item(Key={"lead_id": lead_id})
             logger.info(f"Deleted cached analysis for lead {lead_id}")
             return True
             
@@ -331,7 +406,7 @@ class LeadAnalysisCache:
             logger.error(f"Error deleting from DynamoDB: {e}")
             return False
     
-    def update_analysis(self, lead_id: str, analysis: LeadAnalysis) -> bool:
+    async def update_analysis(self, lead_id: str, analysis: LeadAnalysis) -> bool:
         """
         Update existing cached analysis (or create if not exists).
         
@@ -343,7 +418,17 @@ class LeadAnalysisCache:
             True if updated successfully, False otherwise
         """
         # For simplicity, just use save which will overwrite
-        return self.save_analysis(lead_id, analysis)
+        return await self.save_analysis(lead_id, analysis)
+    
+    def remember(self, lead_id: str, cached_data: tuple) -> None:
+        """
+        Put a freshly generated result in the in-process cache only.
+        
+        Args:
+            lead_id: Zoho Lead ID (or cache key)
+            cached_data: Tuple of (analysis, marketing_materials, similar_customers)
+        """
+        self._mem.set(lead_id, cached_data)
 
 
 # Create singleton instance
@@ -4,13 +4,12 @@ DynamoDB store for LLM prompts.
 Stores all prompts (Leads + Application modules) in a single table.
 Used as the only source of truth for prompts; no file or code defaults after seed.
 """
-import json
-from typing import Dict, Any, Optional
+from typing import Dict
 from datetime import datetime
-import boto3
 from botocore.exceptions import ClientError
 from loguru import logger
 
+from app.core.aws import get_dynamodb_client, get_dynamodb_resource
 from app.core.config import settings
 
 
@@ -47,22 +46,15 @@ class PromptStore:
         return settings.DYNAMODB_PROMPTS_TABLE_NAME
 
     def _get_client(self):
+        """Get the shared DynamoDB client."""
         if self._client is None:
-            kwargs = {"region_name": settings.AWS_REGION}
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                kwargs["aws_access_key_id"] = settings.AWS_ACCESS_KEY_ID
-                kwargs["aws_secret_access_key"] = settings.AWS_SECRET_ACCESS_KEY
-            self._client = boto3.client("dynamodb", **kwargs)
+            self._client = get_dynamodb_client()
         return self._client
 
     def _get_table(self):
+        """Get the DynamoDB table resource (backed by the shared client)."""
         if self._table is None:
-            kwargs = {"region_name": settings.AWS_REGION}
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                kwargs["aws_access_key_id"] = settings.AWS_ACCESS_KEY_ID
-                kwargs["aws_secret_access_key"] = settings.AWS_SECRET_ACCESS_KEY
-            dynamodb = boto3.resource("dynamodb", **kwargs)
-            self._table = dynamodb.Table(settings.DYNAMODB_PROMPTS_TABLE_NAME)
+            self._table = get_dynamodb_resource().Table(settings.DYNAMODB_PROMPTS_TABLE_NAME)
         return self._table
 
     @property
@@ -150,30 +142,40 @@ class PromptStore:
             return _get_seed_prompts()
 
     def put_prompts(self, prompts: Dict[str, str]) -> bool:
-        """Save prompts to DynamoDB."""
+        """
+        Save prompts to DynamoDB.
+
+        All prompts are written in one transaction, so a multi-prompt update
+        is applied completely or not at all.
+        """
         if not self.is_enabled:
             logger.warning("DynamoDB is disabled, cannot save prompts")
             return False
         if not self._table_checked:
             self.ensure_table_exists()
-        table = self._get_table()
         now = datetime.utcnow().isoformat() + "Z"
+        items = [
+            {
+                "Put": {
+                    "TableName": self.table_name,
+                    "Item": {
+                        "prompt_key": {"S": key},
+                        "value": {"S": value},
+                        "updated_at": {"S": now},
+                    },
+                }
+            }
+            for key, value in prompts.items()
+            if key in PROMPT_KEYS
+        ]
+        if not items:
+            return True
         try:
-            for key, value in prompts.items():
-                if key not in PROMPT_KEYS:
-                    continue
-                table.put_item(
-                    Item={
-                        "prompt_key": key,
-                        "value": value,
-                        "updated_at": now,
-                    }
-                )
-            logger.info(f"Saved {len(prompts)} prompts to DynamoDB")
+            self._get_client().transact_write_items(TransactItems=items)
+            logger.info(f"Saved {len(items)} prompts to DynamoDB")
             return True
         except Exception as e:
             logger.error(f"Failed to save prompts: {e}")
             return False
 
-
 prompt_store = PromptStore()
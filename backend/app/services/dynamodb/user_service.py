@@ -4,16 +4,14 @@ DynamoDB User Service.
 Manages user authentication data in DynamoDB.
 Table: tbdc_users
 """
-import json
 import hashlib
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional, Dict, Any
-import boto3
 from botocore.exceptions import ClientError
 from loguru import logger
 
-from app.core.config import settings
+from app.core.aws import get_dynamodb_client, get_dynamodb_resource
 
 
 class UserService:
@@ -37,44 +35,15 @@ class UserService:
         self._table_checked = False
     
     def _get_client(self):
-        """Get or create DynamoDB client."""
+        """Get the shared DynamoDB client."""
         if self._client is None:
-            # If explicit credentials are provided, use them
-            # Otherwise, boto3 will use IAM role credentials automatically
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                self._client = boto3.client(
-                    "dynamodb",
-                    region_name=settings.AWS_REGION,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                )
-            else:
-                # Use default credential chain (IAM role, env vars, etc.)
-                self._client = boto3.client(
-                    "dynamodb",
-                    region_name=settings.AWS_REGION,
-                )
+            self._client = get_dynamodb_client()
         return self._client
     
     def _get_table(self):
-        """Get or create DynamoDB table resource."""
+        """Get the DynamoDB table resource (backed by the shared client)."""
         if self._table is None:
-            # If explicit credentials are provided, use them
-            # Otherwise, boto3 will use IAM role credentials automatically
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                dynamodb = boto3.resource(
-                    "dynamodb",
-                    region_name=settings.AWS_REGION,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                )
-            else:
-                # Use default credential chain (IAM role, env vars, etc.)
-                dynamodb = boto3.resource(
-                    "dynamodb",
-                    region_name=settings.AWS_REGION,
-                )
-            self._table = dynamodb.Table(self.TABLE_NAME)
+            self._table = get_dynamodb_resource().Table(self.TABLE_NAME)
         return self._table
     
     @property
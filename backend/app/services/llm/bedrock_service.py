@@ -9,14 +9,43 @@ Provides AI-powered analysis of lead data including:
 - Fit assessment
 - Suggested questions to ask
 """
+import hashlib
 import json
-from typing import Dict, Any, Optional
-import boto3
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
 from botocore.exceptions import ClientError
 from loguru import logger
 
+from app.core.aws import get_bedrock_runtime_client
 from app.core.config import settings
+from app.core.logging import format_fields
 from app.schemas.lead_analysis import LeadAnalysis
+from app.services.vector.embedding_service import embedding_service
+from app.services.vector.semantic_cache import SemanticCache
+
+
+# Lead fields that describe the company; two leads that agree on these (and on
+# the enrichment content) get the same analysis, whoever the contact is
+PROFILE_FIELDS = ("Company", "Industry", "Country", "Description", "Website")
+
+# Prefix of fit_assessment on the fallback analysis returned when the LLM fails
+FALLBACK_ASSESSMENT_PREFIX = "Analysis unavailable: "
+
+
+def _company_identity(lead_data: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Normalized (company name, website domain) of a lead.
+    
+    A semantic cache hit is only reused for the same company: a near-identical
+    profile of a different company must not inherit its company-specific analysis.
+    """
+    company = " ".join(str(lead_data.get("Company") or "").lower().split())
+    website = str(lead_data.get("Website") or "").strip().lower()
+    if website and not website.startswith(("http://", "https://")):
+        website = "https://" + website
+    parsed = urlparse(website)
+    domain = (parsed.netloc or parsed.path.split("/")[0]).removeprefix("www.")
+    return company, domain
 
 
 class BedrockService:
@@ -28,23 +57,9 @@ class BedrockService:
         self._client = None
     
     def _get_client(self):
-        """Get or create Bedrock runtime client."""
+        """Get the shared Bedrock runtime client."""
         if self._client is None:
-            # If explicit credentials are provided, use them
-            # Otherwise, boto3 will use IAM role credentials automatically
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                self._client = boto3.client(
-                    "bedrock-runtime",
-                    region_name=settings.AWS_REGION,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                )
-            else:
-                # Use default credential chain (IAM role, env vars, etc.)
-                self._client = boto3.client(
-                    "bedrock-runtime",
-                    region_name=settings.AWS_REGION,
-                )
+            self._client = get_bedrock_runtime_client()
         return self._client
     
     @property
@@ -229,6 +244,53 @@ Company Input:
         # Import here to avoid circular imports
         from app.services.llm.prompt_manager import prompt_manager
         self.prompt_manager = prompt_manager
+        # Opt-in: reuse analyses of companies whose profile embeds near-identically
+        self._semantic_cache: Optional[SemanticCache] = None
+        if settings.LEAD_ANALYSIS_SEMANTIC_CACHE:
+            self._semantic_cache = SemanticCache(
+                threshold=settings.LEAD_ANALYSIS_CACHE_THRESHOLD,
+                ttl=settings.LEAD_ANALYSIS_CACHE_TTL,
+            )
+    
+    def compute_signature(
+        self,
+        lead_data: Dict[str, Any],
+        attachment_text: Optional[str] = None,
+        website_text: Optional[str] = None,
+        linkedin_text: Optional[str] = None,
+    ) -> str:
+        """
+        Hash the company profile and enrichment content that drive the analysis.
+        
+        Contact details are left out so that re-analysing an edited lead, or a
+        second lead for the same company, can reuse an existing analysis. The
+        prompts are included so that prompt changes invalidate old entries.
+        
+        Args:
+            lead_data: Lead data from Zoho CRM
+            attachment_text: Extracted attachment text
+            website_text: Scraped website text
+            linkedin_text: Scraped LinkedIn text
+            
+        Returns:
+            Hex digest identifying the analysis inputs
+        """
+        profile = {field: lead_data.get(field) for field in PROFILE_FIELDS}
+        prompts = [
+            self.prompt_manager.get_system_prompt(),
+            self.prompt_manager.get_analysis_prompt(),
+        ]
+        payload = json.dumps(
+            [profile, attachment_text or "", website_text or "", linkedin_text or "", prompts],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def is_fallback(analysis: LeadAnalysis) -> bool:
+        """Check whether an analysis is the placeholder returned when the LLM failed."""
+        return analysis.fit_assessment.startswith(FALLBACK_ASSESSMENT_PREFIX)
     
     def analyze_lead(
         self, 
@@ -250,6 +312,26 @@ Company Input:
         Returns:
             LeadAnalysis object with AI-generated insights
         """
+        # Attachments are specific to one company, so only match leads without
+        # them, and only reuse an analysis of the same company name and website
+        profile_embedding = None
+        identity = _company_identity(lead_data)
+        if (
+            self._semantic_cache is not None
+            and not attachment_text
+            and any(identity)
+            and embedding_service.is_configured
+        ):
+            profile_text = "\n".join(
+                f"{field}: {lead_data[field]}" for field in PROFILE_FIELDS if lead_data.get(field)
+            )
+            profile_embedding = embedding_service.generate_embedding(profile_text)
+            if profile_embedding is not None:
+                cached = self._semantic_cache.get(profile_embedding)
+                if cached is not None and cached[0] == identity:
+                    logger.info("[LeadAnalysis] Semantic cache HIT, skipping Bedrock")
+                    return cached[1].model_copy(deep=True)
+        
         # Format lead data for the prompt
         formatted_data = self._format_lead_data(
             lead_data, attachment_text, website_text, linkedin_text
@@ -273,8 +355,8 @@ Company Input:
         
         # Log the final prompt being sent to LLM
         logger.info("=== LEAD ANALYSIS PROMPT START ===")
-        logger.info(f"System Prompt ({len(system_prompt)} chars):\n{system_prompt}")
-        logger.info(f"User Prompt ({len(prompt)} chars):\n{prompt}")
+        logger.opt(lazy=True).debug("System Prompt ({} chars):\n{}", lambda: len(system_prompt), lambda: system_prompt)
+        logger.opt(lazy=True).debug("User Prompt ({} chars):\n{}", lambda: len(prompt), lambda: prompt)
         logger.info("=== LEAD ANALYSIS PROMPT END ===")
         
         try:
@@ -287,15 +369,18 @@ Company Input:
             
             # Log the full LLM response without truncation
             logger.info(f"[LeadAnalysis] LLM Call done: Response length = {len(response)} chars")
-            logger.info(f"[LeadAnalysis] LLM Raw Response:\n{response}")
+            logger.opt(lazy=True).debug("[LeadAnalysis] LLM Raw Response:\n{}", lambda: response)
             
             # Parse JSON response
             analysis_data = self._parse_response(response)
             
             logger.info(f"[LeadAnalysis] Parsed {len(analysis_data)} fields from lead analysis")
-            logger.info("[LeadAnalysis] Fields received:\n" + "\n".join(f"  {k}: {v}" for k, v in analysis_data.items()))
+            logger.opt(lazy=True).debug("[LeadAnalysis] Fields received:\n{}", lambda: format_fields(analysis_data))
             
-            return LeadAnalysis(**analysis_data)
+            analysis = LeadAnalysis(**analysis_data)
+            if profile_embedding is not None and not self.is_fallback(analysis):
+                self._semantic_cache.set(profile_embedding, (identity, analysis.model_copy(deep=True)))
+            return analysis
             
         except Exception as e:
             logger.error(f"Error analyzing lead: {e}")
@@ -400,7 +485,7 @@ Company Input:
             "company_size": "Unknown",
             "likely_icp_canada": "Unknown",
             "fit_score": 5,
-            "fit_assessment": f"Analysis unavailable: {error_message}",
+            "fit_assessment": f"{FALLBACK_ASSESSMENT_PREFIX}{error_message}",
             "key_insights": ["Analysis could not be completed - manual review required"],
             "questions_to_ask": [
                 "What is your core product and who is your primary customer?",
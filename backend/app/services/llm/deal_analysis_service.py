@@ -8,10 +8,12 @@ Provides AI-powered analysis of deal data including:
 - Scoring Rubric and Fit Assessment
 - Support Required with actionable recommendations
 """
+import hashlib
 import json
 from typing import Dict, Any, Optional, List
 from loguru import logger
 
+from app.core.logging import format_fields
 from app.services.llm.bedrock_service import bedrock_service
 from app.schemas.deal_analysis import DealAnalysis, RevenueCustomer
 
@@ -21,7 +23,7 @@ from app.schemas.deal_analysis import DealAnalysis, RevenueCustomer
 class DealAnalysisService:
     """
     Service for analyzing deals using LLM.
-    All prompts are fetched from DynamoDB via prompt_manager on every call (no cache).
+    Prompts are read from prompt_manager on every call, so updates apply immediately.
     """
     
     def __init__(self):
@@ -48,6 +50,44 @@ class DealAnalysisService:
         """Get the deal scoring prompt template from DynamoDB."""
         return self._get_prompt_manager().get_deal_scoring_prompt()
     
+    def compute_input_hash(
+        self,
+        deal_data: Dict[str, Any],
+        attachment_text: Optional[str] = None,
+        meeting_text: Optional[str] = None,
+    ) -> str:
+        """
+        Hash everything that feeds the deal analysis prompts.
+        
+        Used to detect whether a forced refresh would actually see different
+        inputs. Zoho bookkeeping fields (id, Modified_Time, $-prefixed) are
+        ignored so touching a deal without changing it keeps the same hash.
+        
+        Args:
+            deal_data: Deal data from Zoho CRM
+            attachment_text: Extracted attachment text
+            meeting_text: Fireflies meeting notes
+            
+        Returns:
+            Hex digest of the analysis inputs
+        """
+        fields = {
+            k: v for k, v in deal_data.items()
+            if k not in ("id", "Modified_Time") and not k.startswith("$")
+        }
+        prompts = [
+            self.get_system_prompt(),
+            self.get_analysis_prompt(),
+            self.get_scoring_system_prompt(),
+            self.get_scoring_prompt(),
+        ]
+        payload = json.dumps(
+            [fields, attachment_text or "", meeting_text or "", prompts],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    
     def analyze_deal(
         self, 
         deal_data: Dict[str, Any],
@@ -77,7 +117,7 @@ class DealAnalysisService:
         logger.info("[DealAnalysis] LLM Call 1/2: Sending main deal analysis request to Bedrock")
         analysis_data = self._run_main_analysis(formatted_data, attachment_text)
         logger.info(f"[DealAnalysis] LLM Call 1/2 done: Got {len(analysis_data)} fields from main analysis")
-        logger.info("[DealAnalysis] LLM Call 1/2 fields received:\n" + "\n".join(f"  {k}: {v}" for k, v in analysis_data.items()))
+        logger.opt(lazy=True).debug("[DealAnalysis] LLM Call 1/2 fields received:\n{}", lambda: format_fields(analysis_data))
         
         # Convert revenue_top_5_customers to proper format
         if "revenue_top_5_customers" in analysis_data:
@@ -130,8 +170,8 @@ class DealAnalysisService:
             logger.debug("Analyzing deal with LLM...")
         
         logger.info("=== DEAL ANALYSIS PROMPT START ===")
-        logger.info(f"System Prompt ({len(system_prompt)} chars):\n{system_prompt}")
-        logger.info(f"User Prompt ({len(prompt)} chars):\n{prompt}")
+        logger.opt(lazy=True).debug("System Prompt ({} chars):\n{}", lambda: len(system_prompt), lambda: system_prompt)
+        logger.opt(lazy=True).debug("User Prompt ({} chars):\n{}", lambda: len(prompt), lambda: prompt)
         logger.info("=== DEAL ANALYSIS PROMPT END ===")
         
         try:
@@ -184,8 +224,8 @@ class DealAnalysisService:
             prompt = f"{prompt}\n\nAnalysis:\n{analysis_summary}"
         
         logger.info("=== SCORING RUBRIC PROMPT START ===")
-        logger.info(f"System Prompt ({len(scoring_system_prompt)} chars):\n{scoring_system_prompt}")
-        logger.info(f"User Prompt ({len(prompt)} chars):\n{prompt}")
+        logger.opt(lazy=True).debug("System Prompt ({} chars):\n{}", lambda: len(scoring_system_prompt), lambda: scoring_system_prompt)
+        logger.opt(lazy=True).debug("User Prompt ({} chars):\n{}", lambda: len(prompt), lambda: prompt)
         logger.info("=== SCORING RUBRIC PROMPT END ===")
         
         try:
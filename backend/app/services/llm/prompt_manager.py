@@ -4,9 +4,14 @@ Prompt Manager Service.
 Manages all LLM prompts (Leads and Deals/Application modules)
 with persistence in DynamoDB only. No file or code defaults at runtime.
 """
-from typing import Dict, Optional
+import threading
+import time
+from typing import Dict, Optional, Tuple
 from loguru import logger
 
+from app.core.config import settings
+from app.core.etag import compute_etag
+
 from app.services.dynamodb.prompt_store import (
     prompt_store,
     PROMPT_KEYS,
@@ -25,12 +30,58 @@ DEAL_SCORING_PROMPT_KEY = "deal_scoring_prompt"
 class PromptManager:
     """
     Manages all LLM prompts (Leads + Deals) with DynamoDB as the only persistence.
-    No in-memory cache: every read goes to DynamoDB.
+
+    Reads are served from a snapshot of the table that is reloaded after
+    PROMPT_CACHE_TTL seconds. Every write through this manager bumps
+    ``version`` and updates the snapshot, so services always read the
+    current prompts on demand instead of holding their own copies.
     """
 
+    def __init__(self):
+        self.version = 0
+        self._lock = threading.Lock()
+        self._prompts: Optional[Tuple[Dict[str, str], str]] = None  # (prompts, etag)
+        self._loaded_at = 0.0
+
+    def _snapshot(self) -> Tuple[Dict[str, str], str]:
+        """Get the current prompts and their ETag, reloading from DynamoDB when stale."""
+        snapshot = self._prompts
+        if snapshot is not None and time.monotonic() - self._loaded_at < settings.PROMPT_CACHE_TTL:
+            return snapshot
+        version = self.version
+        prompts = prompt_store.get_all_prompts()
+        snapshot = (prompts, compute_etag(prompts))
+        with self._lock:
+            # Don't cache a read that raced with an update
+            if version == self.version:
+                self._prompts = snapshot
+                self._loaded_at = time.monotonic()
+        return snapshot
+
+    def _save(self, prompts: Dict[str, str]) -> bool:
+        """
+        Write prompts to DynamoDB and bump the version.
+
+        On success the written values are merged into the current snapshot
+        (keeping its load time), so reading them back costs no DynamoDB
+        round-trip; on failure the snapshot is dropped.
+        """
+        success = prompt_store.put_prompts(prompts)
+        with self._lock:
+            self.version += 1
+            snapshot = self._prompts
+            if success and snapshot is not None:
+                merged = {**snapshot[0], **{k: v for k, v in prompts.items() if k in PROMPT_KEYS}}
+                self._prompts = (merged, compute_etag(merged))
+            else:
+                self._prompts = None
+        if success:
+            logger.debug(f"Prompts updated (version {self.version})")
+        return success
+
     def _get(self, key: str) -> str:
-        """Fetch prompts from DynamoDB and return the value for key."""
-        return prompt_store.get_all_prompts().get(key, "")
+        """Get the current value of one prompt."""
+        return self._snapshot()[0].get(key, "")
 
     # ----- Lead prompts -----
 
@@ -57,14 +108,24 @@ class PromptManager:
     # ----- Bulk operations -----
 
     def get_all_prompts(self) -> Dict[str, str]:
-        """Get all prompts from DynamoDB (no cache)."""
-        return prompt_store.get_all_prompts()
+        """Get all prompts (a copy of the current snapshot)."""
+        return dict(self._snapshot()[0])
+
+    def get_all_prompts_tagged(self) -> Tuple[Dict[str, str], str]:
+        """
+        Get all prompts together with an ETag of their content.
+
+        Returns:
+            Tuple of (prompts, etag); the ETag changes whenever any prompt does
+        """
+        prompts, etag = self._snapshot()
+        return dict(prompts), etag
 
     def update_system_prompt(self, prompt: str) -> bool:
-        return prompt_store.put_prompts({LEAD_SYSTEM_PROMPT_KEY: prompt})
+        return self._save({LEAD_SYSTEM_PROMPT_KEY: prompt})
 
     def update_analysis_prompt(self, prompt: str) -> bool:
-        return prompt_store.put_prompts({LEAD_ANALYSIS_PROMPT_KEY: prompt})
+        return self._save({LEAD_ANALYSIS_PROMPT_KEY: prompt})
 
     def update_prompts(self, **kwargs: Optional[str]) -> bool:
         """
@@ -81,11 +142,11 @@ class PromptManager:
             "deal_scoring_prompt": DEAL_SCORING_PROMPT_KEY,
         }
         to_save = {valid[k]: v for k, v in kwargs.items() if k in valid and v is not None}
-        return prompt_store.put_prompts(to_save) if to_save else True
+        return self._save(to_save) if to_save else True
 
     def reset_to_defaults(self) -> bool:
         """Reset all prompts to seed values and save to DynamoDB."""
-        return prompt_store.put_prompts(_get_seed_prompts())
+        return self._save(_get_seed_prompts())
 
 
 prompt_manager = PromptManager()
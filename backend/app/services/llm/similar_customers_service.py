@@ -6,12 +6,15 @@ real companies that match the profile.
 """
 import json
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 import httpx
 from loguru import logger
+from pydantic import BaseModel
 
 from app.core.config import settings
 from app.services.llm.bedrock_service import bedrock_service
+from app.services.vector.embedding_service import embedding_service
+from app.services.vector.semantic_cache import SemanticCache
 
 
 class SimilarCustomer:
@@ -103,8 +106,23 @@ IMPORTANT:
 
 Respond ONLY with the JSON object."""
 
+    # Analysis fields added to the lead context, with their prompt labels
+    ANALYSIS_CONTEXT_FIELDS = (
+        ("product_description", "Product"),
+        ("vertical", "Vertical"),
+        ("business_model", "Business Model"),
+        ("likely_icp_canada", "Target ICP in Canada"),
+    )
+    
     def __init__(self):
         self.bedrock = bedrock_service
+        # Opt-in: reuse results for companies whose context embeds near-identically
+        self._semantic_cache: Optional[SemanticCache] = None
+        if settings.SIMILAR_CUSTOMERS_SEMANTIC_CACHE:
+            self._semantic_cache = SemanticCache(
+                threshold=settings.SIMILAR_CUSTOMERS_CACHE_THRESHOLD,
+                ttl=settings.SIMILAR_CUSTOMERS_CACHE_TTL,
+            )
     
     def _format_lead_data(self, lead_data: Dict[str, Any]) -> str:
         """Format lead data for the prompt."""
@@ -129,14 +147,15 @@ Respond ONLY with the JSON object."""
     def find_similar_customers(
         self, 
         lead_data: Dict[str, Any],
-        analysis_data: Optional[Dict[str, Any]] = None
+        analysis_data: Optional[Union[BaseModel, Dict[str, Any]]] = None
     ) -> List[Dict[str, str]]:
         """
         Find similar customers for a lead.
         
         Args:
             lead_data: Lead data from Zoho
-            analysis_data: Optional existing analysis to enhance context
+            analysis_data: Optional existing analysis (LeadAnalysis/DealAnalysis
+                           model or dict) to enhance context
             
         Returns:
             List of similar customer dictionaries
@@ -150,17 +169,24 @@ Respond ONLY with the JSON object."""
             context_parts = [self._format_lead_data(lead_data)]
             
             if analysis_data:
-                if analysis_data.get("product_description"):
-                    context_parts.append(f"- Product: {analysis_data['product_description']}")
-                if analysis_data.get("vertical"):
-                    context_parts.append(f"- Vertical: {analysis_data['vertical']}")
-                if analysis_data.get("business_model"):
-                    context_parts.append(f"- Business Model: {analysis_data['business_model']}")
-                if analysis_data.get("likely_icp_canada"):
-                    context_parts.append(f"- Target ICP in Canada: {analysis_data['likely_icp_canada']}")
+                # Read the few fields used directly instead of dumping the whole model
+                is_model = isinstance(analysis_data, BaseModel)
+                for field, label in self.ANALYSIS_CONTEXT_FIELDS:
+                    value = getattr(analysis_data, field, None) if is_model else analysis_data.get(field)
+                    if value:
+                        context_parts.append(f"- {label}: {value}")
             
             context = "\n".join(context_parts)
             
+            context_embedding = None
+            if self._semantic_cache is not None and embedding_service.is_configured:
+                context_embedding = embedding_service.generate_embedding(context)
+                if context_embedding is not None:
+                    cached = self._semantic_cache.get(context_embedding)
+                    if cached is not None:
+                        logger.info(f"Similar customers semantic cache HIT ({len(cached)} customers)")
+                        return [dict(customer) for customer in cached]
+            
             prompt = self.CUSTOMER_ANALYSIS_PROMPT.format(lead_data=context)
             system_prompt = "You are an expert B2B market analyst who helps identify ideal customer profiles and finds real companies that match. Always suggest real, existing companies."
             
@@ -181,6 +207,9 @@ Respond ONLY with the JSON object."""
             # Parse response
             similar_customers = self._parse_response(response)
             
+            if context_embedding is not None and similar_customers:
+                self._semantic_cache.set(context_embedding, tuple(similar_customers))
+            
             logger.info(f"Found {len(similar_customers)} similar customers")
             return similar_customers
             
@@ -4,12 +4,13 @@ Embedding Service using AWS Bedrock Titan Embeddings.
 Generates text embeddings for semantic similarity search.
 """
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 import numpy as np
-import boto3
 from botocore.exceptions import ClientError
 from loguru import logger
 
+from app.core.aws import get_bedrock_runtime_client
 from app.core.config import settings
 
 
@@ -26,23 +27,9 @@ class EmbeddingService:
         self._client = None
     
     def _get_client(self):
-        """Get or create Bedrock runtime client."""
+        """Get the shared Bedrock runtime client."""
         if self._client is None:
-            # If explicit credentials are provided, use them
-            # Otherwise, boto3 will use IAM role credentials automatically
-            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-                self._client = boto3.client(
-                    "bedrock-runtime",
-                    region_name=settings.AWS_REGION,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                )
-            else:
-                # Use default credential chain (IAM role, env vars, etc.)
-                self._client = boto3.client(
-                    "bedrock-runtime",
-                    region_name=settings.AWS_REGION,
-                )
+            self._client = get_bedrock_runtime_client()
         return self._client
     
     @property
@@ -116,17 +103,21 @@ class EmbeddingService:
         """
         Generate embeddings for multiple texts.
         
+        Titan takes one input text per request, so the requests are issued
+        concurrently over the shared (thread-safe) client, at most
+        BEDROCK_MAX_CONCURRENCY at a time.
+        
         Args:
             texts: List of texts to embed
             
         Returns:
-            List of embeddings (None for failed ones)
+            List of embeddings in input order (None for failed ones)
         """
-        embeddings = []
-        for text in texts:
-            embedding = self.generate_embedding(text)
-            embeddings.append(embedding)
-        return embeddings
+        if len(texts) <= 1:
+            return [self.generate_embedding(text) for text in texts]
+        
+        with ThreadPoolExecutor(max_workers=min(len(texts), settings.BEDROCK_MAX_CONCURRENCY)) as pool:
+            return list(pool.map(self.generate_embedding, texts))
 
 
 # Singleton instance
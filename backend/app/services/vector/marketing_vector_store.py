@@ -5,11 +5,13 @@ Stores and searches marketing material embeddings using FAISS.
 Provides semantic similarity search for lead-to-material matching.
 """
 import os
+import hashlib
 import json
 import pickle
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 from pathlib import Path
 import numpy as np
+import openpyxl
 from loguru import logger
 
 try:
@@ -19,6 +21,7 @@ except ImportError:
     FAISS_AVAILABLE = False
     logger.warning("FAISS not installed. Vector search will be disabled.")
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.services.vector.embedding_service import embedding_service
 
@@ -91,6 +94,9 @@ class MarketingVectorStore:
     - Fast semantic similarity search
     """
     
+    # Materials embedded and added to the index per batch while indexing
+    EMBEDDING_BATCH_SIZE = 96
+    
     def __init__(self, storage_dir: str = None):
         self.storage_dir = Path(storage_dir or settings.BASE_DIR / "data" / "vector_store")
         self.storage_dir.mkdir(parents=True, exist_ok=True)
@@ -100,8 +106,13 @@ class MarketingVectorStore:
         
         self.index: Optional[Any] = None  # FAISS index
         self.materials: List[MarketingMaterial] = []  # Material metadata
+        self.material_dicts: List[Dict[str, Any]] = []  # to_dict() of each material, built once
+        self.fingerprint = ""  # Hash of material_dicts, changes whenever the materials do
         self._loaded = False
         
+        # Results per (query text, top_k); cleared whenever the index changes
+        self._search_cache = TTLCache(maxsize=512, ttl=3600)
+        
         # Load existing index if available
         self._load_index()
     
@@ -124,7 +135,7 @@ class MarketingVectorStore:
             if self.index_path.exists() and self.metadata_path.exists():
                 self.index = faiss.read_index(str(self.index_path))
                 with open(self.metadata_path, "rb") as f:
-                    self.materials = pickle.load(f)
+                    self._set_materials(pickle.load(f))
                 self._loaded = True
                 logger.info(f"Loaded vector index with {len(self.materials)} materials")
                 return True
@@ -133,6 +144,15 @@ class MarketingVectorStore:
         
         return False
     
+    def _set_materials(self, materials: List[MarketingMaterial]) -> None:
+        """Replace the material metadata and everything derived from it."""
+        self.materials = materials
+        self.material_dicts = [material.to_dict() for material in materials]
+        self.fingerprint = hashlib.blake2b(
+            json.dumps(self.material_dicts, sort_keys=True).encode(), digest_size=8
+        ).hexdigest()
+        self._search_cache.clear()
+    
     def _save_index(self) -> bool:
         """Save index to disk."""
         if not FAISS_AVAILABLE or self.index is None:
@@ -172,74 +192,56 @@ class MarketingVectorStore:
             return {"success": False, "error": "AWS not configured for embeddings"}
         
         try:
-            import pandas as pd
-            
-            # Read Excel file
             logger.info(f"Reading Excel file: {excel_path}")
-            df = pd.read_excel(excel_path)
-            
-            # Normalize column names
-            df.columns = df.columns.str.strip()
-            
-            # Map columns (handle variations in column names)
-            column_mapping = {
-                "Collateral Title": "title",
-                "LINK": "link",
-                "Industry": "industry",
-                "Business Topics": "business_topics",
-                "Other Notes": "other_notes",
-            }
-            
+            dimension = embedding_service.EMBEDDING_DIMENSION
+            index = faiss.IndexFlatIP(dimension)
             materials = []
-            texts = []
+            batch = []
             
-            for idx, row in df.iterrows():
+            def flush() -> None:
+                # Embed one batch (requests run concurrently) and add it to the new index
+                embeddings = [
+                    # Use zero vector for failed embeddings
+                    embedding if embedding is not None else np.zeros(dimension, dtype=np.float32)
+                    for embedding in embedding_service.generate_embeddings_batch(
+                        [material.to_text() for material in batch]
+                    )
+                ]
+                embeddings_matrix = np.vstack(embeddings).astype(np.float32)
+                
+                # Normalize for cosine similarity (Inner Product on normalized vectors)
+                faiss.normalize_L2(embeddings_matrix)
+                index.add(embeddings_matrix)
+                materials.extend(batch)
+                batch.clear()
+                logger.info(f"Processed {len(materials)} materials")
+            
+            for idx, row in enumerate(self._iter_excel_rows(excel_path)):
                 material = MarketingMaterial(
                     material_id=f"mat_{idx}",
-                    title=str(row.get("Collateral Title", "")).strip(),
-                    link=str(row.get("LINK", "")).strip(),
-                    industry=str(row.get("Industry", "")).strip() if pd.notna(row.get("Industry")) else "",
-                    business_topics=str(row.get("Business Topics", "")).strip() if pd.notna(row.get("Business Topics")) else "",
-                    other_notes=str(row.get("Other Notes", "")).strip() if pd.notna(row.get("Other Notes")) else "",
+                    title=row.get("Collateral Title", ""),
+                    link=row.get("LINK", ""),
+                    industry=row.get("Industry", ""),
+                    business_topics=row.get("Business Topics", ""),
+                    other_notes=row.get("Other Notes", ""),
                 )
                 
                 # Skip materials without title
-                if not material.title or material.title == "nan":
+                if not material.title:
                     continue
                 
-                materials.append(material)
-                texts.append(material.to_text())
+                batch.append(material)
+                if len(batch) >= self.EMBEDDING_BATCH_SIZE:
+                    flush()
+            
+            if batch:
+                flush()
             
             if not materials:
                 return {"success": False, "error": "No valid materials found in Excel"}
             
-            logger.info(f"Generating embeddings for {len(materials)} materials...")
-            
-            # Generate embeddings
-            embeddings = []
-            for i, text in enumerate(texts):
-                embedding = embedding_service.generate_embedding(text)
-                if embedding is not None:
-                    embeddings.append(embedding)
-                else:
-                    # Use zero vector for failed embeddings
-                    embeddings.append(np.zeros(embedding_service.EMBEDDING_DIMENSION, dtype=np.float32))
-                
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Processed {i + 1}/{len(texts)} materials")
-            
-            # Create FAISS index
-            embeddings_matrix = np.vstack(embeddings).astype(np.float32)
-            
-            # Normalize for cosine similarity
-            faiss.normalize_L2(embeddings_matrix)
-            
-            # Create index (using Inner Product for cosine similarity on normalized vectors)
-            dimension = embedding_service.EMBEDDING_DIMENSION
-            self.index = faiss.IndexFlatIP(dimension)
-            self.index.add(embeddings_matrix)
-            
-            self.materials = materials
+            self.index = index
+            self._set_materials(materials)
             
             # Save to disk
             self._save_index()
@@ -254,6 +256,30 @@ class MarketingVectorStore:
             logger.error(f"Error indexing Excel file: {e}")
             return {"success": False, "error": str(e)}
     
+    @staticmethod
+    def _iter_excel_rows(excel_path: str) -> Iterator[Dict[str, str]]:
+        """
+        Stream the data rows of the first worksheet as {header: text} dicts.
+        
+        Uses openpyxl's read-only mode, which parses rows lazily instead of
+        loading the whole workbook into memory. Headers and values are
+        stripped; empty cells become "".
+        """
+        workbook = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(name).strip() if name is not None else "" for name in header]
+            for values in rows:
+                yield {
+                    column: str(value).strip() if value is not None else ""
+                    for column, value in zip(columns, values)
+                }
+        finally:
+            workbook.close()
+    
     def search(
         self,
         query_text: str,
@@ -277,6 +303,12 @@ class MarketingVectorStore:
             logger.warning("No materials indexed yet")
             return []
         
+        cache_key = (query_text, top_k)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Marketing search cache HIT")
+            return [dict(result) for result in cached]
+        
         try:
             # Generate embedding for query
             query_embedding = embedding_service.generate_embedding(query_text)
@@ -306,7 +338,9 @@ class MarketingVectorStore:
                     "similarity_score": float(score),
                 })
             
-            return results
+            # Stored as a tuple and copied out so callers can't mutate the cached entry
+            self._search_cache.set(cache_key, tuple(results))
+            return [dict(result) for result in results]
             
         except Exception as e:
             logger.error(f"Error searching vector store: {e}")
@@ -382,7 +416,7 @@ class MarketingVectorStore:
         """Clear the index and remove stored files."""
         try:
             self.index = None
-            self.materials = []
+            self._set_materials([])
             
             if self.index_path.exists():
                 os.remove(self.index_path)
@@ -0,0 +1,89 @@
+"""
+In-process semantic cache.
+
+Maps embeddings to previously computed results so that requests whose
+inputs are semantically near-identical (cosine similarity above a
+threshold) reuse a result instead of repeating an expensive LLM call.
+"""
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Thread-safe nearest-neighbour cache keyed by embedding vectors.
+
+    Entries expire after ``ttl`` seconds and the oldest entry is evicted
+    once ``maxsize`` is reached. Lookups are a single matrix-vector product
+    over the stored (L2-normalized) vectors.
+    """
+
+    def __init__(self, threshold: float = 0.97, maxsize: int = 1024, ttl: float = 7 * 24 * 3600):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Tuple[float, Any]] = []  # (expires_at, value), aligned with _vectors rows
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, vector: np.ndarray) -> Optional[Any]:
+        """
+        Get the value stored for the most similar vector, if similar enough.
+
+        Args:
+            vector: Query embedding
+
+        Returns:
+            Cached value, or None on miss
+        """
+        query = self._normalize(vector)
+        with self._lock:
+            if self._vectors is None:
+                return None
+            scores = self._vectors @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            expires_at, value = self._entries[best]
+            if expires_at < time.monotonic():
+                return None
+            return value
+
+    def set(self, vector: np.ndarray, value: Any) -> None:
+        """
+        Store a value under an embedding, evicting the oldest entry if full.
+
+        Args:
+            vector: Embedding of the inputs that produced value
+            value: Result to cache (treat as read-only once stored)
+        """
+        row = self._normalize(vector)[np.newaxis, :]
+        entry = (time.monotonic() + self.ttl, value)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = row
+                self._entries = [entry]
+                return
+            vectors, entries = self._vectors, self._entries
+            if len(entries) >= self.maxsize:
+                vectors, entries = vectors[1:], entries[1:]
+            self._vectors = np.vstack([vectors, row])
+            self._entries = entries + [entry]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._vectors = None
+            self._entries = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
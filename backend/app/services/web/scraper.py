@@ -4,6 +4,7 @@ Web scraping service to extract company information from websites.
 Fetches and parses website content to extract relevant metadata
 for lead qualification when no matching leads are found.
 """
+import json
 import re
 from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse, urljoin
@@ -11,6 +12,24 @@ import httpx
 from bs4 import BeautifulSoup
 from loguru import logger
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.http import get_http_client
+
+
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_MAILTO_RE = re.compile(r'^mailto:')
+_TEL_RE = re.compile(r'^tel:')
+_LOGO_RE = re.compile(r'logo', re.I)
+
+# Checked in order; the first platform a link matches wins
+_SOCIAL_PATTERNS = (
+    ("linkedin", re.compile(r'linkedin\.com', re.I)),
+    ("twitter", re.compile(r'(twitter\.com|x\.com)', re.I)),
+    ("facebook", re.compile(r'facebook\.com', re.I)),
+    ("instagram", re.compile(r'instagram\.com', re.I)),
+    ("youtube", re.compile(r'youtube\.com', re.I)),
+)
 
 class WebScraperService:
     """
@@ -22,9 +41,17 @@ class WebScraperService:
     - Industry hints
     - Contact information
     - Social media links
+    
+    Requests go through the shared pooled HTTP client. Results of
+    fetch_website_data are kept with the site's ETag / Last-Modified so a
+    later fetch of the same URL can be a conditional GET.
     """
     
     def __init__(self):
+        # URL -> (etag, last_modified, extracted data)
+        self._validators = TTLCache(
+            maxsize=settings.WEB_FETCH_CACHE_SIZE, ttl=settings.WEB_FETCH_VALIDATOR_TTL
+        )
         self.timeout = 15.0
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -70,30 +97,44 @@ class WebScraperService:
                 "url": url,
             }
         
+        headers = dict(self.headers)
+        stored = self._validators.get(url)
+        if stored is not None:
+            etag, last_modified, _ = stored
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
         try:
-            async with httpx.AsyncClient(
-                timeout=self.timeout,
-                headers=self.headers,
-                follow_redirects=True,
-            ) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                html_content = response.text
-                final_url = str(response.url)
-                
-                # Parse the HTML
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
-                # Extract data
-                data = self._extract_metadata(soup, final_url)
-                data["success"] = True
-                data["url"] = final_url
-                data["original_url"] = url
-                
-                logger.info(f"Successfully scraped website: {url}")
-                return data
-                
+            response = await get_http_client().get(
+                url, headers=headers, timeout=self.timeout, follow_redirects=True
+            )
+            if response.status_code == 304 and stored is not None:
+                logger.info(f"Website unchanged since last scrape: {url}")
+                return dict(stored[2])
+            response.raise_for_status()
+            
+            html_content = response.text
+            final_url = str(response.url)
+            
+            # Parse the HTML
+            soup = BeautifulSoup(html_content, 'html.parser')
+            
+            # Extract data
+            data = self._extract_metadata(soup, final_url)
+            data["success"] = True
+            data["url"] = final_url
+            data["original_url"] = url
+            
+            etag = response.headers.get("etag")
+            last_modified = response.headers.get("last-modified")
+            if etag or last_modified:
+                self._validators.set(url, (etag, last_modified, dict(data)))
+            
+            logger.info(f"Successfully scraped website: {url}")
+            return data
+            
         except httpx.TimeoutException:
             logger.warning(f"Timeout while fetching {url}")
             return {
@@ -180,7 +221,6 @@ class WebScraperService:
         schema_script = soup.find('script', type='application/ld+json')
         if schema_script:
             try:
-                import json
                 schema_data = json.loads(schema_script.string)
                 if isinstance(schema_data, dict):
                     if schema_data.get('@type') == 'Organization':
@@ -244,22 +284,21 @@ class WebScraperService:
         }
         
         # Find email
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        email_links = soup.find_all('a', href=re.compile(r'^mailto:'))
+        email_links = soup.find_all('a', href=_MAILTO_RE)
         if email_links:
             href = email_links[0].get('href', '')
-            match = re.search(email_pattern, href)
+            match = _EMAIL_RE.search(href)
             if match:
                 contact["email"] = match.group()
         else:
             # Search in text
             text = soup.get_text()
-            match = re.search(email_pattern, text)
+            match = _EMAIL_RE.search(text)
             if match:
                 contact["email"] = match.group()
         
         # Find phone
-        phone_links = soup.find_all('a', href=re.compile(r'^tel:'))
+        phone_links = soup.find_all('a', href=_TEL_RE)
         if phone_links:
             phone = phone_links[0].get('href', '').replace('tel:', '')
             contact["phone"] = phone
@@ -268,20 +307,12 @@ class WebScraperService:
     
     def _extract_social_links(self, soup: BeautifulSoup, base_url: str) -> Dict[str, str]:
         """Extract social media links."""
-        social_patterns = {
-            "linkedin": r'linkedin\.com',
-            "twitter": r'(twitter\.com|x\.com)',
-            "facebook": r'facebook\.com',
-            "instagram": r'instagram\.com',
-            "youtube": r'youtube\.com',
-        }
-        
         social_links = {}
         
         for link in soup.find_all('a', href=True):
             href = link['href']
-            for platform, pattern in social_patterns.items():
-                if platform not in social_links and re.search(pattern, href, re.I):
+            for platform, pattern in _SOCIAL_PATTERNS:
+                if platform not in social_links and pattern.search(href):
                     social_links[platform] = href
                     break
         
@@ -295,12 +326,12 @@ class WebScraperService:
             return urljoin(base_url, og_image['content'])
         
         # Try finding logo in img tags
-        logo_img = soup.find('img', attrs={'class': re.compile(r'logo', re.I)})
+        logo_img = soup.find('img', attrs={'class': _LOGO_RE})
         if logo_img and logo_img.get('src'):
             return urljoin(base_url, logo_img['src'])
         
         # Try finding by alt text
-        logo_img = soup.find('img', attrs={'alt': re.compile(r'logo', re.I)})
+        logo_img = soup.find('img', attrs={'alt': _LOGO_RE})
         if logo_img and logo_img.get('src'):
             return urljoin(base_url, logo_img['src'])
         
@@ -330,36 +361,33 @@ class WebScraperService:
             return None
         
         try:
-            async with httpx.AsyncClient(
-                timeout=self.timeout,
-                headers=self.headers,
-                follow_redirects=True,
-            ) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # Remove non-visible elements
-                for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "iframe"]):
-                    tag.decompose()
-                
-                text = soup.get_text(separator="\n", strip=True)
-                
-                # Collapse excessive blank lines
-                lines = [line.strip() for line in text.splitlines() if line.strip()]
-                text = "\n".join(lines)
-                
-                if not text:
-                    return None
-                
-                # Truncate
-                if len(text) > max_chars:
-                    text = text[:max_chars] + "\n... [truncated]"
-                
-                logger.info(f"Scraped {len(text)} chars of text from {url}")
-                return text
-                
+            response = await get_http_client().get(
+                url, headers=self.headers, timeout=self.timeout, follow_redirects=True
+            )
+            response.raise_for_status()
+            
+            soup = BeautifulSoup(response.text, "html.parser")
+            
+            # Remove non-visible elements
+            for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "iframe"]):
+                tag.decompose()
+            
+            text = soup.get_text(separator="\n", strip=True)
+            
+            # Collapse excessive blank lines
+            lines = [line.strip() for line in text.splitlines() if line.strip()]
+            text = "\n".join(lines)
+            
+            if not text:
+                return None
+            
+            # Truncate
+            if len(text) > max_chars:
+                text = text[:max_chars] + "\n... [truncated]"
+            
+            logger.info(f"Scraped {len(text)} chars of text from {url}")
+            return text
+            
         except Exception as e:
             logger.warning(f"Failed to fetch page text from {url}: {e}")
             return None
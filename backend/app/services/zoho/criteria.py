@@ -0,0 +1,152 @@
+"""
+Helpers for building Zoho CRM search criteria strings and COQL queries.
+
+Zoho criteria look like ``((Field:operator:value)and(Field:operator:value))``.
+Parentheses, commas and backslashes inside a value must be escaped with a
+backslash, otherwise user input can break out of the clause. COQL string
+literals are single-quoted, so quotes and backslashes are escaped there.
+"""
+import re
+from functools import lru_cache
+from typing import Tuple
+
+
+# Longest search term accepted from clients
+MAX_SEARCH_TERM_LENGTH = 100
+
+# Control characters are never meaningful in a CRM search term
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
+
+# Comparison operators accepted in criteria clauses
+CRITERIA_OPERATORS = frozenset({
+    "equals", "not_equal", "starts_with", "in", "not_in",
+    "greater_than", "greater_equal", "less_than", "less_equal", "between",
+})
+
+# Zoho field API names (optionally one lookup hop, e.g. Account_Name.Account_Name)
+_API_NAME = re.compile(r"^[A-Za-z][A-Za-z0-9_]*(\.[A-Za-z][A-Za-z0-9_]*)?$")
+
+
+def escape_criteria_value(value: str) -> str:
+    """
+    Escape a value for use inside a Zoho criteria clause.
+
+    Args:
+        value: Raw user-supplied value
+
+    Returns:
+        Value with backslash, parentheses and commas escaped
+    """
+    return (
+        value.replace("\\", "\\\\")
+        .replace("(", "\\(")
+        .replace(")", "\\)")
+        .replace(",", "\\,")
+    )
+
+
+def validate_search_term(value: str) -> str:
+    """
+    Validate and normalize a user-supplied search term.
+
+    Args:
+        value: Raw search term
+
+    Returns:
+        Stripped search term (not yet escaped)
+
+    Raises:
+        ValueError: If the term is empty, too long or contains control characters
+    """
+    value = value.strip()
+    if not value:
+        raise ValueError("Search term must not be empty")
+    if len(value) > MAX_SEARCH_TERM_LENGTH:
+        raise ValueError(f"Search term must be at most {MAX_SEARCH_TERM_LENGTH} characters")
+    if _CONTROL_CHARS.search(value):
+        raise ValueError("Search term contains invalid characters")
+    return value
+
+
+def clean_search_term(value: str) -> str:
+    """
+    Validate, normalize and escape a user-supplied search term.
+
+    Args:
+        value: Raw search term
+
+    Returns:
+        Stripped, escaped search term
+
+    Raises:
+        ValueError: If the term is empty, too long or contains control characters
+    """
+    return escape_criteria_value(validate_search_term(value))
+
+
+@lru_cache(maxsize=4096)
+def build_criteria(clauses: Tuple[Tuple[str, str, str], ...], joiner: str = "and") -> str:
+    """
+    Build a Zoho criteria string from (field, operator, value) clauses.
+
+    Values are escaped here, so pass them raw (after validate_search_term).
+    Clauses are tuples so identical query parameter combinations hit the cache.
+
+    Args:
+        clauses: e.g. (("Deal_Name", "starts_with", "Acme"), ("Stage", "equals", "Won"))
+        joiner: "and" or "or"
+
+    Returns:
+        Criteria string, e.g. "((Deal_Name:starts_with:Acme)and(Stage:equals:Won))"
+
+    Raises:
+        ValueError: If there are no clauses, or a field, operator or joiner is invalid
+    """
+    if not clauses:
+        raise ValueError("At least one criteria clause is required")
+    if joiner not in ("and", "or"):
+        raise ValueError(f"Invalid criteria joiner: {joiner!r}")
+    parts = []
+    for field, operator, value in clauses:
+        if operator not in CRITERIA_OPERATORS:
+            raise ValueError(f"Invalid criteria operator: {operator!r}")
+        parts.append(f"({validate_api_name(field)}:{operator}:{escape_criteria_value(value)})")
+    if len(parts) == 1:
+        return parts[0]
+    return "(" + joiner.join(parts) + ")"
+
+
+def escape_coql_value(value: str) -> str:
+    """
+    Escape a value for use inside a single-quoted COQL string literal.
+
+    Args:
+        value: Raw user-supplied value
+
+    Returns:
+        Value with backslashes and single quotes escaped
+
+    Raises:
+        ValueError: If the value contains control characters
+    """
+    if _CONTROL_CHARS.search(value):
+        raise ValueError("Value contains invalid characters")
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def validate_api_name(name: str) -> str:
+    """
+    Check that a field name is a plain Zoho API name before it goes into a query.
+
+    Args:
+        name: Field API name
+
+    Returns:
+        The name, unchanged
+
+    Raises:
+        ValueError: If the name is not a valid API name
+    """
+    if not _API_NAME.match(name):
+        raise ValueError(f"Invalid field name: {name!r}")
+    return name
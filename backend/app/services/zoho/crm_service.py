@@ -3,11 +3,17 @@ Zoho CRM Service.
 
 Provides methods for interacting with Zoho CRM API.
 """
-from typing import Optional, Dict, Any, List
+import asyncio
+import hashlib
+from typing import Optional, Dict, Any, List, AsyncIterator, Awaitable, Callable
 import httpx
 from loguru import logger
 
 from app.services.zoho.token_manager import zoho_token_manager
+from app.core.cache import TTLCache
+from app.core.http import get_http_client
+from app.core.concurrency import zoho_limit
+from app.services.zoho.criteria import escape_coql_value, validate_api_name
 from app.core.config import settings
 from app.core.exceptions import ZohoAPIException, RateLimitException
 
@@ -48,19 +54,34 @@ class ZohoCRMService:
         "Created_Time", "Modified_Time", "Owner"
     ]
     
+    # Fields fetched for the deal detail view and analysis: the list fields,
+    # what the LLM prompt formats first (deal_analysis_service) and what the
+    # pipeline reads. Zoho allows up to 50 fields per request.
+    DEAL_FIELDS_FOR_ANALYSIS = DEFAULT_DEAL_FIELDS + [
+        "Industry", "Company_Website", "Website", "Description",
+        "Support_Required", "Specific_Area_of_Support_Required", "Country",
+        "Projected_company_revenue_in_current_fisca",
+        "Sales_revenue_since_being_incorporated",
+        "Company_revenue_in_current_fiscal_year_CAD",
+        "Company_Monthly_Revenue",
+        "Revenue_Range",
+        "Company_revenue_in_last_fiscal_year_CAD",
+        "Top_5_Customers",
+        "Target_Markets_or_Customer_Segments",
+        "Target_Customer_Type",
+        "Customer_Example",
+    ]
+    
+    # Zoho insert/update calls accept at most this many records
+    MAX_RECORDS_PER_WRITE = 100
+    
     def __init__(self):
-        self._http_client: Optional[httpx.AsyncClient] = None
+        # Contact emails rarely change; deal analysis only needs the email
+        self._contact_emails = TTLCache(maxsize=4096, ttl=settings.ZOHO_CONTACT_EMAIL_CACHE_TTL)
     
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client."""
-        if self._http_client is None or self._http_client.is_closed:
-            self._http_client = httpx.AsyncClient(timeout=30.0)
-        return self._http_client
-    
-    async def close(self) -> None:
-        """Close HTTP client."""
-        if self._http_client:
-            await self._http_client.aclose()
+        """Get the shared pooled HTTP client (opened and closed by the app lifespan)."""
+        return get_http_client()
     
     def _get_base_url(self) -> str:
         """Get the base URL for CRM API."""
@@ -109,13 +130,14 @@ class ZohoCRMService:
             logger.debug(f"[Zoho] Body: {json_data}")
         
         try:
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=headers,
-                params=params,
-                json=json_data,
-            )
+            async with zoho_limit:
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    json=json_data,
+                )
             
             logger.debug(f"[Zoho] <<< {method} {endpoint} — status: {response.status_code}")
             
@@ -124,20 +146,22 @@ class ZohoCRMService:
                 logger.error(f"[Zoho] Rate limited (429) on {method} {endpoint}")
                 raise RateLimitException()
             
-            # Handle authentication errors (token might be invalid)
-            if response.status_code == 401:
+            # Handle authentication errors (token might be invalid). A scope
+            # mismatch is a permission error that a new token cannot fix.
+            if response.status_code == 401 and not self._is_scope_error(response):
                 logger.warning(f"[Zoho] Token invalid (401) on {method} {endpoint}, attempting refresh...")
                 await zoho_token_manager.refresh_access_token()
                 # Retry with new token
                 headers = await self._get_headers()
                 logger.debug(f"[Zoho] Retrying {method} {endpoint} after token refresh")
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    params=params,
-                    json=json_data,
-                )
+                async with zoho_limit:
+                    response = await client.request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        params=params,
+                        json=json_data,
+                    )
                 logger.debug(f"[Zoho] <<< {method} {endpoint} (retry) — status: {response.status_code}")
             
             if response.status_code >= 400:
@@ -160,6 +184,14 @@ class ZohoCRMService:
             logger.error(f"[Zoho] Network error on {method} {endpoint}: {e}")
             raise ZohoAPIException(detail=f"Network error: {str(e)}")
     
+    @staticmethod
+    def _is_scope_error(response: httpx.Response) -> bool:
+        """Check whether a 401 means the token lacks a scope rather than being expired."""
+        try:
+            return response.json().get("code") == "OAUTH_SCOPE_MISMATCH"
+        except ValueError:
+            return False
+    
     # ==================== LEAD OPERATIONS ====================
     
     async def get_leads(
@@ -198,17 +230,19 @@ class ZohoCRMService:
         
         return await self._make_request("GET", "/Leads", params=params)
     
-    async def get_lead_by_id(self, lead_id: str) -> Dict[str, Any]:
+    async def get_lead_by_id(self, lead_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Get a specific lead by ID.
         
         Args:
             lead_id: Zoho Lead ID
+            fields: Fields to return (all fields if omitted)
             
         Returns:
-            Lead data
+            Zoho response with the lead in data[0]
         """
-        return await self._make_request("GET", f"/Leads/{lead_id}")
+        params = {"fields": ",".join(fields)} if fields else None
+        return await self._make_request("GET", f"/Leads/{lead_id}", params=params)
     
     async def create_lead(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -223,6 +257,20 @@ class ZohoCRMService:
         payload = {"data": [lead_data]}
         return await self._make_request("POST", "/Leads", json_data=payload)
     
+    async def create_leads_bulk(self, leads: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create up to MAX_RECORDS_PER_WRITE leads in a single Zoho call.
+        
+        Args:
+            leads: Lead records following Zoho's schema
+            
+        Returns:
+            Zoho response with one result per record, in request order
+        """
+        if len(leads) > self.MAX_RECORDS_PER_WRITE:
+            raise ValueError(f"Zoho accepts at most {self.MAX_RECORDS_PER_WRITE} records per call")
+        return await self._make_request("POST", "/Leads", json_data={"data": leads})
+    
     async def update_lead(self, lead_id: str, lead_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update an existing lead.
@@ -280,6 +328,99 @@ class ZohoCRMService:
         }
         return await self._make_request("GET", "/Leads/search", params=params)
     
+    async def _iter_search_pages(
+        self,
+        search: Callable[..., Awaitable[Dict[str, Any]]],
+        criteria: str,
+        fields: Optional[List[str]],
+        max_records: int,
+        label: str,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield every page of a search in order, prefetching pages ahead.
+        
+        Only page 1 is requested up front. Once Zoho reports more records, up
+        to ZOHO_PAGE_PREFETCH following pages are kept in flight (still bounded
+        by zoho_limit), so N pages cost about N / ZOHO_PAGE_PREFETCH round-trips
+        instead of N. A prefetched page past the end comes back empty and is
+        ignored. Stops at the first failed page (logged) or once max_records
+        is reached.
+        
+        Args:
+            search: Single-page search method (search_leads / search_deals)
+            criteria: Search criteria
+            fields: Fields to retrieve
+            max_records: Maximum records to fetch (safety limit)
+            label: Record type for log messages
+            
+        Yields:
+            Lists of records, one per Zoho page
+        """
+        per_page = 200  # Max allowed by Zoho
+        max_pages = -(-max_records // per_page)
+        pending: Dict[int, asyncio.Task] = {}
+        
+        def request(page: int) -> None:
+            task = asyncio.create_task(
+                search(criteria=criteria, page=page, per_page=per_page, fields=fields)
+            )
+            # Mark failures retrieved even for pages that end up unused
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            pending[page] = task
+        
+        fetched = 0
+        page = 1
+        request(page)
+        try:
+            while page in pending:
+                try:
+                    result = await pending.pop(page)
+                except Exception as e:
+                    logger.error(f"Error fetching page {page}: {e}")
+                    return
+                
+                records = result.get("data", [])
+                if not records:
+                    return
+                
+                fetched += len(records)
+                logger.info(f"Fetched page {page}: {len(records)} {label} (total: {fetched})")
+                yield records
+                
+                # Check if there are more records
+                if not result.get("info", {}).get("more_records", False) or fetched >= max_records:
+                    return
+                
+                for ahead in range(page + 1, min(page + settings.ZOHO_PAGE_PREFETCH, max_pages) + 1):
+                    if ahead not in pending:
+                        request(ahead)
+                page += 1
+        finally:
+            # Drop prefetched pages that are no longer needed
+            for task in pending.values():
+                task.cancel()
+    
+    def iter_search_leads_pages(
+        self,
+        criteria: str,
+        fields: Optional[List[str]] = None,
+        max_records: int = 2000,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Search leads matching criteria, yielding one Zoho page at a time.
+        
+        Lets callers stream results instead of holding every page in memory.
+        
+        Args:
+            criteria: Search criteria (e.g., "(Lead_Source:equals:LinkedIn Ads)")
+            fields: Fields to retrieve
+            max_records: Maximum records to fetch (safety limit)
+            
+        Yields:
+            Lists of lead records, one per Zoho page
+        """
+        return self._iter_search_pages(self.search_leads, criteria, fields, max_records, "leads")
+    
     async def search_all_leads(
         self,
         criteria: str,
@@ -298,35 +439,8 @@ class ZohoCRMService:
             Combined results with all matching leads
         """
         all_leads = []
-        page = 1
-        per_page = 200  # Max allowed by Zoho
-        
-        while len(all_leads) < max_records:
-            try:
-                result = await self.search_leads(
-                    criteria=criteria,
-                    page=page,
-                    per_page=per_page,
-                    fields=fields,
-                )
-                
-                leads = result.get("data", [])
-                if not leads:
-                    break
-                    
-                all_leads.extend(leads)
-                logger.info(f"Fetched page {page}: {len(leads)} leads (total: {len(all_leads)})")
-                
-                # Check if there are more records
-                info = result.get("info", {})
-                if not info.get("more_records", False):
-                    break
-                    
-                page += 1
-                
-            except Exception as e:
-                logger.error(f"Error fetching page {page}: {e}")
-                break
+        async for leads in self.iter_search_leads_pages(criteria, fields, max_records):
+            all_leads.extend(leads)
         
         logger.info(f"Total leads fetched: {len(all_leads)}")
         
@@ -392,7 +506,8 @@ class ZohoCRMService:
             url = f"{self._get_base_url()}/Leads/{lead_id}/Attachments/{attachment_id}"
             
             logger.info(f"[Zoho] >>> GET /Leads/{lead_id}/Attachments/{attachment_id} (download)")
-            response = await client.get(url, headers=headers)
+            async with zoho_limit:
+                response = await client.get(url, headers=headers)
             logger.info(f"[Zoho] <<< GET /Leads/{lead_id}/Attachments/{attachment_id} — status: {response.status_code}, size: {len(response.content)} bytes")
             
             if response.status_code == 200:
@@ -484,6 +599,25 @@ class ZohoCRMService:
         """Get a specific contact by ID."""
         return await self._make_request("GET", f"/Contacts/{contact_id}")
     
+    async def get_contact_email(self, contact_id: str) -> str:
+        """
+        Get a contact's email address, cached per contact.
+        
+        Args:
+            contact_id: Zoho Contact ID
+            
+        Returns:
+            The contact's email, or "" if it has none
+        """
+        email = self._contact_emails.get(contact_id)
+        if email is not None:
+            return email
+        
+        result = await self._make_request("GET", f"/Contacts/{contact_id}", params={"fields": "Email"})
+        email = ((result.get("data") or [{}])[0]).get("Email") or ""
+        self._contact_emails.set(contact_id, email)
+        return email
+    
     # ==================== DEAL OPERATIONS ====================
     
     async def get_deals(
@@ -503,9 +637,19 @@ class ZohoCRMService:
         }
         return await self._make_request("GET", "/Deals", params=params)
     
-    async def get_deal_by_id(self, deal_id: str) -> Dict[str, Any]:
-        """Get a specific deal by ID."""
-        return await self._make_request("GET", f"/Deals/{deal_id}")
+    async def get_deal_by_id(self, deal_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get a specific deal by ID.
+        
+        Args:
+            deal_id: Zoho Deal ID
+            fields: Fields to return (all fields if omitted)
+            
+        Returns:
+            Zoho response with the deal in data[0]
+        """
+        params = {"fields": ",".join(fields)} if fields else None
+        return await self._make_request("GET", f"/Deals/{deal_id}", params=params)
     
     async def create_deal(self, deal_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -576,6 +720,101 @@ class ZohoCRMService:
         }
         return await self._make_request("GET", "/Deals/search", params=params)
     
+    # COQL returns lookups as {"id": ...} only; these lookup name fields are
+    # selected alongside and folded back in as "name", matching the search API.
+    # Owner is a user lookup, whose fields use the Users API's lowercase names.
+    COQL_LOOKUP_NAME_FIELDS = {
+        "Account_Name": "Account_Name",
+        "Contact_Name": "Full_Name",
+        "Owner": "full_name",
+    }
+    
+    # Maximum LIMIT accepted by a single COQL query
+    COQL_MAX_LIMIT = 2000
+    
+    async def search_deals_coql(
+        self,
+        stage: str,
+        page: int = 1,
+        per_page: int = 200,
+        fields: Optional[List[str]] = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "desc",
+    ) -> Dict[str, Any]:
+        """
+        Fetch deals in a stage with a COQL query.
+        
+        Unlike the search API, COQL filters on Zoho's indexes, sorts server-side
+        and returns up to COQL_MAX_LIMIT records in one call.
+        
+        Args:
+            stage: Deal stage to match exactly
+            page: Page number
+            per_page: Records per page (up to COQL_MAX_LIMIT)
+            fields: Fields to retrieve
+            sort_by: Field to order by
+            sort_order: "asc" or "desc"
+            
+        Returns:
+            Search-API-shaped result ({"data": [...], "info": {...}})
+            
+        Raises:
+            ValueError: If a field name is not a valid API name
+        """
+        field_list = [validate_api_name(f) for f in (fields or self.DEFAULT_DEAL_FIELDS)]
+        per_page = min(per_page, self.COQL_MAX_LIMIT)
+        
+        select = list(field_list)
+        for lookup, name_field in self.COQL_LOOKUP_NAME_FIELDS.items():
+            if lookup in field_list:
+                select.append(f"{lookup}.{name_field}")
+        
+        query = f"SELECT {', '.join(select)} FROM Deals WHERE Stage = '{escape_coql_value(stage)}'"
+        if sort_by:
+            query += f" ORDER BY {validate_api_name(sort_by)} {'asc' if sort_order == 'asc' else 'desc'}"
+        query += f" LIMIT {(page - 1) * per_page}, {per_page}"
+        
+        result = await self._make_request("POST", "/coql", json_data={"select_query": query})
+        
+        deals = result.get("data", [])
+        for deal in deals:
+            for lookup, name_field in self.COQL_LOOKUP_NAME_FIELDS.items():
+                name = deal.pop(f"{lookup}.{name_field}", None)
+                if isinstance(deal.get(lookup), dict):
+                    deal[lookup]["name"] = name
+        
+        info = result.get("info", {})
+        return {
+            "data": deals,
+            "info": {
+                "page": page,
+                "per_page": per_page,
+                "count": info.get("count", len(deals)),
+                "more_records": info.get("more_records", False),
+            },
+        }
+    
+    def iter_search_deals_pages(
+        self,
+        criteria: str,
+        fields: Optional[List[str]] = None,
+        max_records: int = 2000,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Search deals matching criteria, yielding one Zoho page at a time.
+        
+        Lets callers stream results instead of holding every page in memory.
+        
+        Args:
+            criteria: Search criteria (e.g., "(Stage:equals:Qualification)")
+            fields: Fields to retrieve
+            max_records: Maximum records to fetch (safety limit)
+            
+        Yields:
+            Lists of deal records, one per Zoho page
+        """
+        return self._iter_search_pages(self.search_deals, criteria, fields, max_records, "deals")
+    
     async def search_all_deals(
         self,
         criteria: str,
@@ -594,35 +833,8 @@ class ZohoCRMService:
             Combined results with all matching deals
         """
         all_deals = []
-        page = 1
-        per_page = 200  # Max allowed by Zoho
-        
-        while len(all_deals) < max_records:
-            try:
-                result = await self.search_deals(
-                    criteria=criteria,
-                    page=page,
-                    per_page=per_page,
-                    fields=fields,
-                )
-                
-                deals = result.get("data", [])
-                if not deals:
-                    break
-                    
-                all_deals.extend(deals)
-                logger.info(f"Fetched page {page}: {len(deals)} deals (total: {len(all_deals)})")
-                
-                # Check if there are more records
-                info = result.get("info", {})
-                if not info.get("more_records", False):
-                    break
-                    
-                page += 1
-                
-            except Exception as e:
-                logger.error(f"Error fetching page {page}: {e}")
-                break
+        async for deals in self.iter_search_deals_pages(criteria, fields, max_records):
+            all_deals.extend(deals)
         
         logger.info(f"Total deals fetched: {len(all_deals)}")
         
@@ -680,7 +892,8 @@ class ZohoCRMService:
             url = f"{self._get_base_url()}/Deals/{deal_id}/Attachments/{attachment_id}"
             
             logger.info(f"[Zoho] >>> GET /Deals/{deal_id}/Attachments/{attachment_id} (download)")
-            response = await client.get(url, headers=headers)
+            async with zoho_limit:
+                response = await client.get(url, headers=headers)
             logger.info(f"[Zoho] <<< GET /Deals/{deal_id}/Attachments/{attachment_id} — status: {response.status_code}, size: {len(response.content)} bytes")
             
             if response.status_code == 200:
@@ -693,36 +906,59 @@ class ZohoCRMService:
             logger.error(f"[Zoho] Error downloading deal attachment {attachment_id}: {e}")
             return None
     
-    async def get_deal_attachments_with_content(
-        self, 
+    DEFAULT_ATTACHMENT_EXTENSIONS = [
+        '.pdf', '.doc', '.docx', '.ppt', '.pptx',
+        '.txt', '.rtf', '.xls', '.xlsx'
+    ]
+    
+    async def _download_deal_attachment_record(
+        self,
         deal_id: str,
-        supported_extensions: List[str] = None
-    ) -> List[Dict[str, Any]]:
+        index: int,
+        attachment: Dict[str, Any],
+        ext: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Download one deal attachment and wrap it in the attachment dict format."""
+        file_name = attachment.get("File_Name", "")
+        attachment_id = attachment.get("id")
+        content = await self.download_deal_attachment(deal_id, attachment_id)
+        
+        if not content:
+            logger.warning(f"Failed to download deal attachment: {file_name}")
+            return None
+        
+        logger.info(f"Downloaded deal attachment: {file_name} ({len(content)} bytes)")
+        return {
+            "id": attachment_id,
+            "index": index,
+            "file_name": file_name,
+            "extension": ext,
+            "size": attachment.get("Size", len(content)),
+            "content": content,
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "created_time": attachment.get("Created_Time"),
+        }
+    
+    async def _start_deal_attachment_downloads(
+        self,
+        deal_id: str,
+        supported_extensions: Optional[List[str]] = None,
+    ) -> List[asyncio.Task]:
         """
-        Get all attachments for a deal with their file content.
+        List a deal's attachments and start downloading the supported ones concurrently.
         
-        Args:
-            deal_id: Zoho Deal ID
-            supported_extensions: List of file extensions to download (e.g., ['.pdf', '.docx'])
-                                 If None, downloads common document types.
-            
         Returns:
-            List of attachment dicts with 'content' key containing bytes
+            List of download tasks, in attachment order
         """
         if supported_extensions is None:
-            supported_extensions = [
-                '.pdf', '.doc', '.docx', '.ppt', '.pptx',
-                '.txt', '.rtf', '.xls', '.xlsx'
-            ]
+            supported_extensions = self.DEFAULT_ATTACHMENT_EXTENSIONS
         
         attachments = await self.get_deal_attachments(deal_id)
         
-        result = []
-        for attachment in attachments:
+        tasks = []
+        for index, attachment in enumerate(attachments):
             file_name = attachment.get("File_Name", "")
-            attachment_id = attachment.get("id")
-            
-            if not attachment_id:
+            if not attachment.get("id"):
                 continue
             
             # Check if file extension is supported
@@ -731,24 +967,74 @@ class ZohoCRMService:
                 logger.debug(f"Skipping unsupported file type: {file_name}")
                 continue
             
-            # Download the content
-            content = await self.download_deal_attachment(deal_id, attachment_id)
+            tasks.append(asyncio.create_task(
+                self._download_deal_attachment_record(deal_id, index, attachment, ext)
+            ))
+        return tasks
+    
+    async def get_deal_attachments_with_content(
+        self, 
+        deal_id: str,
+        supported_extensions: List[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get all attachments for a deal with their file content.
+        
+        Downloads run concurrently; attachments with identical content
+        (same SHA-256) are only returned once.
+        
+        Args:
+            deal_id: Zoho Deal ID
+            supported_extensions: List of file extensions to download (e.g., ['.pdf', '.docx'])
+                                 If None, downloads common document types.
             
-            if content:
-                result.append({
-                    "id": attachment_id,
-                    "file_name": file_name,
-                    "extension": ext,
-                    "size": attachment.get("Size", len(content)),
-                    "content": content,
-                    "created_time": attachment.get("Created_Time"),
-                })
-                logger.info(f"Downloaded deal attachment: {file_name} ({len(content)} bytes)")
-            else:
-                logger.warning(f"Failed to download deal attachment: {file_name}")
+        Returns:
+            List of attachment dicts with 'content' and 'sha256' keys
+        """
+        tasks = await self._start_deal_attachment_downloads(deal_id, supported_extensions)
+        downloaded = await asyncio.gather(*tasks)
         
+        result = []
+        seen_hashes = set()
+        for attachment in downloaded:
+            if attachment is None or attachment["sha256"] in seen_hashes:
+                continue
+            seen_hashes.add(attachment["sha256"])
+            result.append(attachment)
         return result
     
+    async def iter_deal_attachments_with_content(
+        self,
+        deal_id: str,
+        supported_extensions: List[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a deal's attachments as each download completes.
+        
+        Lets callers start processing one file while the others are still
+        downloading. Attachments with duplicate content are skipped; each
+        yielded dict carries its original position under 'index'.
+        
+        Args:
+            deal_id: Zoho Deal ID
+            supported_extensions: List of file extensions to download
+            
+        Yields:
+            Attachment dicts with 'content' and 'sha256' keys
+        """
+        tasks = await self._start_deal_attachment_downloads(deal_id, supported_extensions)
+        seen_hashes = set()
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                attachment = await next_done
+                if attachment is None or attachment["sha256"] in seen_hashes:
+                    continue
+                seen_hashes.add(attachment["sha256"])
+                yield attachment
+        finally:
+            for task in tasks:
+                task.cancel()
+    
     # ==================== GENERIC MODULE OPERATIONS ====================
     
     async def get_records(
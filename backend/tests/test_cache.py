@@ -0,0 +1,40 @@
+"""
+In-process TTL cache tests.
+"""
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_get_set_pop():
+    """Stored values are returned until popped; misses return the default."""
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert "a" in cache
+    assert cache.get("missing", "default") == "default"
+    assert cache.pop("a") == 1
+    assert "a" not in cache
+    assert cache.pop("a", "gone") == "gone"
+
+
+def test_ttl_cache_expires_entries():
+    """Entries past their time-to-live are treated as missing and dropped."""
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("stale", 1, ttl=-1)
+    cache.set("fresh", 2)
+    assert cache.get("stale") is None
+    assert "stale" not in cache
+    assert cache.get("fresh") == 2
+    assert len(cache) == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Once full, the least recently used entry is evicted first."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
@@ -0,0 +1,24 @@
+"""
+Compressed JSON payload tests.
+"""
+import zlib
+
+import pytest
+
+from app.core.compression import build_zdict, compress_json, decompress_json
+
+
+def test_compress_json_round_trip_with_dictionary():
+    """Payloads round-trip and the preset dictionary makes them smaller."""
+    zdict = build_zdict(("company_name", "fit_score"))
+    payload = {"company_name": "Acme", "fit_score": 7, "notes": None}
+    blob = compress_json(payload, zdict)
+    assert decompress_json(blob, zdict) == payload
+    assert len(blob) < len(compress_json(payload))
+
+
+def test_decompress_json_requires_matching_dictionary():
+    """A payload compressed with a dictionary cannot be read without it."""
+    blob = compress_json({"company_name": "Acme"}, build_zdict(("company_name",)))
+    with pytest.raises(zlib.error):
+        decompress_json(blob)
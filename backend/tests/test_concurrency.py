@@ -0,0 +1,102 @@
+"""
+Concurrency helper tests.
+"""
+import asyncio
+
+import pytest
+
+from app.core.concurrency import KeyedLock, SingleFlight
+
+
+@pytest.mark.anyio
+async def test_keyed_lock_serializes_same_key():
+    """Holders of the same key run one at a time; the lock is dropped afterwards."""
+    locks = KeyedLock()
+    order = []
+
+    async def worker(name):
+        async with locks.hold("deal-1"):
+            order.append(f"{name}-start")
+            await asyncio.sleep(0)
+            order.append(f"{name}-end")
+
+    await asyncio.gather(worker("a"), worker("b"))
+    assert order == ["a-start", "a-end", "b-start", "b-end"]
+    assert len(locks) == 0
+
+
+@pytest.mark.anyio
+async def test_keyed_lock_does_not_block_other_keys():
+    """A held key does not delay work on a different key."""
+    locks = KeyedLock()
+    release = asyncio.Event()
+
+    async def hold_first():
+        async with locks.hold("deal-1"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold_first())
+    await asyncio.sleep(0)
+    async with locks.hold("deal-2"):
+        assert len(locks) == 2
+    release.set()
+    await holder
+    assert len(locks) == 0
+
+
+@pytest.mark.anyio
+async def test_single_flight_survives_first_caller_cancellation():
+    """Cancelling the caller that started a run does not cancel callers that joined it."""
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flights.run("k", work))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flights.run("k", work))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == ("done", True)
+    assert first.cancelled()
+    assert len(flights) == 0
+
+
+@pytest.mark.anyio
+async def test_single_flight_coalesces_concurrent_calls():
+    """Concurrent callers for one key share a single execution."""
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return calls
+
+    results = await asyncio.gather(flights.run("k", work), flights.run("k", work))
+    assert calls == 1
+    assert results == [(1, False), (1, True)]
+    assert len(flights) == 0
+
+
+@pytest.mark.anyio
+async def test_single_flight_propagates_errors_to_all_callers():
+    """A failed run raises in every caller and does not stick to the key."""
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flights.run("k", fail), flights.run("k", fail), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flights) == 0
@@ -0,0 +1,38 @@
+"""
+Zoho search criteria helper tests.
+"""
+import pytest
+
+from app.services.zoho.criteria import build_criteria, clean_search_term, escape_criteria_value
+
+
+def test_escape_criteria_value():
+    """Special characters in values are backslash-escaped."""
+    assert escape_criteria_value("Acme (Canada), Inc\\") == "Acme \\(Canada\\)\\, Inc\\\\"
+
+
+def test_clean_search_term_strips_and_escapes():
+    """Search terms are trimmed before escaping."""
+    assert clean_search_term("  foo)bar ") == "foo\\)bar"
+
+
+@pytest.mark.parametrize("term", ["", "   ", "a" * 101, "bad\x00term"])
+def test_clean_search_term_rejects_invalid(term):
+    """Empty, overlong and control-character terms are rejected."""
+    with pytest.raises(ValueError):
+        clean_search_term(term)
+
+
+def test_build_criteria_escapes_and_joins():
+    """Clauses are escaped per value and combined with the joiner."""
+    assert build_criteria((("Deal_Name", "starts_with", "Acme (CA)"),)) == "(Deal_Name:starts_with:Acme \\(CA\\))"
+    assert build_criteria(
+        (("Deal_Name", "starts_with", "A"), ("Stage", "equals", "Won")), "or"
+    ) == "((Deal_Name:starts_with:A)or(Stage:equals:Won))"
+
+
+@pytest.mark.parametrize("clauses", [(), (("Deal_Name", "drop", "x"),), (("Deal Name)", "equals", "x"),)])
+def test_build_criteria_rejects_invalid(clauses):
+    """Empty clause lists, unknown operators and bad field names are rejected."""
+    with pytest.raises(ValueError):
+        build_criteria(clauses)
@@ -0,0 +1,47 @@
+"""
+Deal list cursor tests.
+"""
+import base64
+import importlib
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+deals = importlib.import_module("app.api.v1.endpoints.deals")
+
+
+def _raw_cursor(payload: bytes) -> str:
+    """Encode arbitrary bytes the way _encode_cursor does."""
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    """A cursor decodes back to the paging state it was built from."""
+    cursor = deals._encode_cursor(3, 50, "Deal_Name,Stage", "Qualified")
+    assert "=" not in cursor
+    assert deals._decode_cursor(cursor) == {
+        "page": 3,
+        "per_page": 50,
+        "fields": "Deal_Name,Stage",
+        "stage": "Qualified",
+    }
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        _raw_cursor(b"not json"),
+        _raw_cursor(orjson.dumps({"page": 2})),
+        _raw_cursor(orjson.dumps(["page", 2])),
+        _raw_cursor(orjson.dumps({"page": "x", "per_page": 50})),
+        _raw_cursor(orjson.dumps({"page": 0, "per_page": 50})),
+        _raw_cursor(orjson.dumps({"page": 1, "per_page": 500})),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    """Malformed or out-of-range cursors are a 400, not a server error."""
+    with pytest.raises(HTTPException) as exc_info:
+        deals._decode_cursor(cursor)
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,38 @@
+"""
+Conditional GET helper tests.
+"""
+from starlette.requests import Request
+
+from app.core.etag import compute_etag, content_digest, is_not_modified, to_http_date
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_compute_etag_is_quoted_and_content_sensitive():
+    """Equal parts give the same quoted ETag; any change gives a new one."""
+    etag = compute_etag("deal-1", content_digest(b'{"a":1}'), 2)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == compute_etag("deal-1", content_digest(b'{"a":1}'), 2)
+    assert etag != compute_etag("deal-1", content_digest(b'{"a":2}'), 2)
+    assert etag != compute_etag("deal-1", content_digest(b'{"a":1}'), 3)
+
+
+def test_is_not_modified_matches_if_none_match():
+    """A matching (or weak, or listed, or wildcard) If-None-Match allows a 304."""
+    etag = compute_etag("x")
+    assert is_not_modified(_request(etag), etag)
+    assert is_not_modified(_request(f'"other", W/{etag}'), etag)
+    assert is_not_modified(_request("*"), etag)
+    assert not is_not_modified(_request('"other"'), etag)
+    assert not is_not_modified(_request(), etag)
+
+
+def test_to_http_date():
+    """Zoho timestamps convert to GMT HTTP dates; bad or naive input gives None."""
+    assert to_http_date("2024-01-15T10:20:30-05:00") == "Mon, 15 Jan 2024 15:20:30 GMT"
+    assert to_http_date("2024-01-15T10:20:30") is None
+    assert to_http_date("not a date") is None
+    assert to_http_date(None) is None
@@ -25,12 +25,20 @@ async function fetchApi<T>(endpoint: string, options?: RequestInit): Promise<T>
 
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: "Unknown error" }));
-    throw new ApiError(response.status, error.detail || "Request failed");
+    throw new ApiError(response.status, errorMessage(error.detail) || "Request failed");
   }
 
   return response.json();
 }
 
+// FastAPI returns request validation errors (422) as a list of {msg, ...}
+function errorMessage(detail: unknown): string | undefined {
+  if (Array.isArray(detail)) {
+    return detail.map((item) => item?.msg ?? String(item)).join("; ");
+  }
+  return detail ? String(detail) : undefined;
+}
+
 // Website data response type
 export interface WebsiteData {
   success: boolean;
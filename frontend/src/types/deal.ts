@@ -135,6 +135,7 @@ export interface DealListResponse {
   per_page: number;
   total_count: number;
   more_records: boolean;
+  next_cursor?: string | null;
 }
 
 export interface DealResponse {